@@ -233,6 +233,17 @@ impl ContextManager {
         c
     }
 
+    /// Remove the variables of every context in every store, the contexts and the stores themselves are kept.
+    pub async fn clear_all(&self) -> crate::Result<()> {
+        let scopes: Vec<String> = self.contexts.iter().map(|x| x.key().clone()).collect();
+        for store in self.stores.values() {
+            for scope in scopes.iter() {
+                store.delete(scope).await?;
+            }
+        }
+        Ok(())
+    }
+
     pub fn get_default_store(&self) -> &ContextStoreHandle {
         &self.default_store
     }
@@ -317,4 +328,18 @@ mod tests {
         let foo = global.get_one(None, "foo", &[]).await.unwrap();
         assert_eq!(foo, "bar".into());
     }
+
+    #[tokio::test]
+    async fn test_context_manager_clear_all_should_keep_the_contexts() {
+        let ctxman = ContextManagerBuilder::new().load_default().build().unwrap();
+        let global = ctxman.new_global_context();
+        global.set_one(None, "foo", Some(Variant::from("bar")), &[]).await.unwrap();
+
+        ctxman.clear_all().await.unwrap();
+        assert!(global.get_one(None, "foo", &[]).await.is_none());
+
+        global.set_one(None, "foo", Some(Variant::from("baz")), &[]).await.unwrap();
+        let foo = global.get_one(None, "foo", &[]).await.unwrap();
+        assert_eq!(foo, "baz".into());
+    }
 }
@@ -300,43 +300,67 @@ impl Engine {
         &self,
         expected_msgs: usize,
         timeout: std::time::Duration,
-        mut msgs_to_inject: Vec<(ElementId, Msg)>,
+        msgs_to_inject: Vec<(ElementId, Msg)>,
     ) -> crate::Result<Vec<Msg>> {
         self.start().await?;
+        let result = self.run_with_inject(expected_msgs, timeout, msgs_to_inject).await;
+        self.stop().await?;
+        result
+    }
 
-        let mut count = 0;
-        let mut received = Vec::new();
+    /// Inject the messages into an already started engine and collect the final messages.
+    ///
+    /// Unlike `run_once_with_inject()`, the engine keeps running afterwards, so the same loaded flows
+    /// can be fed again without being rebuilt. The final messages already arrived are dropped before and after the
+    /// run, but the messages still on their way when a run times out can reach the next one, so the caller should
+    /// not reuse the engine after a failed run.
+    #[cfg(any(test, feature = "pymod"))]
+    pub async fn run_with_inject(
+        &self,
+        expected_msgs: usize,
+        timeout: std::time::Duration,
+        mut msgs_to_inject: Vec<(ElementId, Msg)>,
+    ) -> crate::Result<Vec<Msg>> {
+        // We are the only consumer of the final messages, keep the receiver for the whole run
+        let mut rx = self.inner.final_msgs_rx.rx.lock().await;
 
         // Clear the final_msgs channel
-        {
-            let mut rx = self.inner.final_msgs_rx.rx.lock().await;
-            while rx.try_recv().is_ok() {}
-        }
+        while rx.try_recv().is_ok() {}
 
+        // Cancelled when the run ends for any reason, so a timed-out run stops injecting
         let cancel = CancellationToken::new();
+        let _cancel_guard = cancel.clone().drop_guard();
         for msg in msgs_to_inject.drain(..) {
             self.inject_msg(&msg.0, MsgHandle::new(msg.1), cancel.clone()).await?;
         }
 
+        let mut handles = Vec::with_capacity(expected_msgs);
         let result = tokio::time::timeout(timeout, async {
-            while !cancel.is_cancelled() && count < expected_msgs {
-                let msg = self.inner.final_msgs_rx.recv_msg(cancel.clone()).await?;
-                count += 1;
-                let msg = msg.unwrap().await;
-                received.push(msg);
+            while handles.len() < expected_msgs {
+                // Take all the messages already arrived at once instead of waking up for each of them
+                if rx.recv_many(&mut handles, expected_msgs - handles.len()).await == 0 {
+                    return Err(EdgelinkError::InvalidOperation("The final messages channel was closed".into()));
+                }
             }
-            cancel.cancel();
-            cancel.cancelled().await;
             Ok(())
         })
         .await;
 
-        self.stop().await?;
-        match result {
-            Ok(Ok(())) => Ok(received),
-            Ok(Err(e)) => Err(e),
+        let result = match result {
+            Ok(Ok(())) => {
+                let mut received = Vec::with_capacity(handles.len());
+                for msg in handles.drain(..) {
+                    received.push(msg.unwrap().await);
+                }
+                Ok(received)
+            }
+            Ok(Err(e)) => Err(e.into()),
             Err(_) => Err(EdgelinkError::Timeout.into()),
-        }
+        };
+
+        // The surplus messages of this run must not be taken as the messages of the next one
+        while rx.try_recv().is_ok() {}
+        result
     }
 
     #[cfg(any(test, feature = "pymod"))]
@@ -479,6 +503,24 @@ mod tests {
         }
     }
 
+    #[tokio::test]
+    async fn test_it_should_inject_msgs_into_started_engine_multiple_times() {
+        let flows_json = serde_json::json!([
+            { "id": "100", "type": "tab", "label": "Flow 1" },
+            { "id": "1", "z": "100", "type": "test-once" }
+        ]);
+        let engine = build_test_engine(flows_json).unwrap();
+        engine.start().await.unwrap();
+        for payload in ["foo", "bar"] {
+            let msgs_to_inject_json = serde_json::json!([["1", {"payload": payload}]]);
+            let msgs_to_inject = Vec::<(ElementId, Msg)>::deserialize(msgs_to_inject_json).unwrap();
+            let msgs = engine.run_with_inject(1, Duration::from_millis(200), msgs_to_inject).await.unwrap();
+            assert_eq!(msgs.len(), 1);
+            assert_eq!(msgs[0].as_variant_object().get("payload").unwrap(), &Variant::from(payload));
+        }
+        engine.stop().await.unwrap();
+    }
+
     #[tokio::test]
     async fn test_it_should_load_and_run_simple_json_without_configuration() {
         let flows_json = make_simple_flows_json();
@@ -27,6 +27,12 @@ impl WeakEnvs {
     pub fn upgrade(&self) -> Option<Envs> {
         Weak::upgrade(&self.inner).map(|x| Envs { inner: x })
     }
+
+    /// Whether this is a reference to `envs`, the store is never mutated after it is built, so the same store means
+    /// the same variables
+    pub fn refers_to(&self, envs: &Envs) -> bool {
+        std::ptr::eq(self.inner.as_ptr(), Arc::as_ptr(&envs.inner))
+    }
 }
 
 #[derive(Debug)]
@@ -4,10 +4,17 @@ use rquickjs::function::{Constructor, This};
 use rquickjs::{Ctx, Function, IntoJs, Value};
 
 pub fn deep_clone<'js>(ctx: Ctx<'js>, obj: Value<'js>) -> rquickjs::Result<Value<'js>> {
+    if obj.as_object().is_none() {
+        return Ok(obj);
+    }
+    // Look up the `Date` constructor once for the whole tree instead of once per nested object
+    let date_ctor: Constructor = ctx.globals().get("Date")?;
+    deep_clone_with(&ctx, &date_ctor, obj)
+}
+
+fn deep_clone_with<'js>(ctx: &Ctx<'js>, date_ctor: &Constructor<'js>, obj: Value<'js>) -> rquickjs::Result<Value<'js>> {
     if let Some(obj_ref) = obj.as_object() {
-        let globals = ctx.globals();
-        let date_ctor: Constructor = globals.get("Date")?;
-        if obj_ref.is_instance_of(&date_ctor) {
+        if obj_ref.is_instance_of(date_ctor) {
             let get_time_fn: Function = obj_ref.get("getTime")?;
             let time: i64 = get_time_fn.call((This(&obj),))?;
             return date_ctor.construct((time,));
@@ -16,10 +23,10 @@ pub fn deep_clone<'js>(ctx: Ctx<'js>, obj: Value<'js>) -> rquickjs::Result<Value
         if let Some(src_arr) = obj_ref.as_array() {
             let mut arr_copy = Vec::with_capacity(src_arr.len());
             for item in src_arr.iter() {
-                let cloned = deep_clone(ctx.clone(), item?)?;
+                let cloned = deep_clone_with(ctx, date_ctor, item?)?;
                 arr_copy.push(cloned);
             }
-            return arr_copy.into_js(&ctx);
+            return arr_copy.into_js(ctx);
         }
 
         {
@@ -29,10 +36,10 @@ pub fn deep_clone<'js>(ctx: Ctx<'js>, obj: Value<'js>) -> rquickjs::Result<Value
                 let (k, v) = item?;
                 let has: bool = has_own_property_fn.call((This(&obj), k.as_str()))?;
                 if has {
-                    obj_copy.insert(k, deep_clone(ctx.clone(), v)?);
+                    obj_copy.insert(k, deep_clone_with(ctx, date_ctor, v)?);
                 }
             }
-            obj_copy.into_js(&ctx)
+            obj_copy.into_js(ctx)
         }
     } else {
         Ok(obj)
@@ -53,6 +53,15 @@ pub struct PortWire {
 
 impl PortWire {
     pub async fn tx(&self, msg: MsgHandle, cancel: CancellationToken) -> crate::Result<()> {
+        // Fast path: the receiver usually has room, so hand the message over without setting up a cancellable wait
+        let msg = match self.msg_sender.try_send(msg) {
+            Ok(()) => return Ok(()),
+            Err(mpsc::error::TrySendError::Full(msg)) => msg,
+            Err(e @ mpsc::error::TrySendError::Closed(_)) => {
+                return Err(crate::EdgelinkError::InvalidOperation(format!("Failed to transmit message: {}", e)).into());
+            }
+        };
+
         tokio::select! {
 
             send_result = self.msg_sender.send(msg) =>  send_result.map_err(|e|
@@ -316,8 +316,16 @@ impl<'js> js::FromJs<'js> for Msg {
 #[cfg(feature = "js")]
 impl<'js> js::IntoJs<'js> for Msg {
     fn into_js(self, ctx: &js::Ctx<'js>) -> js::Result<js::Value<'js>> {
+        self.to_js(ctx)
+    }
+}
+
+#[cfg(feature = "js")]
+impl Msg {
+    /// Converts the message into a JS object without cloning it first.
+    pub fn to_js<'js>(&self, ctx: &js::Ctx<'js>) -> js::Result<js::Value<'js>> {
         let msg_id = self.id();
-        let jsv = self.body.into_js(ctx)?;
+        let jsv = self.body.to_js(ctx)?;
         let obj = jsv.as_object().unwrap();
         if let Some(msg_id) = msg_id {
             let msgid_atom = wellknown::MSG_ID_PROPERTY.into_js(ctx)?;
@@ -123,6 +123,17 @@ impl PropexSegment<'_> {
             _ => None,
         }
     }
+
+    /// Detach the segment from the parsed expression, so it can be kept around after the expression is dropped.
+    pub fn into_owned(self) -> PropexSegment<'static> {
+        match self {
+            PropexSegment::Index(index) => PropexSegment::Index(index),
+            PropexSegment::Property(prop) => PropexSegment::Property(Cow::Owned(prop.into_owned())),
+            PropexSegment::Nested(nested) => {
+                PropexSegment::Nested(nested.into_iter().map(PropexSegment::into_owned).collect())
+            }
+        }
+    }
 }
 
 pub fn token<'a, O, E: ParseError<&'a str>, G>(input: G) -> impl FnMut(&'a str) -> IResult<&'a str, O, E>
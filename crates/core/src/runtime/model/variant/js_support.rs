@@ -101,14 +101,29 @@ impl<'js> js::FromJs<'js> for Variant {
 #[cfg(feature = "js")]
 impl<'js> js::IntoJs<'js> for Variant {
     fn into_js(self, ctx: &js::Ctx<'js>) -> js::Result<js::Value<'js>> {
+        self.to_js(ctx)
+    }
+}
+
+#[cfg(feature = "js")]
+impl Variant {
+    /// Converts the variant into a JS value without cloning it first.
+    pub fn to_js<'js>(&self, ctx: &js::Ctx<'js>) -> js::Result<js::Value<'js>> {
         use js::function::Constructor;
+        use js::IntoJs;
 
         match self {
-            Variant::Array(arr) => arr.into_js(ctx),
+            Variant::Array(arr) => {
+                let js_arr = js::Array::new(ctx.clone())?;
+                for (i, item) in arr.iter().enumerate() {
+                    js_arr.set(i, item.to_js(ctx)?)?;
+                }
+                js_arr.into_js(ctx)
+            }
 
-            Variant::Bool(b) => b.into_js(ctx),
+            Variant::Bool(b) => (*b).into_js(ctx),
 
-            Variant::Bytes(bytes) => Ok(js::ArrayBuffer::new(ctx.clone(), bytes)?.into_value()),
+            Variant::Bytes(bytes) => Ok(js::ArrayBuffer::new(ctx.clone(), bytes.clone())?.into_value()),
 
             Variant::Number(num) => {
                 if let Some(f) = num.as_f64() {
@@ -124,11 +139,17 @@ impl<'js> js::IntoJs<'js> for Variant {
 
             Variant::Null => Ok(js::Value::new_null(ctx.clone())),
 
-            Variant::Object(map) => map.into_js(ctx),
+            Variant::Object(map) => {
+                let js_obj = js::Object::new(ctx.clone())?;
+                for (k, v) in map.iter() {
+                    js_obj.set(k.as_str(), v.to_js(ctx)?)?;
+                }
+                js_obj.into_js(ctx)
+            }
 
-            Variant::String(s) => s.into_js(ctx),
+            Variant::String(s) => s.as_str().into_js(ctx),
 
-            Variant::Date(t) => t.into_js(ctx),
+            Variant::Date(t) => (*t).into_js(ctx),
 
             Variant::Regexp(re) => {
                 let global = ctx.globals();
@@ -23,9 +23,9 @@ impl FlowNodeBehavior for TestOnceNode {
     }
 
     async fn run(self: Arc<Self>, stop_token: CancellationToken) {
+        // The engine outlives its nodes, so there is no need to upgrade it again for every message
+        let engine = self.engine().expect("The engine cannot be released");
         while !stop_token.is_cancelled() {
-            let engine = self.engine().expect("The engine cannot be released");
-
             match self.recv_msg(stop_token.clone()).await {
                 Ok(msg) => engine.recv_final_msg(msg).expect("Shoud send final msg to the engine"),
                 Err(e) => {
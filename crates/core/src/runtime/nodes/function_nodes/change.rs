@@ -1,9 +1,10 @@
-use std::sync::Arc;
+use std::sync::{Arc, RwLock};
 
 use regex::Regex;
 use serde::Deserialize;
 use serde_json::Value;
 
+use crate::runtime::env::WeakEnvs;
 use crate::runtime::eval;
 use crate::runtime::flow::Flow;
 use crate::runtime::model::*;
@@ -58,6 +59,81 @@ struct Rule {
     #[serde(default, rename = "dc")]
     pub deep_clone: bool,
     */
+    /// The parsed path of `p`, if it is a static message property path
+    #[serde(skip)]
+    pub p_path: Option<Vec<propex::PropexSegment<'static>>>,
+
+    /// The parsed path of `to`, if it is a static message property path
+    #[serde(skip)]
+    pub to_path: Option<Vec<propex::PropexSegment<'static>>>,
+
+    /// The evaluated `to`, if it is a constant
+    #[serde(skip)]
+    pub to_value: Option<Variant>,
+
+    /// The evaluated `from`, if it is a constant
+    #[serde(skip)]
+    pub from_value: Option<Variant>,
+
+    /// The resolved `to` environment variable
+    #[serde(skip)]
+    pub to_env: EnvCache,
+
+    /// The resolved `from` environment variable
+    #[serde(skip)]
+    pub from_env: EnvCache,
+}
+
+/// An environment variable resolved by a rule, together with the environment store it was resolved from.
+///
+/// The value is only reused while the node still has the same store, a redeploy builds new ones. Failed lookups are
+/// not cached, so a variable defined later is still picked up.
+#[derive(Debug, Default)]
+struct EnvCache(RwLock<Option<(WeakEnvs, Variant)>>);
+
+impl Clone for EnvCache {
+    fn clone(&self) -> Self {
+        // A cloned rule resolves its variables again
+        Self::default()
+    }
+}
+
+impl Rule {
+    /// Parse the message property paths and evaluate the constant values once at build time instead of for every
+    /// message.
+    fn compile(&mut self) {
+        if self.pt == RedPropertyType::Msg {
+            self.p_path = parse_static_msg_path(&self.p);
+        }
+        if let (Some(RedPropertyType::Msg), Some(to)) = (self.tot, self.to.as_ref()) {
+            self.to_path = parse_static_msg_path(to);
+        }
+        self.to_value = evaluate_constant(self.to.as_deref(), self.tot);
+        self.from_value = evaluate_constant(self.from.as_deref(), self.fromt);
+    }
+}
+
+fn evaluate_constant(value: Option<&str>, value_type: Option<RedPropertyType>) -> Option<Variant> {
+    match (value, value_type) {
+        (Some(value), Some(vt)) if vt.is_constant() || vt == RedPropertyType::Re => {
+            // Leave the invalid ones to the per-message evaluation, which reports them
+            eval::evaluate_node_property_variant(&Variant::String(value.to_string()), &vt, None, None, None)
+                .ok()
+                .map(|x| x.into_owned())
+        }
+        _ => None,
+    }
+}
+
+fn parse_static_msg_path(expr: &str) -> Option<Vec<propex::PropexSegment<'static>>> {
+    let trimmed_expr = expr.trim_ascii();
+    let stripped_expr = trimmed_expr.strip_prefix("msg.").unwrap_or(trimmed_expr);
+    let path = propex::parse(stripped_expr).ok()?;
+    // Paths like `msg[msg.topic]` depend on the message, so they still have to be evaluated per message
+    if path.iter().any(|x| matches!(x, propex::PropexSegment::Nested(_))) {
+        return None;
+    }
+    Some(path.iter().cloned().map(propex::PropexSegment::into_owned).collect())
 }
 
 #[derive(Debug, Copy, Clone, PartialEq, Eq, PartialOrd)]
@@ -100,13 +176,20 @@ impl FlowNodeBehavior for ChangeNode {
 impl ChangeNode {
     fn build(_flow: &Flow, state: FlowNode, config: &RedFlowNodeConfig) -> crate::Result<Box<dyn FlowNodeBehavior>> {
         let json = handle_legacy_json(config.rest.clone())?;
-        let change_config = ChangeNodeConfig::deserialize(&json)?;
+        let mut change_config = ChangeNodeConfig::deserialize(&json)?;
+        for rule in change_config.rules.iter_mut() {
+            rule.compile();
+        }
         let node = ChangeNode { base: state, config: change_config };
         Ok(Box::new(node))
     }
 
     async fn get_to_value(&self, rule: &Rule, msg: &Msg) -> crate::Result<Variant> {
-        if let (Some(tot), Some(to)) = (rule.tot, rule.to.as_ref()) {
+        if let Some(to_value) = &rule.to_value {
+            Ok(to_value.clone())
+        } else if let (Some(RedPropertyType::Env), Some(to)) = (rule.tot, rule.to.as_ref()) {
+            self.get_cached_env(&rule.to_env, to)
+        } else if let (Some(tot), Some(to)) = (rule.tot, rule.to.as_ref()) {
             eval::evaluate_node_property(to, tot, Some(self), None, Some(msg)).await
         } else {
             Err(EdgelinkError::BadFlowsJson("The `tot` and `to` in the rule cannot be None".into()).into())
@@ -114,13 +197,51 @@ impl ChangeNode {
     }
 
     async fn get_from_value(&self, rule: &Rule, msg: &Msg) -> crate::Result<Variant> {
-        if let (Some(fromt), Some(from)) = (rule.fromt, rule.from.as_ref()) {
+        if let Some(from_value) = &rule.from_value {
+            Ok(from_value.clone())
+        } else if let (Some(RedPropertyType::Env), Some(from)) = (rule.fromt, rule.from.as_ref()) {
+            self.get_cached_env(&rule.from_env, from)
+        } else if let (Some(fromt), Some(from)) = (rule.fromt, rule.from.as_ref()) {
             eval::evaluate_node_property(from, fromt, Some(self), None, Some(msg)).await
         } else {
             Err(EdgelinkError::BadFlowsJson("The `fromt` and `from` in the rule cannot be None".into()).into())
         }
     }
 
+    fn get_cached_env(&self, cache: &EnvCache, name: &str) -> crate::Result<Variant> {
+        let envs = self.envs();
+        if let Ok(cached) = cache.0.read() {
+            if let Some((_, value)) = cached.as_ref().filter(|(x, _)| x.refers_to(envs)) {
+                return Ok(value.clone());
+            }
+        }
+        let value = eval::evaluate_node_property_variant(
+            &Variant::String(name.to_string()),
+            &RedPropertyType::Env,
+            Some(self),
+            None,
+            None,
+        )
+        .map(|x| x.into_owned())
+        .with_context(|| format!("Cannot find the environment variable `{}`", name))?;
+        if let Ok(mut cached) = cache.0.write() {
+            *cached = Some((envs.downgrade(), value.clone()));
+        }
+        Ok(value)
+    }
+
+    async fn get_property_value(&self, rule: &Rule, msg: &Msg) -> crate::Result<Variant> {
+        if let Some(path) = &rule.p_path {
+            msg.as_variant()
+                .get_segs(path)
+                .cloned()
+                .ok_or(EdgelinkError::BadArgument("value"))
+                .with_context(|| format!("Cannot get the property(s) from `msg`: {}", rule.p))
+        } else {
+            eval::evaluate_node_property(&rule.p, rule.pt, Some(self), None, Some(msg)).await
+        }
+    }
+
     fn reduce_from_value(&self, rule: &Rule, from_value: &Variant) -> crate::Result<ReducedType> {
         let result = match (from_value, rule.fromt) {
             (Variant::String(_), Some(_)) => ReducedType::Str,
@@ -143,10 +264,16 @@ impl ChangeNode {
     }
 
     async fn apply_rule(&self, rule: &Rule, msg: &mut Msg) -> crate::Result<()> {
-        let to_value = self.get_to_value(rule, msg).await.ok();
+        // Only `set` and `change` use the `to` value, `move` reads its source from `p` and `delete` needs none
         match rule.t {
-            RuleKind::Set => self.apply_rule_set(rule, msg, to_value).await,
-            RuleKind::Change => self.apply_rule_change(rule, msg, to_value).await,
+            RuleKind::Set => {
+                let to_value = self.get_to_value(rule, msg).await.ok();
+                self.apply_rule_set(rule, msg, to_value).await
+            }
+            RuleKind::Change => {
+                let to_value = self.get_to_value(rule, msg).await.ok();
+                self.apply_rule_change(rule, msg, to_value).await
+            }
             RuleKind::Delete => self.apply_rule_delete(rule, msg).await,
             RuleKind::Move => self.apply_rule_move(rule, msg).await,
         }
@@ -154,7 +281,7 @@ impl ChangeNode {
 
     async fn apply_rule_set(&self, rule: &Rule, msg: &mut Msg, to_value: Option<Variant>) -> crate::Result<()> {
         assert!(rule.t == RuleKind::Set);
-        self.set_property(&rule.p, rule.pt, to_value, msg).await
+        self.set_property(&rule.p, rule.p_path.as_deref(), rule.pt, to_value, msg).await
     }
 
     async fn apply_rule_change(&self, rule: &Rule, msg: &mut Msg, to_value: Option<Variant>) -> crate::Result<()> {
@@ -170,7 +297,7 @@ impl ChangeNode {
             Err(_) => return Ok(()),
         };
 
-        let current = match eval::evaluate_node_property(&rule.p, rule.pt, Some(self), None, Some(msg)).await {
+        let current = match self.get_property_value(rule, msg).await {
             Ok(v) => v,
             Err(_) => return Ok(()),
         };
@@ -203,7 +330,7 @@ impl ChangeNode {
                 {
                     // str representation of exact from number/boolean
                     // only replace if they match exactly
-                    msg.set_nav_stripped(&rule.p, to_value, false)?;
+                    set_msg_property(msg, &rule.p, rule.p_path.as_deref(), to_value, false)?;
                 }
 
                 (Variant::String(ref current_str), ReducedType::Regex) => {
@@ -215,22 +342,22 @@ impl ChangeNode {
                         (Some(RedPropertyType::Bool), "false") => to_value,
                         _ => Variant::String(replaced.into()),
                     };
-                    msg.set_nav_stripped(&rule.p, value_to_set, false)?;
+                    set_msg_property(msg, &rule.p, rule.p_path.as_deref(), value_to_set, false)?;
                 }
 
                 (Variant::String(ref current_str), _) => {
                     // Otherwise we search and replace
                     // TODO: In the future, this string needs to be optimized.
                     let replaced = current_str.replace(&from_value.to_string()?, &to_value.to_string()?);
-                    msg.set_nav_stripped(&rule.p, Variant::String(replaced), false)?;
+                    set_msg_property(msg, &rule.p, rule.p_path.as_deref(), Variant::String(replaced), false)?;
                 }
 
                 (Variant::Number(_), ReducedType::Num) if from_value == current => {
-                    msg.set_nav_stripped(&rule.p, to_value, false)?;
+                    set_msg_property(msg, &rule.p, rule.p_path.as_deref(), to_value, false)?;
                 }
 
                 (Variant::Bool(_), ReducedType::Bool) if from_value == current => {
-                    msg.set_nav_stripped(&rule.p, to_value, false)?;
+                    set_msg_property(msg, &rule.p, rule.p_path.as_deref(), to_value, false)?;
                 }
 
                 _ => {
@@ -329,7 +456,7 @@ impl ChangeNode {
 
     async fn apply_rule_delete(&self, rule: &Rule, msg: &mut Msg) -> crate::Result<()> {
         assert!(rule.t == RuleKind::Delete);
-        self.delete_property(&rule.p, rule.pt, msg).await
+        self.delete_property(&rule.p, rule.p_path.as_deref(), rule.pt, msg).await
     } // apply_rule_delete
 
     async fn apply_rule_move(&self, rule: &Rule, msg: &mut Msg) -> crate::Result<()> {
@@ -350,13 +477,13 @@ impl ChangeNode {
         };
 
         // let target_prop = rule.to.as_ref().unwrap().as_str();
-        let current = match eval::evaluate_node_property(&rule.p, rule.pt, Some(self), None, Some(msg)).await {
+        let current = match self.get_property_value(rule, msg).await {
             Ok(v) => v,
             Err(_) => return Ok(()),
         };
         // Remove the from side
-        self.set_property(&rule.p, rule.pt, None, msg).await?;
-        self.set_property(to, tot, Some(current), msg).await
+        self.set_property(&rule.p, rule.p_path.as_deref(), rule.pt, None, msg).await?;
+        self.set_property(to, rule.to_path.as_deref(), tot, Some(current), msg).await
     } // apply_rule_move
 
     fn get_context_by_property_type(&self, pt: RedPropertyType) -> crate::Result<Arc<Context>> {
@@ -371,6 +498,7 @@ impl ChangeNode {
     async fn set_property(
         &self,
         target_prop: &str,
+        target_path: Option<&[propex::PropexSegment<'static>]>,
         target_type: RedPropertyType,
         to_value: Option<Variant>,
         msg: &mut Msg,
@@ -379,7 +507,7 @@ impl ChangeNode {
             RedPropertyType::Msg => {
                 if let Some(to_value) = to_value {
                     log::info!("{} = {:?}", target_prop, &to_value);
-                    msg.set_nav_stripped(target_prop, to_value, true)?;
+                    set_msg_property(msg, target_prop, target_path, to_value, true)?;
                 } else {
                     // Equals the `undefined` in JS
                     if msg.contains(target_prop) {
@@ -413,11 +541,20 @@ impl ChangeNode {
         }
     }
 
-    async fn delete_property(&self, prop: &str, prop_type: RedPropertyType, msg: &mut Msg) -> crate::Result<()> {
+    async fn delete_property(
+        &self,
+        prop: &str,
+        prop_path: Option<&[propex::PropexSegment<'static>]>,
+        prop_type: RedPropertyType,
+        msg: &mut Msg,
+    ) -> crate::Result<()> {
         match prop_type {
             RedPropertyType::Msg => {
-                let _ = msg
-                    .remove_nav(prop)
+                let removed = match prop_path {
+                    Some(path) => msg.as_variant_object_mut().remove_segs_property(path),
+                    None => msg.remove_nav(prop),
+                };
+                let _ = removed
                     .ok_or(EdgelinkError::NotSupported(format!("cannot remove the property '{}' in the msg", prop)))?;
                 Ok(())
             }
@@ -437,6 +574,19 @@ impl ChangeNode {
     } // apply_rule_delete
 }
 
+fn set_msg_property(
+    msg: &mut Msg,
+    prop: &str,
+    path: Option<&[propex::PropexSegment<'static>]>,
+    value: Variant,
+    create_missing: bool,
+) -> crate::Result<()> {
+    match path {
+        Some(path) => msg.as_variant_mut().set_segs_property(path, value, create_missing),
+        None => msg.set_nav_stripped(prop, value, create_missing),
+    }
+}
+
 fn handle_legacy_json(n: Value) -> crate::Result<Value> {
     let mut rules: Vec<Value> = if let Some(Value::Array(existed_rules)) = n.get("rules") {
         existed_rules.to_vec()
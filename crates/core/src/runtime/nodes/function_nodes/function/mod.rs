@@ -101,8 +101,8 @@ impl FlowNodeBehavior for FunctionNode {
                 with_uow(this_node.clone().as_ref(), cancel.child_token(), |_, msg| async move {
                     let res = {
                         let msg_guard = msg.write().await;
-                        // This gonna eat the msg and produce a new one
-                        this_node.filter_msg(sub_ctx.clone(), msg_guard.clone()).await
+                        // The JS object is built straight from the guarded msg, the user function produces new ones
+                        this_node.filter_msg(sub_ctx.clone(), &msg_guard).await
                     };
                     match res {
                         Ok(changed_msgs) => {
@@ -198,11 +198,11 @@ impl FunctionNode {
     }
     */
 
-    async fn filter_msg<'js>(self: &Arc<Self>, ctx: js::Ctx<'js>, msg: Msg) -> crate::Result<OutputMsgs> {
+    async fn filter_msg<'js>(self: &Arc<Self>, ctx: js::Ctx<'js>, msg: &Msg) -> crate::Result<OutputMsgs> {
         let origin_msg_id = msg.id();
 
         let user_func: js::Function = ctx.globals().get("__el_user_func")?;
-        let js_msg = msg.into_js(&ctx)?;
+        let js_msg = msg.to_js(&ctx)?;
         let args = (js_msg,);
         let promised = user_func.call::<_, rquickjs::Promise>(args)?;
         let js_res_value: js::Result<js::Value> = promised.into_future().await;
@@ -421,4 +421,27 @@ mod tests {
             assert_eq!(msg["count"], "0".into());
         }
     }
+
+    #[tokio::test]
+    async fn test_it_should_copy_the_msg_sent_without_cloning() {
+        let flows_json = json!([
+            {"id": "100", "type": "tab"},
+            {"id": "1", "type": "function", "z": "100", "wires": [
+                ["2"]], "func": "node.send(msg, false); msg.payload = 'changed';"},
+            {"id": "2", "z": "100", "type": "test-once"},
+        ]);
+        let msgs_to_inject_json = json!([
+            ["1", {"payload": "foo", "topic": "bar"}],
+        ]);
+
+        let engine = crate::runtime::engine::build_test_engine(flows_json).unwrap();
+        let msgs_to_inject = Vec::<(ElementId, Msg)>::deserialize(msgs_to_inject_json).unwrap();
+        let msgs =
+            engine.run_once_with_inject(1, std::time::Duration::from_secs_f64(0.2), msgs_to_inject).await.unwrap();
+
+        // Unlike Node-RED, the message is copied when it leaves JS, a later change of `msg` is not sent
+        assert_eq!(msgs.len(), 1);
+        assert_eq!(msgs[0]["payload"], "foo".into());
+        assert_eq!(msgs[0]["topic"], "bar".into());
+    }
 }
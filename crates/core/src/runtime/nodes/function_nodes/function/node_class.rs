@@ -3,8 +3,6 @@ use std::sync::{Arc, Weak};
 use rquickjs::{class::Trace, prelude::Opt, Ctx, FromJs, IntoJs, Value};
 use tokio_util::sync::CancellationToken;
 
-use crate::runtime::js::util;
-
 use super::*;
 
 #[derive(Clone, Trace)]
@@ -54,10 +52,16 @@ impl NodeClass {
     }
 
     #[qjs(rename = "send")]
-    fn send<'js>(self, msgs: Value<'js>, cloning: Opt<bool>, ctx: Ctx<'js>) -> rquickjs::Result<()> {
-        let cloning = cloning.unwrap_or(true);
+    fn send<'js>(
+        self,
+        msgs: Value<'js>,
+        // Ignored: skipping the JS clone is only safe because `Msg::from_js()` always copies `msgs`, so the sent
+        // messages never share anything with the JS objects, even with `cloning` set to `false`.
+        _cloning: Opt<bool>,
+        ctx: Ctx<'js>,
+    ) -> rquickjs::Result<()> {
         let async_ctx = ctx.clone();
-        if let Err(err) = self.send_msgs_internal(async_ctx, msgs, cloning) {
+        if let Err(err) = self.send_msgs_internal(async_ctx, msgs) {
             // TODO report error
             log::warn!("Failed to send msg(s): {}", err);
         }
@@ -65,7 +69,7 @@ impl NodeClass {
     }
 
     #[qjs(skip)]
-    fn send_msgs_internal<'js>(&self, ctx: Ctx<'js>, msgs: rquickjs::Value<'js>, cloning: bool) -> crate::Result<()> {
+    fn send_msgs_internal<'js>(&self, ctx: Ctx<'js>, msgs: rquickjs::Value<'js>) -> crate::Result<()> {
         let node = self.node.upgrade().clone().ok_or(rquickjs::Error::UnrelatedRuntime)? as Arc<dyn FlowNodeBehavior>;
 
         match msgs.type_of() {
@@ -73,7 +77,6 @@ impl NodeClass {
                 let mut msgs_to_send = SmallVec::new();
                 let ports = msgs.as_array().expect("Must be an array");
                 // The first-level array is bound to a port.
-                let mut is_first = true;
                 for (port, msgs_in_port) in ports.iter().enumerate() {
                     let msgs_in_port: Value<'js> = msgs_in_port?;
                     if let Some(msgs_in_port) = msgs_in_port.as_array() {
@@ -81,22 +84,13 @@ impl NodeClass {
                         for msg in msgs_in_port.iter() {
                             let msg: Value<'js> = msg?;
                             if msg.is_object() {
-                                let msg_value =
-                                    if cloning && is_first { util::deep_clone(ctx.clone(), msg)? } else { msg };
-                                is_first = false;
-                                let envelope = Envelope { port, msg: MsgHandle::new(Msg::from_js(&ctx, msg_value)?) };
+                                let envelope = Envelope { port, msg: MsgHandle::new(Msg::from_js(&ctx, msg)?) };
                                 msgs_to_send.push(envelope);
                             }
                         }
                     } else if msgs_in_port.is_object() {
                         // This port has only one msg
-                        let msg_value = if cloning && is_first {
-                            util::deep_clone(ctx.clone(), msgs_in_port)?
-                        } else {
-                            msgs_in_port
-                        };
-                        is_first = false;
-                        let envelope = Envelope { port, msg: MsgHandle::new(Msg::from_js(&ctx, msg_value)?) };
+                        let envelope = Envelope { port, msg: MsgHandle::new(Msg::from_js(&ctx, msgs_in_port)?) };
                         msgs_to_send.push(envelope);
                     } else {
                         log::warn!("Unknown msg type: {}", port);
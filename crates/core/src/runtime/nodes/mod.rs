@@ -167,12 +167,20 @@ pub trait FlowNodeBehavior: Send + Sync + FlowsElement {
 
         let port = &self.get_node().ports[envelope.port];
 
-        let mut msg_sent = false;
-        for wire in port.wires.iter() {
-            let msg_to_send = if msg_sent { envelope.msg.deep_clone(true).await } else { envelope.msg.clone() };
+        // Only a fan-out needs cloning, the first wire always gets the original message.
+        // The copies are taken before the original is handed over, or a downstream node could modify it in between.
+        let (first_wire, other_wires) = match port.wires.split_first() {
+            Some(x) => x,
+            None => return Ok(()),
+        };
+        let mut clones: SmallVec<[MsgHandle; 4]> = SmallVec::with_capacity(other_wires.len());
+        for _ in other_wires.iter() {
+            clones.push(envelope.msg.deep_clone(true).await);
+        }
 
+        first_wire.tx(envelope.msg, cancel.clone()).await?;
+        for (wire, msg_to_send) in other_wires.iter().zip(clones) {
             wire.tx(msg_to_send, cancel.clone()).await?;
-            msg_sent = true;
         }
         Ok(())
     }
@@ -1,5 +1,5 @@
 use pyo3::prelude::*;
-use pyo3::types::{PyBool, PyDict, PyFloat, PyInt, PyList, PyString, PyTuple};
+use pyo3::types::{PyBool, PyBytes, PyDict, PyFloat, PyInt, PyList, PyMapping, PyString, PyTuple};
 use serde_json::{Map, Value};
 
 pub fn py_object_to_json_value(obj: &PyAny) -> PyResult<Value> {
@@ -33,11 +33,30 @@ pub fn py_object_to_json_value(obj: &PyAny) -> PyResult<Value> {
         Ok(serde_json::json!(num))
     } else if let Ok(string) = obj.downcast::<PyString>() {
         Ok(Value::String(string.extract::<String>()?))
+    } else if let Ok(mapping) = obj.downcast::<PyMapping>() {
+        // Read-only mappings such as `types.MappingProxyType`
+        let mut json_map = Map::new();
+        for item in mapping.items()?.iter() {
+            let (key, value) = item.extract::<(String, &PyAny)>()?;
+            json_map.insert(key, py_object_to_json_value(value)?);
+        }
+        Ok(Value::Object(json_map))
     } else {
         Ok(Value::Null)
     }
 }
 
+/// Like `py_object_to_json_value()`, but also accepts already serialized JSON `bytes`, which are parsed directly
+/// instead of walking the Python objects.
+pub fn py_json_to_json_value(obj: &PyAny) -> PyResult<Value> {
+    if let Ok(bytes) = obj.downcast::<PyBytes>() {
+        serde_json::from_slice(bytes.as_bytes())
+            .map_err(|e| PyErr::new::<pyo3::exceptions::PyValueError, _>(format!("{}", e)))
+    } else {
+        py_object_to_json_value(obj)
+    }
+}
+
 pub fn json_value_to_py_object(py: Python, value: &Value) -> PyResult<PyObject> {
     match value {
         Value::Null => Ok(py.None()),
@@ -63,7 +82,8 @@ pub fn json_value_to_py_object(py: Python, value: &Value) -> PyResult<PyObject>
         Value::Object(obj) => {
             let dict = PyDict::new(py);
             for (key, value) in obj {
-                let py_key = PyString::new(py, key);
+                // Message property names like `payload` and `topic` repeat in every msg, so let Python share them
+                let py_key = PyString::intern(py, key);
                 let py_value = json_value_to_py_object(py, value)?;
                 dict.set_item(py_key, py_value)?;
             }
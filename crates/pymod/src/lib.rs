@@ -1,14 +1,20 @@
 use edgelink_core::runtime::model::{ElementId, Msg};
+use pyo3::types::PyBytes;
 use pyo3::{prelude::*, wrap_pyfunction};
 use serde::Deserialize;
+use std::sync::OnceLock;
 
 use edgelink_core::runtime::engine::Engine;
+use edgelink_core::runtime::registry::RegistryHandle;
 mod json;
 
 #[pymodule]
 fn edgelink_pymod(_py: Python, m: &PyModule) -> PyResult<()> {
     m.add_function(wrap_pyfunction!(rust_sleep, m)?)?;
     m.add_function(wrap_pyfunction!(run_flows_once, m)?)?;
+    m.add_function(wrap_pyfunction!(run_flow, m)?)?;
+    m.add_function(wrap_pyfunction!(load_flows, m)?)?;
+    m.add_class::<FlowsEngine>()?;
 
     let stderr = log4rs::append::console::ConsoleAppender::builder()
         .target(log4rs::append::console::Target::Stderr)
@@ -34,21 +40,21 @@ fn rust_sleep(py: Python) -> PyResult<&PyAny> {
     })
 }
 
-#[pyfunction]
-fn run_flows_once<'a>(
-    py: Python<'a>,
-    _expected_msgs: usize,
-    _timeout: f64,
-    py_json: &'a PyAny,
-    msgs_json: &'a PyAny,
-    app_cfg: &'a PyAny,
-) -> PyResult<&'a PyAny> {
-    let flows_json = json::py_object_to_json_value(py_json)?;
-    let msgs_to_inject = {
-        let json_msgs = json::py_object_to_json_value(msgs_json)?;
-        Vec::<(ElementId, Msg)>::deserialize(json_msgs)
-            .map_err(|e| PyErr::new::<pyo3::exceptions::PyRuntimeError, _>(format!("{}", e)))?
-    };
+/// The built-in node types are fixed once the module is loaded, so every loaded flows share a single registry.
+static BUILTIN_REGISTRY: OnceLock<RegistryHandle> = OnceLock::new();
+
+fn builtin_registry() -> PyResult<&'static RegistryHandle> {
+    if let Some(registry) = BUILTIN_REGISTRY.get() {
+        return Ok(registry);
+    }
+    let registry = edgelink_core::runtime::registry::RegistryBuilder::default()
+        .build()
+        .map_err(|e| PyErr::new::<pyo3::exceptions::PyRuntimeError, _>(format!("{}", e)))?;
+    Ok(BUILTIN_REGISTRY.get_or_init(|| registry))
+}
+
+fn build_engine(py_json: &PyAny, app_cfg: &PyAny) -> PyResult<Engine> {
+    let flows_json = json::py_json_to_json_value(py_json)?;
     let app_cfg = {
         if !app_cfg.is_none() {
             let app_cfg_json = json::py_object_to_json_value(app_cfg)?;
@@ -60,25 +66,131 @@ fn run_flows_once<'a>(
         }
     };
 
-    let registry = edgelink_core::runtime::registry::RegistryBuilder::default()
-        .build()
-        .map_err(|e| PyErr::new::<pyo3::exceptions::PyRuntimeError, _>(format!("{}", e)))?;
+    Engine::with_json(builtin_registry()?, flows_json, app_cfg.as_ref())
+        .map_err(|e| PyErr::new::<pyo3::exceptions::PyRuntimeError, _>(format!("{}", e)))
+}
 
-    let engine = Engine::with_json(&registry, flows_json, app_cfg.as_ref())
-        .map_err(|e| PyErr::new::<pyo3::exceptions::PyRuntimeError, _>(format!("{}", e)))?;
+fn msgs_to_inject_from_py(msgs_json: &PyAny) -> PyResult<Vec<(ElementId, Msg)>> {
+    let json_msgs = json::py_json_to_json_value(msgs_json)?;
+    Vec::<(ElementId, Msg)>::deserialize(json_msgs)
+        .map_err(|e| PyErr::new::<pyo3::exceptions::PyRuntimeError, _>(format!("{}", e)))
+}
+
+fn msgs_to_py(msgs: &[Msg]) -> PyResult<PyObject> {
+    let result_value =
+        serde_json::to_value(msgs).map_err(|e| PyErr::new::<pyo3::exceptions::PyRuntimeError, _>(format!("{}", e)))?;
+
+    Python::with_gil(|py| {
+        let pyo = json::json_value_to_py_object(py, &result_value)?;
+        Ok(pyo.to_object(py))
+    })
+}
+
+/// Returns the messages serialized as JSON `bytes`, which the caller decodes in one go,
+/// instead of building the Python objects value by value.
+fn msgs_to_py_bytes(msgs: &[Msg]) -> PyResult<PyObject> {
+    let bytes =
+        serde_json::to_vec(msgs).map_err(|e| PyErr::new::<pyo3::exceptions::PyRuntimeError, _>(format!("{}", e)))?;
+    Python::with_gil(|py| Ok(PyBytes::new(py, &bytes).to_object(py)))
+}
+
+#[pyfunction]
+fn run_flows_once<'a>(
+    py: Python<'a>,
+    _expected_msgs: usize,
+    _timeout: f64,
+    py_json: &'a PyAny,
+    msgs_json: &'a PyAny,
+    app_cfg: &'a PyAny,
+) -> PyResult<&'a PyAny> {
+    let msgs_to_inject = msgs_to_inject_from_py(msgs_json)?;
+    let engine = build_engine(py_json, app_cfg)?;
 
     pyo3_asyncio::tokio::future_into_py(py, async move {
         let msgs = engine
             .run_once_with_inject(_expected_msgs, std::time::Duration::from_secs_f64(_timeout), msgs_to_inject)
             .await
             .map_err(|e| PyErr::new::<pyo3::exceptions::PyRuntimeError, _>(format!("{}", e)))?;
+        msgs_to_py(&msgs)
+    })
+}
 
-        let result_value = serde_json::to_value(&msgs)
+/// Like `run_flows_once()`, but the flows and the messages are exchanged as JSON `bytes` both ways.
+#[pyfunction]
+fn run_flow<'a>(
+    py: Python<'a>,
+    flows_json: &'a PyBytes,
+    msgs_json: &'a PyBytes,
+    expected_msgs: usize,
+    timeout: f64,
+    app_cfg: &'a PyAny,
+) -> PyResult<&'a PyAny> {
+    let msgs_to_inject = msgs_to_inject_from_py(msgs_json)?;
+    let engine = build_engine(flows_json, app_cfg)?;
+
+    pyo3_asyncio::tokio::future_into_py(py, async move {
+        let msgs = engine
+            .run_once_with_inject(expected_msgs, std::time::Duration::from_secs_f64(timeout), msgs_to_inject)
+            .await
             .map_err(|e| PyErr::new::<pyo3::exceptions::PyRuntimeError, _>(format!("{}", e)))?;
+        msgs_to_py_bytes(&msgs)
+    })
+}
+
+/// Load the flows once, the returned engine can be started and fed with messages many times.
+#[pyfunction]
+fn load_flows(py_json: &PyAny, app_cfg: &PyAny) -> PyResult<FlowsEngine> {
+    Ok(FlowsEngine { engine: build_engine(py_json, app_cfg)? })
+}
+
+#[pyclass]
+struct FlowsEngine {
+    engine: Engine,
+}
 
-        Python::with_gil(|py| {
-            let pyo = json::json_value_to_py_object(py, &result_value)?;
-            Ok(pyo.to_object(py))
+#[pymethods]
+impl FlowsEngine {
+    fn start<'a>(&self, py: Python<'a>) -> PyResult<&'a PyAny> {
+        let engine = self.engine.clone();
+        pyo3_asyncio::tokio::future_into_py(py, async move {
+            engine.start().await.map_err(|e| PyErr::new::<pyo3::exceptions::PyRuntimeError, _>(format!("{}", e)))
         })
-    })
+    }
+
+    fn stop<'a>(&self, py: Python<'a>) -> PyResult<&'a PyAny> {
+        let engine = self.engine.clone();
+        pyo3_asyncio::tokio::future_into_py(py, async move {
+            engine.stop().await.map_err(|e| PyErr::new::<pyo3::exceptions::PyRuntimeError, _>(format!("{}", e)))
+        })
+    }
+
+    /// Empty the flow and global context variables, so the next run starts from clean stores.
+    fn clear_contexts<'a>(&self, py: Python<'a>) -> PyResult<&'a PyAny> {
+        let context_manager = self.engine.get_context_manager().clone();
+        pyo3_asyncio::tokio::future_into_py(py, async move {
+            context_manager
+                .clear_all()
+                .await
+                .map_err(|e| PyErr::new::<pyo3::exceptions::PyRuntimeError, _>(format!("{}", e)))
+        })
+    }
+
+    /// Feed the started flows with the messages and collect the final ones, exchanged as JSON `bytes` both ways.
+    fn run_with_inject_json<'a>(
+        &self,
+        py: Python<'a>,
+        expected_msgs: usize,
+        timeout: f64,
+        msgs_json: &'a PyBytes,
+    ) -> PyResult<&'a PyAny> {
+        let msgs_to_inject = msgs_to_inject_from_py(msgs_json)?;
+        let engine = self.engine.clone();
+        pyo3_asyncio::tokio::future_into_py(py, async move {
+            let msgs = engine
+                .run_with_inject(expected_msgs, std::time::Duration::from_secs_f64(timeout), msgs_to_inject)
+                .await
+                .map_err(|e| PyErr::new::<pyo3::exceptions::PyRuntimeError, _>(format!("{}", e)))?;
+            msgs_to_py_bytes(&msgs)
+        })
+    }
 }
@@ -1,12 +1,31 @@
 import asyncio
-import json
+import collections
+import contextlib
+import hashlib
 import os
 import platform
-import subprocess
-import signal
-import copy
+import warnings
 import pytest
 import importlib.util
+import orjson
+from types import MappingProxyType
+
+__all__ = (
+    "TEST_EDGELINLKD_CONFIG",
+    "EdgelinkError",
+    "edgelink",
+    "dump_flows",
+    "TAB",
+    "SINK",
+    "SessionEngine",
+    "inject",
+    "run_with_single_node_ntimes",
+    "run_flow_with_msgs_ntimes",
+    "run_flows_with_multi_injections",
+    "run_single_node_with_msgs_ntimes",
+    "MsgView",
+    "msg_views",
+)
 
 TEST_EDGELINLKD_CONFIG = {
     "runtime": {
@@ -207,21 +226,71 @@ async def run_with_single_node_ntimes(payload_type: str | None, payload, node_js
         inject["payloadType"] = payload_type
     if topic != None:
         inject['props'].append({'p': 'topic', 'vt': 'str'})
-    user_node = copy.deepcopy(node_json)
-    user_node["id"] = "2"
-    user_node["z"] = "0"
+    user_node = {**node_json, "id": "2", "z": "0"}
     if 'wires' not in node_json:
         user_node["wires"] = [["3"]]
     console_node = {"id": "3", "type": "test-once", "z": "0"}
     final_flows_json = [{"id": "0", "type": "tab"},
                         inject, user_node, console_node]
-    msgs = await edgelink.run_flows_once(nexpected, 3.0, final_flows_json, [], TEST_EDGELINLKD_CONFIG)
-    return msgs
+    msgs_json = await edgelink.run_flow(dump_flows(final_flows_json), b'[]', nexpected, 3.0, TEST_EDGELINLKD_CONFIG)
+    return orjson.loads(msgs_json)
 
 
-async def run_flow_with_msgs_ntimes(flows_obj: list[object],
-                                    msgs: list[object] | None,
-                                    nexpected: int, injectee_node_id: str = '1', timeout: float = 3) -> list[object]:
+class MsgView:
+    """
+    Read-only view of an output message, `msg.payload` instead of `msg["payload"]`.
+
+    The well-known properties live in slots, an absent one raises `AttributeError`.
+    Any property is still reachable with `msg["name"]` and `"name" in msg`.
+    """
+    __slots__ = ('payload', 'topic', '_msgid', '_topic', '_rest')
+
+    def __init__(self, msg: dict):
+        rest = dict(msg)
+        for name in MsgView.__slots__[:-1]:
+            if name in rest:
+                object.__setattr__(self, name, rest.pop(name))
+        object.__setattr__(self, '_rest', rest)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"MsgView is read-only, can not set '{name}'")
+
+    def __getattr__(self, name):
+        # Only called for the names not found in the slots
+        try:
+            return self._rest[name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+    def __getitem__(self, key: str):
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def __contains__(self, key: str) -> bool:
+        return hasattr(self, key)
+
+
+def msg_views(msgs: list[dict]) -> list[MsgView]:
+    return [MsgView(msg) for msg in msgs]
+
+
+# The tab and `test-once` sink most test flows are built around. The flow pieces the tests share are read-only
+# `MappingProxyType`s, so every flow can alias them and each one only spells out what differs.
+TAB = MappingProxyType({"id": "100", "type": "tab"})
+SINK = MappingProxyType({"id": "2", "z": "100", "type": "test-once"})
+
+
+def _orjson_default(obj):
+    # The shared flow prototypes are read-only `MappingProxyType`s, which orjson does not know about
+    if isinstance(obj, MappingProxyType):
+        return dict(obj)
+    raise TypeError
+
+
+def _injections(msgs: list[object], injectee_node_id: str) -> list[tuple]:
+    """Returns the `(node_id, msg)` injections"""
     msgs_to_inject = []
     for msg in msgs:
         msg_injection = None
@@ -230,17 +299,192 @@ async def run_flow_with_msgs_ntimes(flows_obj: list[object],
         else:
             msg_injection = (injectee_node_id, msg)
         msgs_to_inject.append(msg_injection)
-    msgs = await edgelink.run_flows_once(nexpected, timeout, flows_obj, msgs_to_inject, TEST_EDGELINLKD_CONFIG)
-    return msgs
+    return msgs_to_inject
+
+
+def _make_injections(msgs: list[object], injectee_node_id: str) -> bytes:
+    """Returns the `(node_id, msg)` injections already serialized, the engine parses JSON bytes directly"""
+    return orjson.dumps(_injections(msgs, injectee_node_id), default=_orjson_default)
+
+
+def dump_flows(flows_obj: list[object] | tuple) -> bytes:
+    """
+    Serialize the flows once, typically into a module level constant.
+
+    The engine parses the JSON bytes directly instead of converting the Python objects for every run.
+    The keys are sorted, so the same flows always give the same bytes, and the same `SessionEngine` key.
+    """
+    return orjson.dumps(flows_obj, default=_orjson_default, option=orjson.OPT_SORT_KEYS)
+
+
+class _StartedFlows:
+    __slots__ = ('started', 'users', 'lock', 'used')
+
+    def __init__(self, started: asyncio.Future):
+        self.started = started
+        # Checkouts holding or waiting for `lock`, only the flows nobody waits for can be evicted
+        self.users = 0
+        self.lock = asyncio.Lock()
+        # Whether a checkout already ran on the started flows, the first one sees what `initialize` left
+        self.used = False
+
+
+class SessionEngine:
+    """
+    Keeps one running engine per distinct flows checked out of it, so the flows are loaded only once per session.
+
+    The flows are keyed by a digest of their JSON. Only the `MAX_FLOWS` most recently used ones are kept running,
+    the flows still checked out are never stopped. The flows a run failed on are dropped, their messages still in
+    flight could reach the next run. The checkouts of the same flows run one after another, and every checkout but
+    the first empties their context stores, so no test sees or wipes the contexts of another.
+    See the `engine` fixture in `conftest.py`.
+    """
+
+    MAX_FLOWS = 64
+
+    def __init__(self):
+        self._flows: collections.OrderedDict[bytes, _StartedFlows] = collections.OrderedDict()
+
+    @contextlib.asynccontextmanager
+    async def checkout(self, flows_obj: list[object] | bytes):
+        """Accepts the flows objects or the flows already serialized by `dump_flows()`, yields the started flows"""
+        flows_json = flows_obj if isinstance(flows_obj, bytes) else dump_flows(flows_obj)
+        key = hashlib.blake2b(flows_json, digest_size=16).digest()
+        entry = self._flows.get(key)
+        if entry is None:
+            entry = self._flows[key] = _StartedFlows(asyncio.ensure_future(self._start(flows_json)))
+        else:
+            self._flows.move_to_end(key)
+        entry.users += 1
+        try:
+            flow = await entry.started
+            async with entry.lock:
+                if entry.used:
+                    await flow.clear_contexts()
+                entry.used = True
+                yield flow
+        except BaseException:
+            # Neither the flows failing to start nor the ones a failed run may have left messages in flight in are
+            # kept, the next checkout starts them again
+            if self._flows.get(key) is entry:
+                del self._flows[key]
+            raise
+        finally:
+            entry.users -= 1
+            if entry.users == 0 and self._flows.get(key) is not entry:
+                await self._retire(entry)
+            await self._evict()
+
+    async def warmup(self, flows_list: list[list[object] | bytes], msgs: list[object]):
+        """Starts the flows concurrently and feeds every one of them with `msgs` once, ahead of the tests using them"""
+        async def _warmup(flows_obj):
+            async with self.checkout(flows_obj) as flow:
+                await inject(flow, msgs, len(msgs))
+        await asyncio.gather(*[_warmup(flows_obj) for flows_obj in flows_list])
+
+    async def stop(self):
+        entries = list(self._flows.values())
+        self._flows.clear()
+        results = await asyncio.gather(*[self._stop(entry) for entry in entries], return_exceptions=True)
+        errors = [result for result in results if isinstance(result, Exception)]
+        if errors:
+            raise ExceptionGroup(f"Failed to stop {len(errors)} of the {len(entries)} session flows", errors)
+
+    async def _evict(self):
+        # The least recently used flows nobody has checked out go first, the others wait for a later checkout
+        while len(self._flows) > self.MAX_FLOWS:
+            key = next((key for key, entry in self._flows.items() if entry.users == 0), None)
+            if key is None:
+                return
+            await self._retire(self._flows.pop(key))
+
+    async def _retire(self, entry: _StartedFlows):
+        """Stops the flows dropped from the session, if they ever started"""
+        if not entry.started.done() or entry.started.cancelled() or entry.started.exception() is not None:
+            return
+        try:
+            await self._stop(entry)
+        except Exception as e:
+            # Not the failure of the test which happened to trigger the stop
+            warnings.warn(f"Failed to stop the dropped flows: {e}")
+
+    @staticmethod
+    async def _stop(entry: _StartedFlows):
+        await (await entry.started).stop()
+
+    @staticmethod
+    async def _start(flows_json: bytes):
+        flow = edgelink.load_flows(flows_json, TEST_EDGELINLKD_CONFIG)
+        await flow.start()
+        return flow
+
+
+async def run_flow_with_msgs_ntimes(flows_obj: list[object] | bytes,
+                                    msgs: list[object] | None,
+                                    nexpected: int, injectee_node_id: str = '1', timeout: float = 3,
+                                    engine: SessionEngine | None = None, *, raw: bool = False) -> list[object]:
+    """
+    Inject `msgs` back-to-back and wait for the first `nexpected` messages reaching the `test-once` nodes.
+
+    Nothing is polled: the `test-once` nodes push into a channel the engine drains as the messages arrive,
+    `timeout` bounds the whole collection, not each message.
+
+    With `raw`, the flows and messages objects are handed to the engine as they are, without any JSON in between.
+    It only applies without an `engine`, which keeps its started flows by their JSON.
+    """
+    if raw and engine is None and not isinstance(flows_obj, bytes):
+        return await edgelink.run_flows_once(nexpected, timeout, flows_obj, _injections(msgs, injectee_node_id),
+                                             TEST_EDGELINLKD_CONFIG)
+    if engine is not None:
+        async with engine.checkout(flows_obj) as flow:
+            return await inject(flow, msgs, nexpected, injectee_node_id, timeout)
+    # Both the injected and the received messages cross the extension boundary as JSON bytes
+    msgs_to_inject = _make_injections(msgs, injectee_node_id)
+    flows_json = flows_obj if isinstance(flows_obj, bytes) else dump_flows(flows_obj)
+    msgs_json = await edgelink.run_flow(flows_json, msgs_to_inject, nexpected, timeout, TEST_EDGELINLKD_CONFIG)
+    return orjson.loads(msgs_json)
+
+
+async def run_flows_with_multi_injections(flows_obj: list[object] | bytes,
+                                          injections_list: list[list[object]],
+                                          nexpected: int, injectee_node_id: str = '1', timeout: float = 3,
+                                          engine: SessionEngine | None = None) -> list[list[object]]:
+    """
+    Starts the flows only once and runs the injection sets through them one after another.
+
+    Returns the received messages of each injection set, in the order of `injections_list`.
+    """
+    own_engine = engine is None
+    if own_engine:
+        engine = SessionEngine()
+    try:
+        async with engine.checkout(flows_obj) as flow:
+            return [await inject(flow, msgs, nexpected, injectee_node_id, timeout) for msgs in injections_list]
+    finally:
+        if own_engine:
+            await engine.stop()
+
+
+async def inject(flow, msgs: list[object], nexpected: int,
+                 injectee_node_id: str = '1', timeout: float = 3) -> list[object]:
+    """
+    Inject messages into the already running `flow` and wait for the outputs.
+
+    Every run on a `SessionEngine` flow goes through here, the flows checked out by `run_flow_with_msgs_ntimes()`,
+    `run_flows_with_multi_injections()` and `SessionEngine.warmup()` as well as the `compiled_flow` fixture ones.
+    """
+    # Both the injected and the received messages cross the extension boundary as JSON bytes
+    msgs_to_inject = _make_injections(msgs, injectee_node_id)
+    return orjson.loads(await flow.run_with_inject_json(nexpected, timeout, msgs_to_inject))
 
 
 async def run_single_node_with_msgs_ntimes(node_json: object, msgs: list[object] | None,
-                                           nexpected: int, injectee_node_id: str = '1'):
-    user_node = copy.deepcopy(node_json)
-    user_node["id"] = "1"
-    user_node["z"] = "0"
+                                           nexpected: int, injectee_node_id: str = '1',
+                                           engine: SessionEngine | None = None):
+    # Only the top level keys are set here, the node config itself can be shared, e.g. a read-only module constant
+    user_node = {**node_json, "id": "1", "z": "0"}
     if 'wires' not in node_json:
         user_node["wires"] = [["2"]]
     console_node = {"id": "2", "type": "test-once", "z": "0"}
     final_flows_json = [{"id": "0", "type": "tab"}, user_node, console_node]
-    return await run_flow_with_msgs_ntimes(final_flows_json, msgs, nexpected, injectee_node_id)
+    return await run_flow_with_msgs_ntimes(final_flows_json, msgs, nexpected, injectee_node_id, engine=engine)
@@ -1,6 +1,18 @@
+import asyncio
+import gc
+import sys
 import pytest
+import pytest_asyncio
 import json
 import pytest_jsonreport.serialize
+from pytest_asyncio import is_async_test
+
+from tests import SessionEngine
+
+# Same condition as the `uvloop` requirement, a missing uvloop elsewhere is an error instead of a silent slow run
+if sys.platform != "win32":
+    import uvloop
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
 
 
 def _make_collectitem(item):
@@ -9,14 +21,18 @@ def _make_collectitem(item):
         'nodeid': item.nodeid,
         'type': item.__class__.__name__,
     }
+    it = None
     for marker in item.iter_markers():
         if isinstance(marker, pytest.Mark):
             if marker.name == "it":
                 it = marker.args[0] if marker.args else None
-                if it != None:
-                    path = [x[1] for x in _parent_marks(item)] + [it]
-                    json_item["title"] = it
-                    json_item["fullTitle"] = " ".join(path)
+    # The parametrized cases carry their description in their id instead of an `it` marker
+    if it == None and hasattr(item, "callspec"):
+        it = item.callspec.id
+    if it != None:
+        path = [x[1] for x in _parent_marks(item)] + [it]
+        json_item["title"] = it
+        json_item["fullTitle"] = " ".join(path)
     try:
         location = item.location
     except AttributeError:
@@ -68,4 +84,59 @@ def _parent_marks(item):
                 markers.append((m.name, m.args[0]))
             except IndexError:
                 pass
-    return list(reversed(markers))
\ No newline at end of file
+    return list(reversed(markers))
+
+
+def pytest_addoption(parser):
+    parser.addoption("--runslow", action="store_true", default=False,
+                     help="run the tests marked as slow, which are also covered by batched tests")
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "slow: covered by a batched test, only run with --runslow")
+
+
+def pytest_collection_modifyitems(config, items):
+    # Run all the async tests in the same event loop as the session scoped `engine` fixture
+    session_scope_marker = pytest.mark.asyncio(loop_scope="session")
+    for item in items:
+        if is_async_test(item):
+            item.add_marker(session_scope_marker, append=False)
+
+    if config.getoption("--runslow"):
+        return
+    skip_slow = pytest.mark.skip(reason="need --runslow option to run")
+    for item in items:
+        if "slow" in item.keywords:
+            item.add_marker(skip_slow)
+
+
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
+async def engine():
+    """
+    The `SessionEngine` shared by the whole session, see `tests.run_flow_with_msgs_ntimes(engine=...)`.
+
+    Reused flows only get their context stores emptied, what the nodes keep in themselves is left as it was. So the
+    flows with such nodes must not use it, they take a fresh engine each:
+
+    * `rbe`, it keeps the last values of every topic;
+    * `inject` set to fire `once` or to `repeat`, it only fires when the flows start;
+    * `function` with an `initialize` code whose work the test checks, it only runs when the flows start.
+    """
+    # The flows and cases built at import time live for the whole session, keep them out of the GC scans
+    gc.freeze()
+    eng = SessionEngine()
+    yield eng
+    await eng.stop()
+
+
+@pytest_asyncio.fixture
+async def compiled_flow(flow_json, engine):
+    """
+    A started engine for the `flow_json` parametrized flows.
+
+    The flows are loaded only once per session and shared by every test using the same flows,
+    feed it with `tests.inject()`. The engine empties the context stores whenever the flows are reused.
+    """
+    async with engine.checkout(flow_json) as flow:
+        yield flow
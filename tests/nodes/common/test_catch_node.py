@@ -7,7 +7,6 @@ from tests import *
 @pytest.mark.describe('catch Node')
 class TestCatchNode:
 
-    @pytest.mark.asyncio
     @pytest.mark.it('should output a message when called')
     async def test_it_should_output_a_message_when_called(self):
         flows = [
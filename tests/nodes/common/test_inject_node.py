@@ -33,34 +33,28 @@ async def basic_test(type: str, val, rval=None):
 @pytest.mark.describe('inject node')
 class TestInjectNode:
 
-    @pytest.mark.asyncio
     @pytest.mark.it('inject value (num)')
     async def test_it_inject_value_num(self):
         await basic_test("num", 10)
 
-    @pytest.mark.asyncio
     @pytest.mark.it('inject value (str)')
     async def test_it_inject_value_str(self):
         await basic_test("str", "10")
 
-    @pytest.mark.asyncio
     @pytest.mark.it('inject value (bool)')
     async def test_it_inject_value_bool(self):
         await basic_test("bool", True)
 
-    @pytest.mark.asyncio
     @pytest.mark.it('inject value (json)')
     async def test_it_inject_value_json(self):
         val_json = '{ "x":"vx", "y":"vy", "z":"vz" }'
         await basic_test("json", val_json, json.loads(val_json))
 
-    @pytest.mark.asyncio
     @pytest.mark.it('inject value (bin)')
     async def test_it_inject_value_bin(self):
         val_buf = '[1,2,3,4,5]'
         await basic_test("bin", val_buf, json.loads(val_buf))
 
-    @pytest.mark.asyncio
     @pytest.mark.it('inject value of environment variable ')
     async def test_it_inject_value_of_environment_variable(self):
         flows = [
@@ -76,7 +70,6 @@ class TestInjectNode:
         assert msgs[0]["topic"] == 't1'
         assert msgs[0]["payload"] == "foo"
 
-    @pytest.mark.asyncio
     @pytest.mark.it('inject name of node as environment variable ')
     async def test_0003(self):
         flows = [
@@ -90,7 +83,6 @@ class TestInjectNode:
         assert msgs[0]["topic"] == 't1'
         assert msgs[0]["payload"] == "NAME"
 
-    @pytest.mark.asyncio
     @pytest.mark.it('inject id of node as environment variable ')
     async def test_0004(self):
         flows = [
@@ -104,7 +96,6 @@ class TestInjectNode:
         assert msgs[0]["topic"] == 't1'
         assert msgs[0]["payload"] == "0000000000000001"
 
-    @pytest.mark.asyncio
     @pytest.mark.it('''inject path of node as environment variable ''')
     async def test_0005(self):
         flows = [
@@ -118,7 +109,6 @@ class TestInjectNode:
         assert msgs[0]["topic"] == 't1'
         assert msgs[0]["payload"] == "0000000000000100/0000000000000001"
 
-    @pytest.mark.asyncio
     @pytest.mark.it('''inject name of flow as environment variable ''')
     async def test_0006(self):
         flows = [
@@ -132,7 +122,6 @@ class TestInjectNode:
         assert msgs[0]["topic"] == 't1'
         assert msgs[0]["payload"] == "FLOW"
 
-    @pytest.mark.asyncio
     @pytest.mark.it('inject id of flow as environment variable ')
     async def test_0007(self):
         flows = [
@@ -146,7 +135,6 @@ class TestInjectNode:
         assert msgs[0]["topic"] == 't1'
         assert msgs[0]["payload"] == "0000000000000100"
 
-    @pytest.mark.asyncio
     @pytest.mark.it('''inject name of group as environment variable ''')
     async def test_0008(self):
         flows = [
@@ -161,7 +149,6 @@ class TestInjectNode:
         assert msgs[0]["topic"] == 't1'
         assert msgs[0]["payload"] == "GROUP"
 
-    @pytest.mark.asyncio
     @pytest.mark.it('''inject id of group as environment variable ''')
     async def test_0009(self):
         flows = [
@@ -176,7 +163,6 @@ class TestInjectNode:
         assert msgs[0]["topic"] == 't1'
         assert msgs[0]["payload"] == "00000000000000ff"
 
-    @pytest.mark.asyncio
     @pytest.mark.it('''inject name of node as environment variable by substitution ''')
     async def test_0010(self):
         flows = [
@@ -190,7 +176,6 @@ class TestInjectNode:
         assert msgs[0]["topic"] == 't1'
         assert msgs[0]["payload"] == "NAME"
 
-    @pytest.mark.asyncio
     @pytest.mark.it('inject id of node as environment variable by substitution ')
     async def test_0011(self):
         flows = [
@@ -205,7 +190,6 @@ class TestInjectNode:
         assert msgs[0]["topic"] == 't1'
         assert msgs[0]["payload"] == "0000000000000001"
 
-    @pytest.mark.asyncio
     @pytest.mark.it('inject path of node as environment variable by substitution ')
     async def test_0012(self):
         flows = [
@@ -219,7 +203,6 @@ class TestInjectNode:
         msgs = await run_flow_with_msgs_ntimes(flows, injections, 1)
         assert msgs[0]["payload"] == "0000000000000100/0000000000000001"
 
-    @pytest.mark.asyncio
     @pytest.mark.it('inject name of flow as environment variable by substitution ')
     async def test_0013(self):
         flows = [
@@ -235,7 +218,6 @@ class TestInjectNode:
         msgs = await run_flow_with_msgs_ntimes(flows, injections, 1)
         assert msgs[0]["payload"] == "FLOW"
 
-    @pytest.mark.asyncio
     @pytest.mark.it('inject id of flow as environment variable ')
     async def test_0014(self):
         flows = [
@@ -251,7 +233,6 @@ class TestInjectNode:
         msgs = await run_flow_with_msgs_ntimes(flows, injections, 1)
         assert msgs[0]["payload"] == "0000000000000100"
 
-    @pytest.mark.asyncio
     @pytest.mark.it('inject name of group as environment variable by substitution ')
     async def test_00015(self):
         flows = [
@@ -265,7 +246,6 @@ class TestInjectNode:
         msgs = await run_flow_with_msgs_ntimes(flows, injections, 1)
         assert msgs[0]["payload"] == "GROUP"
 
-    @pytest.mark.asyncio
     @pytest.mark.it('inject id of group as environment variable by substitution ')
     async def test_00016(self):
         flows = [
@@ -281,7 +261,6 @@ class TestInjectNode:
 
     # Now there is no way to set the context in Python code yet
     @pytest.mark.skip
-    @pytest.mark.asyncio
     @pytest.mark.it('sets the value of flow context property')
     async def test_it_sets_the_value_of_flow_context_property(self):
         flows = [
@@ -294,7 +273,6 @@ class TestInjectNode:
         assert msgs[0]["topic"] == 't1'
         assert msgs[0]["payload"] == "changeMe"
 
-    @pytest.mark.asyncio
     @pytest.mark.it('should inject once with default delay property')
     async def test_0201(self):
         # Since we cannot got the property in the node
@@ -308,7 +286,6 @@ class TestInjectNode:
         msgs = await run_flow_with_msgs_ntimes(flows, injections, 1)
         assert msgs[0]["topic"] == 't1'
 
-    @pytest.mark.asyncio
     @pytest.mark.it('should inject once with default delay')
     async def test_0202(self):
         flows = [
@@ -324,7 +301,6 @@ class TestInjectNode:
         assert msgs[0]["topic"] == 't1'
         assert int(round(msgs[0]['payload'])) < expected_time
 
-    @pytest.mark.asyncio
     @pytest.mark.it('should inject once with 500 msec. delay')
     async def test_it_should_inject_once_with_500_msec_delay(self):
         flows = [
@@ -342,7 +318,6 @@ class TestInjectNode:
         assert int(round(msgs[0]["payload"])) >= start_time + 500
         assert int(round(msgs[0]["recvTime"])) < start_time + 600  # in 0.6 second
 
-    @pytest.mark.asyncio
     @pytest.mark.it('should inject once with delay of two seconds')
     async def test_it_should_inject_once_with_delay_of_two_seconds(self):
         flows = [
@@ -364,7 +339,6 @@ class TestInjectNode:
         assert int(round(msg["ts"])) >= start_time + 2000.0
         assert int(round(msg["ts"])) < msg["payload"] + 2700.0
 
-    @pytest.mark.asyncio
     @pytest.mark.it('should inject repeatedly')
     async def test_0205(self):
         flows = [
@@ -380,7 +354,6 @@ class TestInjectNode:
         assert msgs[1]["topic"] == 't2'
         assert msgs[1]["payload"] == "payload"
 
-    @pytest.mark.asyncio
     @pytest.mark.it('should inject once with delay of two seconds and repeatedly')
     async def test_0206(self):
         flows = [
@@ -396,7 +369,6 @@ class TestInjectNode:
         assert msgs[0]["topic"] == 't1'
         assert int(round(msgs[0]["payload"])) > start_time + 1000
 
-    @pytest.mark.asyncio
     @pytest.mark.it('should inject with cron')
     async def test_0207(self):
         flows = [
@@ -413,7 +385,6 @@ class TestInjectNode:
         assert isinstance(payload, float) or isinstance(payload, int)
         assert payload > start_time
 
-    @pytest.mark.asyncio
     @pytest.mark.it('should inject multiple properties')
     async def test_0208(self):
         flows = [
@@ -443,7 +414,6 @@ class TestInjectNode:
 
     """
     # EdgeLink doesn't support the msg injection for `inject` node
-    @pytest.mark.asyncio
     async def test_0209():
         '''should inject custom properties in message'''
         flows = [
@@ -481,7 +451,6 @@ class TestInjectNode:
         # assert msg["y"] == 12
     """
 
-    @pytest.mark.asyncio
     @pytest.mark.it('should inject multiple properties using legacy props if needed')
     async def test_0210(self):
         flows = [
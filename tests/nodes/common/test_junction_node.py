@@ -7,7 +7,6 @@ from tests import *
 @pytest.mark.describe('junction node')
 class TestJunctionNode:
 
-    @pytest.mark.asyncio
     @pytest.mark.it('junction node should work')
     async def test_0001(self):
         flows = [
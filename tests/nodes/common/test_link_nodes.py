@@ -9,18 +9,15 @@ from tests import *
 class TestInjectNode:
 
     @pytest.mark.skip
-    @pytest.mark.asyncio
     @pytest.mark.it('should be loaded (link in)')
     async def test_it_should_be_loaded_link_in(self):
         pass
 
     @pytest.mark.skip
-    @pytest.mark.asyncio
     @pytest.mark.it('should be loaded (link out)')
     async def test_it_should_be_loaded_link_out(self):
         pass
 
-    @pytest.mark.asyncio
     @pytest.mark.it('should be linked')
     async def test_it_should_be_linked(self):
         flows = [
@@ -37,7 +34,6 @@ class TestInjectNode:
         msgs = await run_flow_with_msgs_ntimes(flows, injections, 1)
         assert msgs[0]["payload"] == 'hello'
 
-    @pytest.mark.asyncio
     @pytest.mark.it('should be linked to multiple nodes')
     async def test_it_should_be_linked_to_multiple_nodes(self):
         flows = [
@@ -56,7 +52,6 @@ class TestInjectNode:
         msgs = await run_flow_with_msgs_ntimes(flows, injections, 2)
         assert msgs[0]["payload"] == 'hello'
 
-    @pytest.mark.asyncio
     @pytest.mark.it('''should be linked from multiple nodes''')
     async def test_0003(self):
         flows = [
@@ -80,7 +75,6 @@ class TestInjectNode:
     @pytest.mark.describe('link-call node')
     class TestLinkCallNode:
 
-        @pytest.mark.asyncio
         @pytest.mark.it('should call static link-in node and get response')
         async def test_id_should_call_static_link_in_node_and_get_response(self):
             flows = [
@@ -100,7 +94,6 @@ class TestInjectNode:
             msgs = await run_flow_with_msgs_ntimes(flows, injections, 1)
             assert msgs[0]["payload"] == "123"
 
-        @pytest.mark.asyncio
         @pytest.mark.it('should call link-in node by name and get response')
         async def test_it_should_call_link_in_node_by_name_and_get_response(self):
             payload = float(time.time())
@@ -126,7 +119,6 @@ class TestInjectNode:
             assert int(round(msgs[0]["payload"])) == int(round(payload + payload))
 
         """ TODO implements the `catch` node
-        @pytest.mark.asyncio
         async def test_0006():
             # '''should timeout waiting for link return'''
             payload = float(time.time())
@@ -154,7 +146,6 @@ class TestInjectNode:
         """
 
         """ We are not going to support the dynamic node modification in run time.
-        @pytest.mark.asyncio
         async def test_0009():
             # '''should not raise error after deploying a name change to a duplicate link-in node'''
             payload = float(time.time())
@@ -173,7 +164,6 @@ class TestInjectNode:
             assert msgs[0]["payload"] == payload + payload
         """
 
-        @pytest.mark.asyncio
         @pytest.mark.it('should allow nested link-call flows')
         async def test_it_should_allow_nested_link_call_flows_link_call_node(self):
             payload = float(time.time())
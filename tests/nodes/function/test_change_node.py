@@ -1,32 +1,180 @@
+import asyncio
 import json
+import os
 import pytest
 import time
+from types import MappingProxyType
 
 from tests import *
 
+CHANGE_NODE_BASE = MappingProxyType({"id": "1", "type": "change", "z": "100", "name": "changeNode", "wires": (("2",),)})
+LEGACY_DELETE_BASE = MappingProxyType({**CHANGE_NODE_BASE, "action": "delete", "from": "", "to": "", "reg": False})
+
+FLOWS_DELETE_1 = (TAB, {**LEGACY_DELETE_BASE, "property": "payload"}, SINK)
+FLOWS_DELETE_1_JSON = dump_flows(FLOWS_DELETE_1)
+
+FLOWS_DELETE_2 = (
+    TAB,
+    # first, we set the global value
+    {"id": "1", "type": "change", "z": "100", "rules": [
+        {"t": "set", "p": "globalValue", "pt": "global",
+            "to": "Hello World", "tot": "str"}
+    ], "reg": False, "name": "changeNode", "wires": [["2"]]},
+    # then, we delete the global value
+    {"id": "2", "type": "change", "z": "100", "rules": [
+        {"t": "delete", "p": "globalValue", "pt": "global"}
+    ],
+        "reg": False, "name": "changeNode", "wires": [["3"]]},
+    # finally, we retrieve the global value
+    {"id": "3", "type": "change", "z": "100", "rules": [
+        {"t": "set", "p": "newGlobalValue", "pt": "msg",
+            "to": "globalValue", "tot": "global"}
+    ], "reg": False, "name": "changeNode", "wires": [["4"]]},
+    {"id": "4", "z": "100", "type": "test-once"}
+)
+FLOWS_DELETE_2_JSON = dump_flows(FLOWS_DELETE_2)
+
+FLOWS_DELETE_3 = (
+    TAB,
+    # first, we set the global value
+    {"id": "1", "type": "change", "z": "100", "rules": [
+        {"t": "set", "p": "#:(memory1)::globalValue", "pt": "global",
+            "to": "Hello World", "tot": "str"}
+    ], "reg": False, "name": "changeNode", "wires": [["2"]]},
+    # then, we delete the global value
+    {"id": "2", "type": "change", "z": "100", "rules": [
+        {"t": "delete", "p": "#:(memory1)::globalValue", "pt": "global"}
+    ],
+        "reg": False, "name": "changeNode", "wires": [["3"]]},
+    # finally, we retrieve the global value
+    {"id": "3", "type": "change", "z": "100", "rules": [
+        {"t": "set", "p": "newGlobalValue", "pt": "msg",
+            "to": "#:(memory1)::globalValue", "tot": "global"}
+    ], "reg": False, "name": "changeNode", "wires": [["4"]]},
+    {"id": "4", "z": "100", "type": "test-once"}
+)
+FLOWS_DELETE_3_JSON = dump_flows(FLOWS_DELETE_3)
+
+# Also the flow of the missing multi-level property case, only the injected message differs
+FLOWS_DELETE_4 = (TAB, {**LEGACY_DELETE_BASE, "property": "foo.bar"}, SINK)
+FLOWS_DELETE_4_JSON = dump_flows(FLOWS_DELETE_4)
+
+FLOWS_DELETE_5 = (TAB, {**LEGACY_DELETE_BASE, "property": "foo"}, SINK)
+FLOWS_DELETE_5_JSON = dump_flows(FLOWS_DELETE_5)
+
+# Also the flow of the object value case, only the injected message differs
+FLOWS_MOVE_1 = (
+    TAB,
+    {**CHANGE_NODE_BASE, "rules": [{"t": "move", "p": "topic", "pt": "msg", "to": "payload", "tot": "msg"}]},
+    SINK
+)
+FLOWS_MOVE_1_JSON = dump_flows(FLOWS_MOVE_1)
+
+FLOWS_MOVE_3 = (
+    TAB,
+    {**CHANGE_NODE_BASE, "rules": [{"t": "move", "p": "payload", "pt": "msg", "to": "payload", "tot": "msg"}]},
+    SINK
+)
+FLOWS_MOVE_3_JSON = dump_flows(FLOWS_MOVE_3)
+
+FLOWS_MOVE_4 = (
+    TAB,
+    {**CHANGE_NODE_BASE, "rules": [{"t": "move", "p": "payload", "pt": "msg", "to": "payload.foo", "tot": "msg"}]},
+    SINK
+)
+FLOWS_MOVE_4_JSON = dump_flows(FLOWS_MOVE_4)
+
+FLOWS_MOVE_5 = (
+    TAB,
+    {**CHANGE_NODE_BASE, "rules": [{"t": "move", "p": "payload.foo", "pt": "msg", "to": "payload", "tot": "msg"}]},
+    SINK
+)
+FLOWS_MOVE_5_JSON = dump_flows(FLOWS_MOVE_5)
+
+FLOWS_MULTIPLE_RULES_1 = (
+    TAB,
+    {**CHANGE_NODE_BASE, "rules": [
+        {"t": "set", "p": "payload", "to": "newValue"},
+        {"t": "change", "p": "changeProperty", "from": "this", "to": "that"},
+        {"t": "delete", "p": "deleteProperty"},
+    ]},
+    SINK
+)
+FLOWS_MULTIPLE_RULES_1_JSON = dump_flows(FLOWS_MULTIPLE_RULES_1)
+
+FLOWS_MULTIPLE_RULES_2 = (
+    TAB,
+    {**CHANGE_NODE_BASE, "rules": [
+        {"t": "set", "p": "payload", "to": "a this (hi)"},
+        {"t": "change", "p": "payload", "from": "this", "to": "that"},
+        {"t": "change", "p": "payload", "from": "\\(.*\\)", "to": "[new]", "re": True},
+    ]},
+    SINK
+)
+FLOWS_MULTIPLE_RULES_2_JSON = dump_flows(FLOWS_MULTIPLE_RULES_2)
+
+FLOWS_MULTIPLE_RULES_3 = (
+    TAB,
+    {"id": "1", "type": "change", "z": "100", "rules": [
+        {"t": "set", "p": "#:(memory0)::val", "pt": "flow", "to": "foo", "tot": "str"},
+        {"t": "set", "p": "#:(memory1)::val", "pt": "flow", "to": "bar", "tot": "str"}
+    ], "reg": False, "name": "changeNode", "wires": [["2"]]},
+    {"id": "2", "type": "change", "z": "100", "rules": [
+        {"t": "set", "p": "val0", "to": "#:(memory0)::val", "tot": "flow"},
+        {"t": "set", "p": "val1", "to": "#:(memory1)::val", "tot": "flow"}
+    ], "name": "changeNode", "wires": [["3"]]},
+    {"id": "3", "z": "100", "type": "test-once"}
+)
+FLOWS_MULTIPLE_RULES_3_JSON = dump_flows(FLOWS_MULTIPLE_RULES_3)
+
+FLOWS_MULTIPLE_RULES_4 = (
+    TAB,
+    {"id": "1", "type": "change", "z": "100", "rules": [
+        {"t": "set", "p": "#:(memory0)::val", "pt": "global", "to": "foo", "tot": "str"},
+        {"t": "set", "p": "#:(memory1)::val", "pt": "global", "to": "bar", "tot": "str"}
+    ], "reg": False, "name": "changeNode", "wires": [["2"]]},
+    {"id": "2", "type": "change", "z": "100", "rules": [
+        {"t": "set", "p": "val0", "to": "#:(memory0)::val", "tot": "global"},
+        {"t": "set", "p": "val1", "to": "#:(memory1)::val", "tot": "global"}
+    ], "name": "changeNode", "wires": [["3"]]},
+    {"id": "3", "z": "100", "type": "test-once"}
+)
+FLOWS_MULTIPLE_RULES_4_JSON = dump_flows(FLOWS_MULTIPLE_RULES_4)
+
+FLOWS_MULTIPLE_RULES_5 = (
+    TAB,
+    {"id": "1", "type": "change", "z": "100", "rules": [
+        {"t": "set", "p": "#:(memory0)::val", "pt": "flow", "to": "foo", "tot": "str"},
+        {"t": "set", "p": "#:(memory1)::val", "pt": "global", "to": "bar", "tot": "str"}
+    ], "reg": False, "name": "changeNode", "wires": [["2"]]},
+    {"id": "2", "type": "change", "z": "100", "rules": [
+        {"t": "set", "p": "val0", "to": "#:(memory0)::val", "tot": "flow"},
+        {"t": "set", "p": "val1", "to": "#:(memory1)::val", "tot": "global"}
+    ], "name": "changeNode", "wires": [["3"]]},
+    {"id": "3", "z": "100", "type": "test-once"}
+)
+FLOWS_MULTIPLE_RULES_5_JSON = dump_flows(FLOWS_MULTIPLE_RULES_5)
+
+
 @pytest.mark.describe('change Node')
 class TestChangeNode:
 
     @pytest.mark.skip
-    @pytest.mark.asyncio
     @pytest.mark.it('should load node with defaults')
     async def test_it_should_load_node_with_defaults(self):
         pass
 
     @pytest.mark.skip
-    @pytest.mark.asyncio
     @pytest.mark.it('should load defaults if set to replace')
     async def test_it_should_load_defaults_if_set_to_replace(self):
         pass
 
     @pytest.mark.skip
-    @pytest.mark.asyncio
     @pytest.mark.it('should load defaults if set to change')
     async def test_it_should_load_defaults_if_set_to_change(self):
         pass
 
     @pytest.mark.skip
-    @pytest.mark.asyncio
     @pytest.mark.it('should no-op if there are no rules')
     async def test_it_should_no_op_if_there_are_no_rules(self):
         pass
@@ -34,7 +182,6 @@ class TestChangeNode:
     @pytest.mark.describe('#set')
     class TestSet:
 
-        @pytest.mark.asyncio
         @pytest.mark.it('sets the value of the message property')
         async def test_set_1(self):
             flows = [
@@ -49,7 +196,6 @@ class TestChangeNode:
             msgs = await run_flow_with_msgs_ntimes(flows, injections, 1)
             assert msgs[0]["payload"] == 'changed'
 
-        @pytest.mark.asyncio
         @pytest.mark.it('sets the value of global context property')
         async def test_set_2(self):
             flows = [
@@ -72,7 +218,6 @@ class TestChangeNode:
             msgs = await run_flow_with_msgs_ntimes(flows, injections, 1)
             assert msgs[0]["payload"] == 'changed'
 
-        @pytest.mark.asyncio
         @pytest.mark.it('sets the value of persistable global context property')
         async def test_set_3(self):
             flows = [
@@ -94,7 +239,6 @@ class TestChangeNode:
             msgs = await run_flow_with_msgs_ntimes(flows, injections, 1)
             assert msgs[0]["payload"] == 'changed'
 
-        @pytest.mark.asyncio
         @pytest.mark.it('sets the value and type of the message property')
         async def test_set_4(self):
             flows = [
@@ -114,7 +258,6 @@ class TestChangeNode:
             assert isinstance(payload, float) or isinstance(payload, int)
             assert payload == 12345
 
-        @pytest.mark.asyncio
         @pytest.mark.it('''sets the value of an already set multi-level message property''')
         async def test_set_5(self):
             flows = [
@@ -129,7 +272,6 @@ class TestChangeNode:
             msgs = await run_flow_with_msgs_ntimes(flows, injections, 1)
             assert msgs[0]['foo']['bar'] == "bar"
 
-        @pytest.mark.asyncio
         @pytest.mark.it('''sets the value of an empty multi-level message property''')
         async def test_set_6(self):
             flows = [
@@ -144,7 +286,6 @@ class TestChangeNode:
             msgs = await run_flow_with_msgs_ntimes(flows, injections, 1)
             assert msgs[0]['foo']['bar'] == "bar"
 
-        @pytest.mark.asyncio
         @pytest.mark.it('''sets the value of a message property to another message property''')
         async def test_set_7(self):
             flows = [
@@ -159,7 +300,6 @@ class TestChangeNode:
             msgs = await run_flow_with_msgs_ntimes(flows, injections, 1)
             assert msgs[0]['foo'] == "bar"
 
-        @pytest.mark.asyncio
         @pytest.mark.it('''sets the value of a multi-level message property to another multi-level message property''')
         async def test_set_8(self):
             flows = [
@@ -174,7 +314,6 @@ class TestChangeNode:
             msgs = await run_flow_with_msgs_ntimes(flows, injections, 1)
             assert msgs[0]['foo']['bar'] == "bar"
 
-        @pytest.mark.asyncio
         @pytest.mark.it('''doesn't set the value of a message property when the 'to' message property does not exist''')
         async def test_set_9(self):
             flows = [
@@ -189,7 +328,6 @@ class TestChangeNode:
             msgs = await run_flow_with_msgs_ntimes(flows, injections, 1)
             assert 'foo' not in msgs[0]
 
-        @pytest.mark.asyncio
         @pytest.mark.it('''overrides the value of a message property when the 'to' message property does not exist''')
         async def test_set_10(self):
             flows = [
@@ -204,7 +342,6 @@ class TestChangeNode:
             msgs = await run_flow_with_msgs_ntimes(flows, injections, 1)
             assert 'payload' not in msgs[0]
 
-        @pytest.mark.asyncio
         @pytest.mark.it('''sets the message property to null when the 'to' message property equals null''')
         async def test_set_11(self):
             flows = [
@@ -220,7 +357,6 @@ class TestChangeNode:
             assert 'payload' in msgs[0]
             assert msgs[0]['payload'] == None
 
-        @pytest.mark.asyncio
         @pytest.mark.it('''does not set other properties using = inside to property''')
         async def test_set_12(self):
             flows = [
@@ -235,7 +371,6 @@ class TestChangeNode:
             msgs = await run_flow_with_msgs_ntimes(flows, injections, 1)
             assert 'payload' not in msgs[0]
 
-        @pytest.mark.asyncio
         @pytest.mark.it('''splits dot delimited properties into objects''')
         async def test_set_13(self):
             flows = [
@@ -250,7 +385,6 @@ class TestChangeNode:
             msgs = await run_flow_with_msgs_ntimes(flows, injections, 1)
             assert msgs[0]['pay']['load'] == "10"
 
-        @pytest.mark.asyncio
         @pytest.mark.it('changes the value to flow context property')
         async def test_set_14(self):
             flows = [
@@ -270,7 +404,6 @@ class TestChangeNode:
             msgs = await run_flow_with_msgs_ntimes(flows, injections, 1)
             assert msgs[0]["payload"] == 'Hello World!'
 
-        @pytest.mark.asyncio
         @pytest.mark.it('changes the value to persistable flow context property')
         async def test_set_15(self):
             flows = [
@@ -290,7 +423,6 @@ class TestChangeNode:
             msgs = await run_flow_with_msgs_ntimes(flows, injections, 1)
             assert msgs[0]["payload"] == 'Hello World!'
 
-        @pytest.mark.asyncio
         @pytest.mark.it('changes the value to global context property')
         async def test_set_16(self):
             flows = [
@@ -311,7 +443,6 @@ class TestChangeNode:
             msgs = await run_flow_with_msgs_ntimes(flows, injections, 1)
             assert msgs[0]["payload"] == 'Hello World!'
 
-        @pytest.mark.asyncio
         @pytest.mark.it('changes the value to persistable global context property')
         async def test_set_17(self):
             flows = [
@@ -332,7 +463,6 @@ class TestChangeNode:
             msgs = await run_flow_with_msgs_ntimes(flows, injections, 1)
             assert msgs[0]["payload"] == 'Hello World!'
 
-        @pytest.mark.asyncio
         @pytest.mark.it('''changes the value to a number''')
         async def test_set_18(self):
             flows = [
@@ -347,7 +477,6 @@ class TestChangeNode:
             msgs = await run_flow_with_msgs_ntimes(flows, injections, 1)
             assert msgs[0]['payload'] == 123
 
-        @pytest.mark.asyncio
         @pytest.mark.it('''changes the value to a boolean value''')
         async def test_set_19(self):
             flows = [
@@ -362,7 +491,6 @@ class TestChangeNode:
             msgs = await run_flow_with_msgs_ntimes(flows, injections, 1)
             assert msgs[0]['payload'] == True
 
-        @pytest.mark.asyncio
         @pytest.mark.it('''changes the value to a js object''')
         async def test_set_20(self):
             flows = [
@@ -377,7 +505,6 @@ class TestChangeNode:
             msgs = await run_flow_with_msgs_ntimes(flows, injections, 1)
             assert msgs[0]['payload'] == {"a": 123}
 
-        @pytest.mark.asyncio
         @pytest.mark.it('''changes the value to a buffer object''')
         async def test_set_21(self):
             flows = [
@@ -393,7 +520,6 @@ class TestChangeNode:
             assert msgs[0]['payload'] == [72, 101, 108,
                                           108, 111, 32, 87, 111, 114, 108, 100]
 
-        @pytest.mark.asyncio
         @pytest.mark.it('''sets the value of the message property to the current timestamp''')
         async def test_set_22(self):
             flows = [
@@ -417,7 +543,6 @@ class TestChangeNode:
             def teardown_method(self, method):
                 del os.environ["NR_TEST_A"]
 
-            @pytest.mark.asyncio
             @pytest.mark.it('sets the value using env property')
             async def test_set_env_1(self):
                 flows = [
@@ -432,7 +557,6 @@ class TestChangeNode:
                 msgs = await run_flow_with_msgs_ntimes(flows, injections, 1)
                 assert msgs[0]["payload"] == "foo"
 
-            @pytest.mark.asyncio
             @pytest.mark.it('sets the value using env property from tab')
             async def test_set_env_2(self):
                 flows = [
@@ -449,7 +573,6 @@ class TestChangeNode:
                 msgs = await run_flow_with_msgs_ntimes(flows, injections, 1)
                 assert msgs[0]["payload"] == "bar"
 
-            @pytest.mark.asyncio
             @pytest.mark.it('sets the value using env property from group')
             async def test_set_env_3(self):
                 flows = [
@@ -468,7 +591,6 @@ class TestChangeNode:
                 msgs = await run_flow_with_msgs_ntimes(flows, injections, 1)
                 assert msgs[0]["payload"] == "bar"
 
-            @pytest.mark.asyncio
             @pytest.mark.it('sets the value using env property from nested group')
             async def test_set_env_4(self):
                 flows = [
@@ -489,7 +611,6 @@ class TestChangeNode:
                 msgs = await run_flow_with_msgs_ntimes(flows, injections, 1)
                 assert msgs[0]["payload"] == "bar"
 
-        @pytest.mark.asyncio
         @pytest.mark.it('sets the value of a message property using a nested property')
         async def test_set_28(self):
             flows = [
@@ -508,7 +629,6 @@ class TestChangeNode:
             msgs = await run_flow_with_msgs_ntimes(flows, injections, 1)
             assert msgs[0]["payload"] == 2
 
-        @pytest.mark.asyncio
         @pytest.mark.it('sets the value of a nested message property using a message property')
         async def test_it_sets_the_value_of_a_nested_message_property_using_a_message_property(self):
             flows = [
@@ -528,7 +648,6 @@ class TestChangeNode:
             msgs = await run_flow_with_msgs_ntimes(flows, injections, 1)
             assert msgs[0]["lookup"]["b"] == "newValue"
 
-        @pytest.mark.asyncio
         @pytest.mark.it('sets the value of a message property using a nested property in flow context')
         async def test_it_sets_the_value_of_a_message_property_using_a_nested_property_in_flow_context(self):
             flows = [
@@ -551,7 +670,6 @@ class TestChangeNode:
             msgs = await run_flow_with_msgs_ntimes(flows, injections, 1)
             assert msgs[0]["payload"] == 2
 
-        @pytest.mark.asyncio
         @pytest.mark.it('sets the value of a nested flow context property using a message property')
         async def test_it_sets_the_value_of_a_nested_flow_context_property_using_a_message_property(self):
             flows = [
@@ -596,7 +714,6 @@ class TestChangeNode:
     @pytest.mark.describe('#change')
     class TestChange:
 
-        @pytest.mark.asyncio
         @pytest.mark.it('changes the value of the message property')
         async def test_change_1(self):
             flows = [
@@ -611,7 +728,6 @@ class TestChangeNode:
             msgs = await run_flow_with_msgs_ntimes(flows, injections, 1)
             assert msgs[0]["payload"] == "Goodbye World!"
 
-        @pytest.mark.asyncio
         @pytest.mark.it('''changes the value and doesnt change type of the message property for partial match''')
         async def test_change_2(self):
             flows = [
@@ -627,7 +743,6 @@ class TestChangeNode:
             msgs = await run_flow_with_msgs_ntimes(flows, injections, 1)
             assert msgs[0]["payload"] == "Change456Me"
 
-        @pytest.mark.asyncio
         @pytest.mark.it('''changes the value and type of the message property if a complete match - number''')
         async def test_change_3(self):
             flows = [
@@ -644,7 +759,6 @@ class TestChangeNode:
             msgs = await run_flow_with_msgs_ntimes(flows, injections, 1)
             assert msgs[0]["payload"] == 456
 
-        @pytest.mark.asyncio
         @pytest.mark.it('''changes the value and type of the message property if a complete match - boolean''')
         async def test_change_4(self):
             flows = [
@@ -666,7 +780,6 @@ class TestChangeNode:
             assert msgs[0]["payload"]["a"] == True
             assert msgs[0]["payload"]["b"] == False
 
-        @pytest.mark.asyncio
         @pytest.mark.it('''changes the value of a multi-level message property''')
         async def test_change_5(self):
             flows = [
@@ -682,7 +795,6 @@ class TestChangeNode:
             msgs = await run_flow_with_msgs_ntimes(flows, injections, 1)
             assert msgs[0]["foo"]["bar"] == "Goodbye World!"
 
-        @pytest.mark.asyncio
         @pytest.mark.it('''sends unaltered message if the changed message property does not exist''')
         async def test_change_6(self):
             flows = [
@@ -697,7 +809,6 @@ class TestChangeNode:
             msgs = await run_flow_with_msgs_ntimes(flows, injections, 1)
             assert msgs[0]["payload"] == "Hello World!"
 
-        @pytest.mark.asyncio
         @pytest.mark.it('''sends unaltered message if a changed multi-level message property does not exist''')
         async def test_change_7(self):
             flows = [
@@ -713,7 +824,6 @@ class TestChangeNode:
             msgs = await run_flow_with_msgs_ntimes(flows, injections, 1)
             assert msgs[0]["payload"] == "Hello World!"
 
-        @pytest.mark.asyncio
         @pytest.mark.it('changes the value of the message property based on a regex')
         async def test_change_8(self):
             flows = [
@@ -737,7 +847,6 @@ class TestChangeNode:
             assert msgs[0]["payload"]["b"] == True
             assert msgs[0]["payload"]["c"] == False
 
-        @pytest.mark.asyncio
         @pytest.mark.it('supports regex groups')
         async def test_change_9(self):
             flows = [
@@ -754,7 +863,6 @@ class TestChangeNode:
 
 # 10 reports invalid regex
 
-        @pytest.mark.asyncio
         @pytest.mark.it('supports regex groups - new rule format')
         async def test_change_11(self):
             flows = [
@@ -772,7 +880,6 @@ class TestChangeNode:
             msgs = await run_flow_with_msgs_ntimes(flows, injections, 1)
             assert msgs[0]["payload"] == "Hello-Hello-Hello World"
 
-        @pytest.mark.asyncio
         @pytest.mark.it('changes the value - new rule format')
         async def test_change_12(self):
             flows = [
@@ -790,7 +897,6 @@ class TestChangeNode:
             msgs = await run_flow_with_msgs_ntimes(flows, injections, 1)
             assert msgs[0]["payload"] == "abc123abc"
 
-        @pytest.mark.asyncio
         @pytest.mark.it('changes the value using msg property')
         async def test_change_13(self):
             flows = [
@@ -807,7 +913,6 @@ class TestChangeNode:
             msgs = await run_flow_with_msgs_ntimes(flows, injections, 1)
             assert msgs[0]["payload"] == "abc123abc"
 
-        @pytest.mark.asyncio
         @pytest.mark.it('changes the value using flow context property')
         async def test_change_14(self):
             flows = [
@@ -827,7 +932,6 @@ class TestChangeNode:
             msgs = await run_flow_with_msgs_ntimes(flows, injections, 1)
             assert msgs[0]["payload"] == "abc123abc"
 
-        @pytest.mark.asyncio
         @pytest.mark.it('changes the value using persistable flow context property')
         async def test_change_15(self):
             flows = [
@@ -847,7 +951,6 @@ class TestChangeNode:
             msgs = await run_flow_with_msgs_ntimes(flows, injections, 1)
             assert msgs[0]["payload"] == "abc123abc"
 
-        @pytest.mark.asyncio
         @pytest.mark.it('changes the value using global context property')
         async def test_change_16(self):
             flows = [
@@ -866,7 +969,6 @@ class TestChangeNode:
             msgs = await run_flow_with_msgs_ntimes(flows, injections, 1)
             assert msgs[0]["payload"] == "abc123abc"
 
-        @pytest.mark.asyncio
         @pytest.mark.it('changes the value using persistable global context property')
         async def test_change_17(self):
             flows = [
@@ -886,7 +988,6 @@ class TestChangeNode:
             msgs = await run_flow_with_msgs_ntimes(flows, injections, 1)
             assert msgs[0]["payload"] == "abc123abc"
 
-        @pytest.mark.asyncio
         @pytest.mark.it('changes the number using global context property')
         async def test_change_18(self):
             flows = [
@@ -905,7 +1006,6 @@ class TestChangeNode:
             msgs = await run_flow_with_msgs_ntimes(flows, injections, 1)
             assert msgs[0]["payload"] == "ABC"
 
-        @pytest.mark.asyncio
         @pytest.mark.it('changes the number using persistable global context property')
         async def test_change_19(self):
             flows = [
@@ -925,7 +1025,6 @@ class TestChangeNode:
             msgs = await run_flow_with_msgs_ntimes(flows, injections, 1)
             assert msgs[0]["payload"] == "ABC"
 
-        @pytest.mark.asyncio
         @pytest.mark.it('changes the value using number - string payload')
         async def test_change_20(self):
             flows = [
@@ -942,7 +1041,6 @@ class TestChangeNode:
             msgs = await run_flow_with_msgs_ntimes(flows, injections, 1)
             assert msgs[0]["payload"] == "456"
 
-        @pytest.mark.asyncio
         @pytest.mark.it('changes the value using number - number payload')
         async def test_change_21(self):
             flows = [
@@ -959,7 +1057,6 @@ class TestChangeNode:
             msgs = await run_flow_with_msgs_ntimes(flows, injections, 1)
             assert msgs[0]["payload"] == "abc"
 
-        @pytest.mark.asyncio
         @pytest.mark.it('changes the value using boolean - string payload')
         async def test_change_22(self):
             flows = [
@@ -976,7 +1073,6 @@ class TestChangeNode:
             msgs = await run_flow_with_msgs_ntimes(flows, injections, 1)
             assert msgs[0]["payload"] == "xxx"
 
-        @pytest.mark.asyncio
         @pytest.mark.it('changes the value using boolean - boolean payload')
         async def test_change_23(self):
             flows = [
@@ -993,7 +1089,6 @@ class TestChangeNode:
             msgs = await run_flow_with_msgs_ntimes(flows, injections, 1)
             assert msgs[0]["payload"] == "xxx"
 
-        @pytest.mark.asyncio
         @pytest.mark.it('changes the value of the global context')
         async def test_change_24(self):
             flows = [
@@ -1018,7 +1113,6 @@ class TestChangeNode:
             msgs = await run_flow_with_msgs_ntimes(flows, injections, 1)
             assert msgs[0]["payload"] == 'Goodbye World!'
 
-        @pytest.mark.asyncio
         @pytest.mark.it('changes the value of the persistable global context')
         async def test_change_25(self):
             flows = [
@@ -1042,7 +1136,6 @@ class TestChangeNode:
             msgs = await run_flow_with_msgs_ntimes(flows, injections, 1)
             assert msgs[0]["payload"] == 'Goodbye World!'
 
-        @pytest.mark.asyncio
         @pytest.mark.it('changes the value and doesnt change type of the flow context for partial match')
         async def test_change_26(self):
             flows = [
@@ -1065,7 +1158,6 @@ class TestChangeNode:
             msgs = await run_flow_with_msgs_ntimes(flows, injections, 1)
             assert msgs[0]["payload"] == 'Change456Me'
 
-        @pytest.mark.asyncio
         @pytest.mark.it('changes the value and doesnt change type of the persistable flow context for partial match')
         async def test_change_27(self):
             flows = [
@@ -1089,7 +1181,6 @@ class TestChangeNode:
             msgs = await run_flow_with_msgs_ntimes(flows, injections, 1)
             assert msgs[0]["payload"] == 'Change456Me'
 
-        @pytest.mark.asyncio
         @pytest.mark.it('changes the value and type of the flow context if a complete match')
         async def test_change_28(self):
             flows = [
@@ -1112,7 +1203,6 @@ class TestChangeNode:
             msgs = await run_flow_with_msgs_ntimes(flows, injections, 1)
             assert msgs[0]["payload"] == 456
 
-        @pytest.mark.asyncio
         @pytest.mark.it('changes the value and type of the persistable flow context if a complete match')
         async def test_change_29(self):
             flows = [
@@ -1136,7 +1226,6 @@ class TestChangeNode:
             msgs = await run_flow_with_msgs_ntimes(flows, injections, 1)
             assert msgs[0]["payload"] == 456
 
-        @pytest.mark.asyncio
         @pytest.mark.it('changes the value using number - number flow context')
         async def test_change_30(self):
             flows = [
@@ -1159,7 +1248,6 @@ class TestChangeNode:
             msgs = await run_flow_with_msgs_ntimes(flows, injections, 1)
             assert msgs[0]["payload"] == "abc"
 
-        @pytest.mark.asyncio
         @pytest.mark.it('changes the value using number - number persistable flow context')
         async def test_change_31(self):
             flows = [
@@ -1183,7 +1271,6 @@ class TestChangeNode:
             msgs = await run_flow_with_msgs_ntimes(flows, injections, 1)
             assert msgs[0]["payload"] == "abc"
 
-        @pytest.mark.asyncio
         @pytest.mark.it('changes the value using boolean - boolean flow context')
         async def test_change_32(self):
             flows = [
@@ -1206,7 +1293,6 @@ class TestChangeNode:
             msgs = await run_flow_with_msgs_ntimes(flows, injections, 1)
             assert msgs[0]["payload"] == "abc"
 
-        @pytest.mark.asyncio
         @pytest.mark.it('changes the value using boolean - boolean persistable flow context')
         async def test_change_33(self):
             flows = [
@@ -1241,106 +1327,55 @@ class TestChangeNode:
             def teardown_method(self, method):
                 del os.environ["NR_TEST_A"]
 
-            @pytest.mark.asyncio
             @pytest.mark.it('changes the value using env property')
-            async def test_change_env_var_1(self):
-                flows = [
-                    {"id": "100", "type": "tab"},  # flow 1
-                    {"id": "1", "type": "change", "z": "100", "rules": [
-                        {"t": "change", "p": "payload", "from": "topic", "to": "NR_TEST_A", "fromt": "msg", "tot": "env"}
-                    ], "name": "changeNode", "wires": [["2"]]},
-                    {"id": "2", "z": "100", "type": "test-once"}
-                ]
+            @pytest.mark.parametrize('flow_json', [[
+                {"id": "100", "type": "tab"},  # flow 1
+                {"id": "1", "type": "change", "z": "100", "rules": [
+                    {"t": "change", "p": "payload", "from": "topic", "to": "NR_TEST_A", "fromt": "msg", "tot": "env"}
+                ], "name": "changeNode", "wires": [["2"]]},
+                {"id": "2", "z": "100", "type": "test-once"}
+            ]])
+            async def test_change_env_var_1(self, compiled_flow):
                 injections = [
                     {"nid": "1", "msg": {'payload': "abcABCabc", "topic": "ABC"}},
                 ]
-                msgs = await run_flow_with_msgs_ntimes(flows, injections, 1)
+                msgs = await inject(compiled_flow, injections, 1)
                 assert msgs[0]["payload"] == "abcfooabc"
 
     @pytest.mark.describe('#delete')
+    @pytest.mark.slow
     class TestDelete:
 
-        @pytest.mark.asyncio
         @pytest.mark.it('deletes the value of the message property')
-        async def test_delete_1(self):
-            flows = [
-                {"id": "100", "type": "tab"},  # flow 1
-                {"id": "1", "type": "change", "z": "100", "action": "delete", "property": "payload",
-                    "from": "", "to": "", "reg": False, "name": "changeNode", "wires": [["2"]]},
-                {"id": "2", "z": "100", "type": "test-once"}
-            ]
+        @pytest.mark.parametrize('flow_json', [FLOWS_DELETE_1_JSON], ids=['FLOWS_DELETE_1'])
+        async def test_delete_1(self, compiled_flow):
             injections = [
                 {"nid": "1", "msg": {'payload': "This won't get through"}},
             ]
-            msgs = await run_flow_with_msgs_ntimes(flows, injections, 1)
+            msgs = await inject(compiled_flow, injections, 1)
             assert 'payload' not in msgs[0]
 
-        @pytest.mark.asyncio
         @pytest.mark.it('deletes the value of global context property')
-        async def test_delete_2(self):
-            flows = [
-                {"id": "100", "type": "tab"},  # flow 1
-                # first, we set the global value
-                {"id": "1", "type": "change", "z": "100", "rules": [
-                    {"t": "set", "p": "globalValue", "pt": "global",
-                        "to": "Hello World", "tot": "str"}
-                ], "reg": False, "name": "changeNode", "wires": [["2"]]},
-                # then, we delete the global value
-                {"id": "2", "type": "change", "z": "100", "rules": [
-                    {"t": "delete", "p": "globalValue", "pt": "global"}
-                ],
-                    "reg": False, "name": "changeNode", "wires": [["3"]]},
-                # finally, we retrieve the global value
-                {"id": "3", "type": "change", "z": "100", "rules": [
-                    {"t": "set", "p": "newGlobalValue", "pt": "msg",
-                        "to": "globalValue", "tot": "global"}
-                ], "reg": False, "name": "changeNode", "wires": [["4"]]},
-                {"id": "4", "z": "100", "type": "test-once"}
-            ]
+        @pytest.mark.parametrize('flow_json', [FLOWS_DELETE_2_JSON], ids=['FLOWS_DELETE_2'])
+        async def test_delete_2(self, compiled_flow):
             injections = [
                 {"nid": "1", "msg": {'payload': ''}},
             ]
-            msgs = await run_flow_with_msgs_ntimes(flows, injections, 1)
+            msgs = await inject(compiled_flow, injections, 1)
             assert 'newGlobalValue' not in msgs[0]
 
-        @pytest.mark.asyncio
         @pytest.mark.it('deletes the value of persistable global context property')
-        async def test_delete_3(self):
-            flows = [
-                {"id": "100", "type": "tab"},  # flow 1
-                # first, we set the global value
-                {"id": "1", "type": "change", "z": "100", "rules": [
-                    {"t": "set", "p": "#:(memory1)::globalValue", "pt": "global",
-                        "to": "Hello World", "tot": "str"}
-                ], "reg": False, "name": "changeNode", "wires": [["2"]]},
-                # then, we delete the global value
-                {"id": "2", "type": "change", "z": "100", "rules": [
-                    {"t": "delete", "p": "#:(memory1)::globalValue", "pt": "global"}
-                ],
-                    "reg": False, "name": "changeNode", "wires": [["3"]]},
-                # finally, we retrieve the global value
-                {"id": "3", "type": "change", "z": "100", "rules": [
-                    {"t": "set", "p": "newGlobalValue", "pt": "msg",
-                        "to": "#:(memory1)::globalValue", "tot": "global"}
-                ], "reg": False, "name": "changeNode", "wires": [["4"]]},
-                {"id": "4", "z": "100", "type": "test-once"}
-            ]
+        @pytest.mark.parametrize('flow_json', [FLOWS_DELETE_3_JSON], ids=['FLOWS_DELETE_3'])
+        async def test_delete_3(self, compiled_flow):
             injections = [
                 {"nid": "1", "msg": {'payload': ''}},
             ]
-            msgs = await run_flow_with_msgs_ntimes(flows, injections, 1)
+            msgs = await inject(compiled_flow, injections, 1)
             assert 'newGlobalValue' not in msgs[0]
 
-        @pytest.mark.asyncio
         @pytest.mark.it('deletes the value of a multi-level message property')
-        async def test_delete_4(self):
-            flows = [
-                {"id": "100", "type": "tab"},  # flow 1
-                {"id": "1", "type": "change", "z": "100", "action": "delete", "property": "foo.bar", "from": "", "to": "", "reg": False,
-                 "name": "changeNode",
-                 "wires": [["2"]]},
-                {"id": "2", "z": "100", "type": "test-once"}
-            ]
+        @pytest.mark.parametrize('flow_json', [FLOWS_DELETE_4_JSON], ids=['FLOWS_DELETE_4'])
+        async def test_delete_4(self, compiled_flow):
             injections = [
                 {"nid": "1", "msg": {
                     "payload": "This won't get through!",
@@ -1348,36 +1383,24 @@ class TestChangeNode:
                 }
                 },
             ]
-            msgs = await run_flow_with_msgs_ntimes(flows, injections, 1)
+            msgs = await inject(compiled_flow, injections, 1)
             assert 'foo' in msgs[0]
             assert msgs[0]["foo"] == {}
             assert 'bar' not in msgs[0]["foo"]
 
-        @pytest.mark.asyncio
         @pytest.mark.it('sends unaltered message if the deleted message property does not exist')
-        async def test_delete_5(self):
-            flows = [
-                {"id": "100", "type": "tab"},  # flow 1
-                {"id": "1", "type": "change", "z": "100", "action": "delete", "property": "foo",
-                    "from": "", "to": "", "reg": False, "name": "changeNode", "wires": [["2"]]},
-                {"id": "2", "z": "100", "type": "test-once"}
-            ]
+        @pytest.mark.parametrize('flow_json', [FLOWS_DELETE_5_JSON], ids=['FLOWS_DELETE_5'])
+        async def test_delete_5(self, compiled_flow):
             injections = [
                 {"nid": "1", "msg": {"payload": "payload", }},
             ]
-            msgs = await run_flow_with_msgs_ntimes(flows, injections, 1)
+            msgs = await inject(compiled_flow, injections, 1)
             assert msgs[0]["payload"] == "payload"
             assert 'foo' not in msgs[0]
 
-        @pytest.mark.asyncio
         @pytest.mark.it('sends unaltered message if a deleted multi-level message property does not exist')
-        async def test_delete_6(self):
-            flows = [
-                {"id": "100", "type": "tab"},  # flow 1
-                {"id": "1", "type": "change", "z": "100", "action": "delete", "property": "foo.bar",
-                    "from": "", "to": "", "reg": False, "name": "changeNode", "wires": [["2"]]},
-                {"id": "2", "z": "100", "type": "test-once"}
-            ]
+        @pytest.mark.parametrize('flow_json', [FLOWS_DELETE_4_JSON], ids=['FLOWS_DELETE_4'])
+        async def test_delete_6(self, compiled_flow):
             injections = [
                 {"nid": "1", "msg": {
                     "payload": "This won't get through!",
@@ -1388,49 +1411,34 @@ class TestChangeNode:
             injections = [
                 {"nid": "1", "msg": {"payload": "payload", }},
             ]
-            msgs = await run_flow_with_msgs_ntimes(flows, injections, 1)
+            msgs = await inject(compiled_flow, injections, 1)
             assert msgs[0]["payload"] == "payload"
             assert 'foo' not in msgs[0]
             assert 'foo.bar' not in msgs[0]
 
     @pytest.mark.describe('#move')
+    @pytest.mark.slow
     class TestMove:
 
-        @pytest.mark.asyncio
         @pytest.mark.it('moves the value of the message property')
-        async def test_it_moves_the_value_of_the_message_property(self):
-            flows = [
-                {"id": "100", "type": "tab"},  # flow 1
-                {"id": "1", "type": "change", "z": "100", "name": "changeNode", "wires": [["2"]],
-                "rules": [
-                    {"t": "move", "p": "topic", "pt": "msg", "to": "payload", "tot": "msg"}
-                ]},
-                {"id": "2", "z": "100", "type": "test-once"}
-            ]
+        @pytest.mark.parametrize('flow_json', [FLOWS_MOVE_1_JSON], ids=['FLOWS_MOVE_1'])
+        async def test_it_moves_the_value_of_the_message_property(self, compiled_flow):
             injections = [
                 {"nid": "1", "msg": {"topic": "You've got to move it move it.", "payload": {"foo":"bar"}}},
             ]
-            msgs = await run_flow_with_msgs_ntimes(flows, injections, 1)
+            msgs = await inject(compiled_flow, injections, 1)
             msg = msgs[0]
             assert "topic" not in msg
             assert "payload" in msg
             assert msg["payload"] == "You've got to move it move it."
 
-        @pytest.mark.asyncio
         @pytest.mark.it('moves the value of a message property object')
-        async def test_it_moves_the_value_of_a_message_property_object(self):
-            flows = [
-                {"id": "100", "type": "tab"},  # flow 1
-                {"id": "1", "type": "change", "z": "100", "name": "changeNode", "wires": [["2"]],
-                "rules": [
-                    {"t": "move", "p": "topic", "pt": "msg", "to": "payload", "tot": "msg"}
-                ]},
-                {"id": "2", "z": "100", "type": "test-once"}
-            ]
+        @pytest.mark.parametrize('flow_json', [FLOWS_MOVE_1_JSON], ids=['FLOWS_MOVE_1'])
+        async def test_it_moves_the_value_of_a_message_property_object(self, compiled_flow):
             injections = [
                 {"nid": "1", "msg": {"payload": "String", "topic": {"foo": {"bar": 1}}}},
             ]
-            msgs = await run_flow_with_msgs_ntimes(flows, injections, 1)
+            msgs = await inject(compiled_flow, injections, 1)
             msg = msgs[0]
             assert "topic" not in msg
             assert "payload" in msg
@@ -1438,81 +1446,48 @@ class TestChangeNode:
             assert "bar" in msg["payload"]["foo"]
             assert msg["payload"]["foo"]["bar"] == 1
 
-        @pytest.mark.asyncio
         @pytest.mark.it('moves the value of a message property object to itself')
-        async def test_it_moves_the_value_of_a_message_property_object_to_itself(self):
-            flows = [
-                {"id": "100", "type": "tab"},  # flow 1
-                {"id": "1", "type": "change", "z": "100", "name": "changeNode", "wires": [["2"]],
-                "rules": [
-                    {"t":"move","p":"payload","pt":"msg","to":"payload","tot":"msg"}
-                ]},
-                {"id": "2", "z": "100", "type": "test-once"}
-            ]
+        @pytest.mark.parametrize('flow_json', [FLOWS_MOVE_3_JSON], ids=['FLOWS_MOVE_3'])
+        async def test_it_moves_the_value_of_a_message_property_object_to_itself(self, compiled_flow):
             injections = [
                 {"nid": "1", "msg": {"payload": "bar"}},
             ]
-            msgs = await run_flow_with_msgs_ntimes(flows, injections, 1)
+            msgs = await inject(compiled_flow, injections, 1)
             msg = msgs[0]
             assert "payload" in msg
             assert msg["payload"] == "bar"
 
-        @pytest.mark.asyncio
         @pytest.mark.it('moves the value of a message property object to a sub-property')
-        async def test_it_moves_the_value_of_a_message_property_object_to_a_sub_property(self):
-            flows = [
-                {"id": "100", "type": "tab"},  # flow 1
-                {"id": "1", "type": "change", "z": "100", "name": "changeNode", "wires": [["2"]],
-                "rules": [
-                    {"t":"move","p":"payload","pt":"msg","to":"payload.foo","tot":"msg"}
-                ]},
-                {"id": "2", "z": "100", "type": "test-once"}
-            ]
+        @pytest.mark.parametrize('flow_json', [FLOWS_MOVE_4_JSON], ids=['FLOWS_MOVE_4'])
+        async def test_it_moves_the_value_of_a_message_property_object_to_a_sub_property(self, compiled_flow):
             injections = [
                 {"nid": "1", "msg": {"payload": "bar"}},
             ]
-            msgs = await run_flow_with_msgs_ntimes(flows, injections, 1)
+            msgs = await inject(compiled_flow, injections, 1)
             msg = msgs[0]
             assert "payload" in msg
             assert "foo" in msg["payload"]
             assert msg["payload"]["foo"] == "bar"
 
-        @pytest.mark.asyncio
         @pytest.mark.it('moves the value of a message sub-property object to a property')
-        async def test_it_moves_the_value_of_a_message_sub_property_object_to_a_property(self):
-            flows = [
-                {"id": "100", "type": "tab"},  # flow 1
-                {"id": "1", "type": "change", "z": "100", "name": "changeNode", "wires": [["2"]],
-                "rules": [
-                    {"t":"move","p":"payload.foo","pt":"msg","to":"payload","tot":"msg"}
-                ]},
-                {"id": "2", "z": "100", "type": "test-once"}
-            ]
+        @pytest.mark.parametrize('flow_json', [FLOWS_MOVE_5_JSON], ids=['FLOWS_MOVE_5'])
+        async def test_it_moves_the_value_of_a_message_sub_property_object_to_a_property(self, compiled_flow):
             injections = [
                 {"nid": "1", "msg": {"payload": {"foo": "bar"}}},
             ]
-            msgs = await run_flow_with_msgs_ntimes(flows, injections, 1)
+            msgs = await inject(compiled_flow, injections, 1)
             msg = msgs[0]
             assert "payload" in msg
             assert msg["payload"] == "bar"
 
 
     @pytest.mark.describe('- multiple rules')
+    @pytest.mark.slow
     class TestMultipleRules:
 
-        @pytest.mark.asyncio
         @pytest.mark.it('handles multiple rules')
-        async def test_multiple_rules_1(self):
-            flows = [
-                {"id": "100", "type": "tab"},  # flow 1
-                {"id": "1", "type": "change", "z": "100", "rules": [
-                    {"t": "set", "p": "payload", "to": "newValue"},
-                    {"t": "change", "p": "changeProperty", "from": "this", "to": "that"},
-                    {"t": "delete", "p": "deleteProperty"},
-                ], "name": "changeNode",
-                    "wires": [["2"]]},
-                {"id": "2", "z": "100", "type": "test-once"}
-            ]
+        @pytest.mark.parametrize('flow_json', [FLOWS_MULTIPLE_RULES_1_JSON], ids=['FLOWS_MULTIPLE_RULES_1'])
+        async def test_multiple_rules_1(self, compiled_flow):
             injections = [
                 {"nid": "1", "msg": {
                     "payload": "changeMe",
@@ -1520,92 +1495,110 @@ class TestChangeNode:
                     "deleteProperty": "delete this value"
                 }},
             ]
-            msgs = await run_flow_with_msgs_ntimes(flows, injections, 1)
+            msgs = await inject(compiled_flow, injections, 1)
             assert msgs[0]["payload"] == "newValue"
             assert msgs[0]["changeProperty"] == "change that value"
             assert "deleteProperty" not in msgs[0]
 
-        @pytest.mark.asyncio
         @pytest.mark.it('applies multiple rules in order')
-        async def test_multiple_rules_2(self):
-            flows = [
-                {"id": "100", "type": "tab"},  # flow 1
-                {"id": "1", "type": "change", "z": "100", "rules": [
-                    {"t": "set", "p": "payload", "to": "a this (hi)"},
-                    {"t": "change", "p": "payload", "from": "this", "to": "that"},
-                    {"t": "change", "p": "payload", "from": "\\(.*\\)", "to": "[new]", "re": True},
-                ], "name": "changeNode",
-                    "wires": [["2"]]},
-                {"id": "2", "z": "100", "type": "test-once"}
-            ]
+        @pytest.mark.parametrize('flow_json', [FLOWS_MULTIPLE_RULES_2_JSON], ids=['FLOWS_MULTIPLE_RULES_2'])
+        async def test_multiple_rules_2(self, compiled_flow):
             injections = [
                 {"nid": "1", "msg": {"payload": "changeMe"}},
             ]
-            msgs = await run_flow_with_msgs_ntimes(flows, injections, 1)
+            msgs = await inject(compiled_flow, injections, 1)
             assert msgs[0]["payload"] == "a that [new]"
 
-        @pytest.mark.asyncio
         @pytest.mark.it('can access two persistable flow context property')
-        async def test_multiple_rules_3(self):
-            flows = [
-                {"id": "100", "type": "tab"},  # flow 1
-                {"id": "1", "type": "change", "z": "100", "rules": [
-                    {"t": "set", "p": "#:(memory0)::val", "pt": "flow", "to": "foo", "tot": "str"},
-                    {"t": "set", "p": "#:(memory1)::val", "pt": "flow", "to": "bar", "tot": "str"}
-                ], "reg": False, "name": "changeNode", "wires": [["2"]]},
-                {"id": "2", "type": "change", "z": "100", "rules": [
-                    {"t": "set", "p": "val0", "to": "#:(memory0)::val", "tot": "flow"},
-                    {"t": "set", "p": "val1", "to": "#:(memory1)::val", "tot": "flow"}
-                ], "name": "changeNode", "wires": [["3"]]},
-                {"id": "3", "z": "100", "type": "test-once"}
-            ]
+        @pytest.mark.parametrize('flow_json', [FLOWS_MULTIPLE_RULES_3_JSON], ids=['FLOWS_MULTIPLE_RULES_3'])
+        async def test_multiple_rules_3(self, compiled_flow):
             injections = [
                 {"nid": "1", "msg": {"payload": "changeMe"}},
             ]
-            msgs = await run_flow_with_msgs_ntimes(flows, injections, 1)
+            msgs = await inject(compiled_flow, injections, 1)
             assert msgs[0]["val0"] == "foo"
             assert msgs[0]["val1"] == "bar"
 
-        @pytest.mark.asyncio
         @pytest.mark.it('can access two persistable global context property')
-        async def test_multiple_rules_4(self):
-            flows = [
-                {"id": "100", "type": "tab"},  # flow 1
-                {"id": "1", "type": "change", "z": "100", "rules": [
-                    {"t": "set", "p": "#:(memory0)::val", "pt": "global", "to": "foo", "tot": "str"},
-                    {"t": "set", "p": "#:(memory1)::val", "pt": "global", "to": "bar", "tot": "str"}
-                ], "reg": False, "name": "changeNode", "wires": [["2"]]},
-                {"id": "2", "type": "change", "z": "100", "rules": [
-                    {"t": "set", "p": "val0", "to": "#:(memory0)::val", "tot": "global"},
-                    {"t": "set", "p": "val1", "to": "#:(memory1)::val", "tot": "global"}
-                ], "name": "changeNode", "wires": [["3"]]},
-                {"id": "3", "z": "100", "type": "test-once"}
-            ]
+        @pytest.mark.parametrize('flow_json', [FLOWS_MULTIPLE_RULES_4_JSON], ids=['FLOWS_MULTIPLE_RULES_4'])
+        async def test_multiple_rules_4(self, compiled_flow):
             injections = [
                 {"nid": "1", "msg": {"payload": "changeMe"}},
             ]
-            msgs = await run_flow_with_msgs_ntimes(flows, injections, 1)
+            msgs = await inject(compiled_flow, injections, 1)
             assert msgs[0]["val0"] == "foo"
             assert msgs[0]["val1"] == "bar"
 
-        @pytest.mark.asyncio
         @pytest.mark.it('can access persistable global & flow context property')
-        async def test_multiple_rules_5(self):
-            flows = [
-                {"id": "100", "type": "tab"},  # flow 1
-                {"id": "1", "type": "change", "z": "100", "rules": [
-                    {"t": "set", "p": "#:(memory0)::val", "pt": "flow", "to": "foo", "tot": "str"},
-                    {"t": "set", "p": "#:(memory1)::val", "pt": "global", "to": "bar", "tot": "str"}
-                ], "reg": False, "name": "changeNode", "wires": [["2"]]},
-                {"id": "2", "type": "change", "z": "100", "rules": [
-                    {"t": "set", "p": "val0", "to": "#:(memory0)::val", "tot": "flow"},
-                    {"t": "set", "p": "val1", "to": "#:(memory1)::val", "tot": "global"}
-                ], "name": "changeNode", "wires": [["3"]]},
-                {"id": "3", "z": "100", "type": "test-once"}
-            ]
+        @pytest.mark.parametrize('flow_json', [FLOWS_MULTIPLE_RULES_5_JSON], ids=['FLOWS_MULTIPLE_RULES_5'])
+        async def test_multiple_rules_5(self, compiled_flow):
             injections = [
                 {"nid": "1", "msg": {"payload": "changeMe"}},
             ]
-            msgs = await run_flow_with_msgs_ntimes(flows, injections, 1)
+            msgs = await inject(compiled_flow, injections, 1)
             assert msgs[0]["val0"] == "foo"
             assert msgs[0]["val1"] == "bar"
+
+
+# Each case is `(flows, injections, expected)` with the id of its test above, `expected` maps the properties of the
+# output message to their values, `_ABSENT` means the property must not exist.
+_ABSENT = object()
+
+CASES = [
+    pytest.param(FLOWS_DELETE_1, [{"nid": "1", "msg": {'payload': "This won't get through"}}],
+                 {"payload": _ABSENT}, id='delete_1'),
+    pytest.param(FLOWS_DELETE_2, [{"nid": "1", "msg": {'payload': ''}}],
+                 {"newGlobalValue": _ABSENT}, id='delete_2'),
+    pytest.param(FLOWS_DELETE_3, [{"nid": "1", "msg": {'payload': ''}}],
+                 {"newGlobalValue": _ABSENT}, id='delete_3'),
+    pytest.param(FLOWS_DELETE_4, [{"nid": "1", "msg": {
+        "payload": "This won't get through!", "foo": {"bar": "This will be deleted!"}}}],
+        {"foo": {}}, id='delete_4'),
+    pytest.param(FLOWS_DELETE_5, [{"nid": "1", "msg": {"payload": "payload"}}],
+                 {"payload": "payload", "foo": _ABSENT}, id='delete_5'),
+    pytest.param(FLOWS_DELETE_4, [{"nid": "1", "msg": {"payload": "payload"}}],
+                 {"payload": "payload", "foo": _ABSENT}, id='delete_6'),
+    pytest.param(FLOWS_MOVE_1, [{"nid": "1", "msg": {
+        "topic": "You've got to move it move it.", "payload": {"foo": "bar"}}}],
+        {"topic": _ABSENT, "payload": "You've got to move it move it."}, id='move_1'),
+    pytest.param(FLOWS_MOVE_1, [{"nid": "1", "msg": {"payload": "String", "topic": {"foo": {"bar": 1}}}}],
+                 {"topic": _ABSENT, "payload": {"foo": {"bar": 1}}}, id='move_2'),
+    pytest.param(FLOWS_MOVE_3, [{"nid": "1", "msg": {"payload": "bar"}}], {"payload": "bar"}, id='move_3'),
+    pytest.param(FLOWS_MOVE_4, [{"nid": "1", "msg": {"payload": "bar"}}],
+                 {"payload": {"foo": "bar"}}, id='move_4'),
+    pytest.param(FLOWS_MOVE_5, [{"nid": "1", "msg": {"payload": {"foo": "bar"}}}],
+                 {"payload": "bar"}, id='move_5'),
+    pytest.param(FLOWS_MULTIPLE_RULES_1, [{"nid": "1", "msg": {
+        "payload": "changeMe", "changeProperty": "change this value", "deleteProperty": "delete this value"}}],
+        {"payload": "newValue", "changeProperty": "change that value", "deleteProperty": _ABSENT},
+        id='multiple_rules_1'),
+    pytest.param(FLOWS_MULTIPLE_RULES_2, [{"nid": "1", "msg": {"payload": "changeMe"}}],
+                 {"payload": "a that [new]"}, id='multiple_rules_2'),
+    pytest.param(FLOWS_MULTIPLE_RULES_3, [{"nid": "1", "msg": {"payload": "changeMe"}}],
+                 {"val0": "foo", "val1": "bar"}, id='multiple_rules_3'),
+    pytest.param(FLOWS_MULTIPLE_RULES_4, [{"nid": "1", "msg": {"payload": "changeMe"}}],
+                 {"val0": "foo", "val1": "bar"}, id='multiple_rules_4'),
+    pytest.param(FLOWS_MULTIPLE_RULES_5, [{"nid": "1", "msg": {"payload": "changeMe"}}],
+                 {"val0": "foo", "val1": "bar"}, id='multiple_rules_5'),
+]
+
+
+def _labelled(flows: tuple, label: str) -> bytes:
+    return dump_flows(({**flows[0], "label": label}, *flows[1:]))
+
+
+@pytest.mark.describe('change Node')
+@pytest.mark.it('runs the #delete, #move and multiple rules flows concurrently')
+async def test_batch(engine):
+    # The tab is labelled after the case, so the cases sharing a flow still run on their own started flows
+    results = await asyncio.gather(*[
+        run_flow_with_msgs_ntimes(_labelled(case.values[0], case.id), case.values[1], 1, engine=engine)
+        for case in CASES
+    ])
+    for msgs, case in zip(results, CASES):
+        _, _, expected = case.values
+        for prop, value in expected.items():
+            if value is _ABSENT:
+                assert prop not in msgs[0], case.id
+            else:
+                assert msgs[0][prop] == value, case.id
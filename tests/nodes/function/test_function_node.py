@@ -1,385 +1,85 @@
+import asyncio
+import functools
 import pytest
-import os
+import pytest_asyncio
+from types import MappingProxyType
 
-from tests import *
+from tests import (SINK, TAB, dump_flows, msg_views, run_flow_with_msgs_ntimes, run_flows_with_multi_injections,
+                   run_with_single_node_ntimes)
 
-# 0001 should do something with the catch node
-
-@pytest.mark.describe('function node')
-class TestFunctionNode:
-
-    @pytest.mark.asyncio
-    @pytest.mark.it('should send returned message using send()')
-    async def test_it_should_send_returned_message_using_send_0(self):
-        flows = [
-            {"id": "100", "type": "tab"},  # flow 1
-            {"id": "1", "type": "function", "z": "100", "wires": [["2"]], "func": "node.send(msg);"},
-            {"id": "2", "z": "100", "type": "test-once"}
-        ]
-        injections = [
-            {"nid": "1", "msg": {'payload': 'foo', 'topic': 'bar'}},
-        ]
-        msgs = await run_flow_with_msgs_ntimes(flows, injections, 1)
-        assert msgs[0]["topic"] == "bar"
-        assert msgs[0]["payload"] == "foo"
-
-    @pytest.mark.asyncio
-    @pytest.mark.it('should send returned message')
-    async def test_it_should_send_returned_message(self):
-        flows = [
-            {"id": "100", "type": "tab"},  # flow 1
-            {"id": "1", "type": "function", "z": "100", "wires": [["2"]], "func": "return msg;"},
-            {"id": "2", "z": "100", "type": "test-once"}
-        ]
-        injections = [
-            {"nid": "1", "msg": {'payload': 'foo', 'topic': 'bar'}},
-        ]
-        msgs = await run_flow_with_msgs_ntimes(flows, injections, 1)
-        assert msgs[0]['topic'] == 'bar'
-        assert msgs[0]['payload'] == 'foo'
-
-    @pytest.mark.asyncio
-    @pytest.mark.it('should send returned message using send()')
-    async def test_it_should_send_returned_message_using_send_1(self):
-        flows = [
-            {"id": "100", "type": "tab"},  # flow 1
-            {"id": "1", "type": "function", "z": "100", "wires": [["2"]], "func": "node.send(msg);"},
-            {"id": "2", "z": "100", "type": "test-once"}
-        ]
-        injections = [
-            {"nid": "1", "msg": {'payload': 'foo', 'topic': 'bar'}},
-        ]
-        msgs = await run_flow_with_msgs_ntimes(flows, injections, 1)
-        assert msgs[0]["topic"] == "bar"
-        assert msgs[0]["payload"] == "foo"
-
-    @pytest.mark.asyncio
-    @pytest.mark.it('should allow accessing node.id and node.name and node.outputCount')
-    async def test_it_should_allow_accessing_node_id_and_node_name_and_node_output_count(self):
-        flows = [
-            {"id": "100", "type": "tab"},  # flow 1
-            {"id": "1", "type": "function", "z": "100", "name": "test-function", "wires": [["2"]], "outputs": 2,
-                "func": "return [{ topic: node.name, payload:node.id, outputCount: node.outputCount }];",
-             },
-            {"id": "2", "z": "100", "type": "test-once"}
-        ]
-        injections = [
-            {"nid": "1", "msg": {'payload': ''}},
-        ]
-        msgs = await run_flow_with_msgs_ntimes(flows, injections, 1)
-        assert msgs[0]["payload"] == "0000000000000001"
-        assert msgs[0]["topic"] == "test-function"
-        assert msgs[0]["outputCount"] == 2
-
-    async def _test_send_cloning(self, args):
-        flows = [
-            {"id": "100", "type": "tab"},  # flow 1
-            {"id": "1", "type": "function", "z": "100", "wires": [["2"], ["2"]],
-                "func": f"node.send({args}); msg.payload = 'changed';"},
-            {"id": "2", "z": "100", "type": "test-once"}
-        ]
-        injections = [
-            {"nid": "1", "msg": {'payload': 'foo', 'topic': 'bar'}},
-        ]
-        msgs = await run_flow_with_msgs_ntimes(flows, injections, 1)
-        assert msgs[0]["topic"] == "bar"
-        assert msgs[0]["payload"] == "foo"
-
-    @pytest.mark.skip
-    @pytest.mark.asyncio
-    @pytest.mark.it('should clone single message sent using send()')
-    async def test_it_should_clone_single_message_sent_using_send_2(self):
-        await self._test_send_cloning("msg")
-
-    # Not supported, yet
-
-    @pytest.mark.skip
-    @pytest.mark.asyncio
-    @pytest.mark.it('should not clone single message sent using send(,false)')
-    async def test_it_should_not_clone_single_message_sent_using_send_false(self):
-        flows = [
-            {"id": "100", "type": "tab"},  # flow 1
-            {"id": "1", "type": "function", "z": "100", "wires": [
-                ["2"]], "func": "node.send(msg,false); msg.payload = 'changed';"},
-            {"id": "2", "z": "100", "type": "test-once"}
-        ]
-        injections = [
-            {"nid": "1", "msg": {'payload': 'foo', 'topic': 'bar'}},
-        ]
-        msgs = await run_flow_with_msgs_ntimes(flows, injections, 1)
-        assert msgs[0]["topic"] == "bar"
-        assert msgs[0]["payload"] == "changed"
+# The tab, function node and sink most of the tests below share, see `_flow()`
+_FLOW_PROTO = (TAB, MappingProxyType({"id": "1", "type": "function", "z": "100", "wires": (("2",),)}), SINK)
 
-    @pytest.mark.asyncio
-    @pytest.mark.it('should clone first message sent using send() - array 1')
-    async def test_it_should_clone_first_message_sent_using_send_array_1(self):
-        await self._test_send_cloning("[msg]")
 
-    @pytest.mark.asyncio
-    @pytest.mark.it('should clone first message sent using send() - array 2')
-    async def test_it_should_clone_first_message_sent_using_send_array_2(self):
-        await self._test_send_cloning("[[msg],[null]]")
+class _JS:
+    """The function bodies several tests share, spelled out once so the tests using them can not drift apart"""
+    RET_MSG = "return msg;"
+    SEND_MSG = "node.send(msg);"
+    CTX_SET_GET_COUNT = "context.set('count','0'); msg.count=context.get('count'); return msg;"
 
-    @pytest.mark.asyncio
-    @pytest.mark.it('should clone first message sent using send() - array 3')
-    async def test_it_should_clone_first_message_sent_using_send_array_3(self):
-        await self._test_send_cloning("[null,msg]")
-
-    @pytest.mark.asyncio
-    @pytest.mark.it('should clone first message sent using send() - array 3')
-    async def test_it_should_clone_first_message_sent_using_send_array_3_1(self):
-        await self._test_send_cloning("[null,[msg]]")
-
-    @pytest.mark.asyncio
-    @pytest.mark.it('should pass through _topic')
-    async def test_it_should_pass_through__topic(self):
-        flows = [
-            {"id": "100", "type": "tab"},  # flow 1
-            {"id": "1", "type": "function", "z": "100", "wires": [["2"]], "func": "return msg;"},
-            {"id": "2", "z": "100", "type": "test-once"}
-        ]
-        injections = [
-            {"nid": "1", "msg": {'payload': 'foo', 'topic': 'bar', '_topic': 'barz'}},
-        ]
-        msgs = await run_flow_with_msgs_ntimes(flows, injections, 1)
-        assert msgs[0]["topic"] == "bar"
-        assert msgs[0]["payload"] == "foo"
-        assert msgs[0]["_topic"] == "barz"
 
-    @pytest.mark.asyncio
-    @pytest.mark.it('should send to multiple outputs')
-    async def test_it_should_send_to_multiple_outputs(self):
-        node = {
-            "type": "function",
-            "func": "var msg2 = RED.util.cloneMessage(msg); msg2.payload='p2'; return [msg, msg2];",
-            "wires": [["3"], ["3"]]
-        }
-        msgs = await run_with_single_node_ntimes('str', 'foo', node, 2, once=True, topic='bar')
-        assert msgs[0]['topic'] == 'bar'
-        assert msgs[0]['topic'] == msgs[1]['topic']
-        assert msgs[0]['payload'] != msgs[1]['payload']
-        assert sorted([msgs[0]['payload'], msgs[1]['payload']]) == ['foo', 'p2']
+# `pytest.mark.it` builds a new MarkDecorator on every call, identical descriptions share one
+_it = functools.lru_cache(maxsize=None)(lambda s: pytest.mark.it(s))
 
-    @pytest.mark.asyncio
-    @pytest.mark.it('should send to multiple messages')
-    async def test_it_should_send_to_multiple_message(self):
-        flows = [
-            {"id": "100", "type": "tab"},  # flow 1
-            {"id": "1", "type": "function", "z": "100", "wires": [
-                ["2"]], "func": "return [[{payload: 1},{payload: 2}]];"},
-            {"id": "2", "z": "100", "type": "test-once"}
-        ]
-        injections = [
-            # TODO FIXME, MSGID SHOULD ALLOWED i64/u64
-            {"nid": "1", "msg": {'payload': 'foo', 'topic': 'bar', '_msgid': '1234'}},
-        ]
-        msgs = await run_flow_with_msgs_ntimes(flows, injections, 2)
-        assert msgs[0]['_msgid'] == msgs[1]['_msgid'] == 0x1234
-        assert msgs[0]['payload'] == 1
-        assert msgs[1]['payload'] == 2
 
-    # TODO the testing frame has no way to handle time-out for now
+@functools.lru_cache(maxsize=None)
+def _flow(func: str, **kwargs) -> bytes:
+    """
+    Returns the shared single function node flow, already serialized.
 
-    @pytest.mark.skip
-    @pytest.mark.asyncio
-    @pytest.mark.it('should allow input to be discarded by returning null')
-    async def test_it_should_allow_input_to_be_discarded_by_returning_null(self):
-        flows = [
-            {"id": "100", "type": "tab"},  # flow 1
-            {"id": "1", "type": "function", "z": "100", "wires": [["2"]], "func": "return null;"},
-            {"id": "2", "z": "100", "type": "test-once"}
-        ]
-        injections = [
-            {"nid": "1", "msg": {'payload': 'foo', 'topic': 'bar'}},
-        ]
-        msgs = await run_flow_with_msgs_ntimes(flows, injections, 0)
+    Every distinct flow is serialized only once, its JSON is also what the session engine keeps the started flows by.
+    """
+    return dump_flows([_FLOW_PROTO[0], {**_FLOW_PROTO[1], "func": func, **kwargs}, _FLOW_PROTO[2]])
 
-    @pytest.mark.asyncio
-    @pytest.mark.it('should handle null amongst valid messages')
-    async def test_it_should_handle_null_amongst_valid_messages(self):
-        flows = [
-            {"id": "100", "type": "tab"},  # flow 1
-            {"id": "1", "type": "function", "z": "100", "wires": [["2"]], "func": "return [[msg,null,msg],null];"},
-            {"id": "2", "z": "100", "type": "test-once"},
-            {"id": "3", "z": "100", "type": "test-once"},
-        ]
-        injections = [
-            {"nid": "1", "msg": {'payload': 'foo', 'topic': 'bar'}}
-        ]
-        msgs = await run_flow_with_msgs_ntimes(flows, injections, 2)
-        assert len(msgs) == 2
 
-    @pytest.mark.asyncio
-    @pytest.mark.it('should get keys in global context')
-    async def test_it_should_get_keys_in_global_context(self):
-        flows = [
-            {"id": "100", "type": "tab"},  # flow 1
-            {"id": "1", "type": "change", "z": "100", "rules": [
-                {"t": "set", "p": "count", "pt": "global", "to": "0", "tot": "num"}
-            ], "reg": False, "name": "changeNode", "wires": [["2"]]},
-            {"id": "2", "type": "function", "z": "100", "wires": [
-                ["3"]], "func": "msg.payload=global.keys();return msg;"},
-            {"id": "3", "z": "100", "type": "test-once"},
-        ]
-        injections = [
-            {"nid": "1", "msg": {'payload': 'foo', 'topic': 'bar'}}
-        ]
-        msgs = await run_flow_with_msgs_ntimes(flows, injections, 1)
-        assert msgs[0]["topic"] == "bar"
-        assert msgs[0]["payload"] == ['count']
+# The injection most of the tests below send, read-only so every test can share it
+_INJ = (MappingProxyType({"nid": "1", "msg": MappingProxyType({'payload': 'foo', 'topic': 'bar'})}),)
 
-    async def _test_non_object_message(self, function_text):
-        flows = [
-            {"id": "100", "type": "tab"},  # flow 1
-            {"id": "2", "type": "function", "z": "100", "wires": [
-                ["3"]], "func": function_text},
-            {"id": "3", "z": "100", "type": "test-once"},
-        ]
-        injections = [
-            {"nid": "1", "msg": {}}
-        ]
-        msgs = await run_flow_with_msgs_ntimes(flows, injections, 1)
-        # assert msgs[0]["level"] == "ERROR"
-        # assert msgs[0]["id"] == '0000000000000001'
-        # assert msgs[0]["type"] == 'function'
-        # assert msgs[0]["msg"] == 'function.error.non-message-returned'
 
-    @pytest.mark.skip
-    @pytest.mark.asyncio
-    @pytest.mark.it('should drop and log non-object message types - string')
-    async def test_it_should_drop_and_log_non_object_message_types_string(self):
-        await self._test_non_object_message('return "foo"')
+def _ctx_flow(func: str, **kwargs) -> tuple[bytes, tuple]:
+    """Returns the single function node flow of `func` and the shared `_INJ` injection to feed it with"""
+    return _flow(func, **kwargs), _INJ
 
-    @pytest.mark.skip
-    @pytest.mark.asyncio
-    @pytest.mark.it('should drop and log non-object message types - buffer')
-    async def test_it_should_drop_and_log_non_object_message_types_buffer(self):
-        await self._test_non_object_message('return Buffer.from("hello")')
 
-    @pytest.mark.skip
-    @pytest.mark.asyncio
-    @pytest.mark.it('should drop and log non-object message types - array')
-    async def test_it_should_drop_and_log_non_object_message_types_array(self):
-        await self._test_non_object_message('return [[[1,2,3]]]')
+def _payloads_eq(msgs: list[object], expected: list) -> bool:
+    """
+    Whether the payloads of `msgs` are the `expected` ones, each as many times, in any order.
 
-    @pytest.mark.skip
-    @pytest.mark.asyncio
-    @pytest.mark.it('should drop and log non-object message types - boolean')
-    async def test_it_should_drop_and_log_non_object_message_types_boolean(self):
-        await self._test_non_object_message('return true')
+    Only for outputs whose order is not deterministic, like several ports wired to the same node. Payloads are ordered
+    by their `repr()`, so unhashable and mutually incomparable payloads work too.
+    """
+    return sorted((msg.payload for msg in msgs), key=repr) == sorted(expected, key=repr)
 
-    @pytest.mark.skip
-    @pytest.mark.asyncio
-    @pytest.mark.it('should drop and log non-object message types - number')
-    async def test_it_should_drop_and_log_non_object_message_types_number(self):
-        await self._test_non_object_message('return 123')
 
-    @pytest.mark.asyncio
-    @pytest.mark.it('should set node context')
-    async def test_it_should_set_node_context(self):
-        flows = [
-            {"id": "100", "type": "tab"},  # flow 1
-            {"id": "1", "type": "function", "z": "100", "wires": [
-                ["2"]], "func": "context.set('count','0'); msg.count=context.get('count'); return msg;"},
-            {"id": "2", "z": "100", "type": "test-once"},
-        ]
-        injections = [
-            {"nid": "1", "msg": {'payload': 'foo', 'topic': 'bar'}}
-        ]
-        msgs = await run_flow_with_msgs_ntimes(flows, injections, 1)
-        assert msgs[0]["topic"] == "bar"
-        assert msgs[0]["payload"] == "foo"
-        assert msgs[0]["count"] == "0"
-
-    @pytest.mark.asyncio
-    @pytest.mark.it('should set persistable node context (w/o callback)')
-    async def test_it_should_set_persistable_node_context_w_o_callback(self):
-        flows = [
-            {"id": "100", "type": "tab"},  # flow 1
-            {"id": "1", "type": "function", "z": "100", "wires": [
-                ["2"]], "func": "context.set('count','0','memory1'); msg.count=context.get('count', 'memory1'); return msg;"},
-            {"id": "2", "z": "100", "type": "test-once"},
-        ]
-        injections = [
-            {"nid": "1", "msg": {'payload': 'foo', 'topic': 'bar'}}
-        ]
-        msgs = await run_flow_with_msgs_ntimes(flows, injections, 1)
-        assert msgs[0]["topic"] == "bar"
-        assert msgs[0]["payload"] == "foo"
-        assert msgs[0]["count"] == "0"
-
-    @pytest.mark.asyncio
-    @pytest.mark.it('should set two persistable node context (w/o callback)')
-    async def test_it_should_set_two_persistable_node_context_w_o_callback(self):
-        flows = [
-            {"id": "100", "type": "tab"},  # flow 1
-            {"id": "1", "type": "function", "z": "100", "wires": [
-                ["2"]], "func": r'''
+# The node, flow and global context cases only differ in the function and in what it leaves in the message
+_SET_CONTEXT_CASES = [
+    pytest.param(
+        _JS.CTX_SET_GET_COUNT,
+        {'count': '0'},
+        id='should set node context'
+    ),
+    pytest.param(
+        "context.set('count','0','memory1'); msg.count=context.get('count', 'memory1'); return msg;",
+        {'count': '0'},
+        id='should set persistable node context (w/o callback)'
+    ),
+    pytest.param(
+        r'''
                 context.set('count','0','memory1');
                 context.set('count','1','memory2');
                 msg.count0 = context.get('count','memory1');
                 msg.count1 = context.get('count','memory2');
-                return msg;'''},
-            {"id": "2", "z": "100", "type": "test-once"},
-        ]
-        injections = [
-            {"nid": "1", "msg": {'payload': 'foo', 'topic': 'bar'}}
-        ]
-        msgs = await run_flow_with_msgs_ntimes(flows, injections, 1)
-        assert msgs[0]["topic"] == "bar"
-        assert msgs[0]["payload"] == "foo"
-        assert msgs[0]["count0"] == "0"
-        assert msgs[0]["count1"] == "1"
-
-    @pytest.mark.skip
-    @pytest.mark.asyncio
-    @pytest.mark.it('should set two persistable node context (single call, w/o callback)')
-    async def test_it_should_set_two_persistable_node_context_single_call_w_o_callback(self):
-        flows = [
-            {"id": "100", "type": "tab"},  # flow 1
-            {"id": "1", "type": "function", "z": "100", "wires": [["2"]], "func":
-             r"""
-                context.set(['count1', 'count2'], ['0', '1'], 'memory1', err => {
-                    msg.count0 = context.get('count1', 'memory1');
-                    msg.count1 = context.get('count2', 'memory1');
-                }); 
-                return msg;
-             """},
-            {"id": "2", "z": "100", "type": "test-once"},
-        ]
-        injections = [
-            {"nid": "1", "msg": {'payload': 'foo', 'topic': 'bar'}}
-        ]
-        msgs = await run_flow_with_msgs_ntimes(flows, injections, 1)
-        assert msgs[0]["topic"] == "bar"
-        assert msgs[0]["payload"] == "foo"
-        assert msgs[0]["count0"] == "0"
-        assert msgs[0]["count1"] == "1"
-
-    @pytest.mark.asyncio
-    @pytest.mark.it('should set persistable node context (w callback)')
-    async def test_it_should_set_persistable_node_context_w_callback(self):
-        flows = [
-            {"id": "100", "type": "tab"},  # flow 1
-            {"id": "1", "type": "function", "z": "100", "wires": [["2"]], "func":
-             r"context.set('count','0','memory1', function (err) { msg.count=context.get('count', 'memory1'); node.send(msg); });"},
-            {"id": "2", "z": "100", "type": "test-once"},
-        ]
-        injections = [
-            {"nid": "1", "msg": {'payload': 'foo', 'topic': 'bar'}}
-        ]
-        msgs = await run_flow_with_msgs_ntimes(flows, injections, 1)
-        assert msgs[0]["topic"] == "bar"
-        assert msgs[0]["payload"] == "foo"
-        assert msgs[0]["count"] == "0"
-
-    @pytest.mark.asyncio
-    @pytest.mark.it('should set two persistable node context (w callback)')
-    async def test_it_should_set_two_persistable_node_context_w_callback(self):
-        flows = [
-            {"id": "100", "type": "tab"},  # flow 1
-            {"id": "1", "type": "function", "z": "100", "wires": [["2"]], "func":
-             r"""
+                return msg;''',
+        {'count0': '0', 'count1': '1'},
+        id='should set two persistable node context (w/o callback)'
+    ),
+    pytest.param(
+        r"context.set('count','0','memory1', function (err) { msg.count=context.get('count', 'memory1'); node.send(msg); });",
+        {'count': '0'},
+        id='should set persistable node context (w callback)'
+    ),
+    pytest.param(
+        r"""
                 context.set('count','0','memory1', function (err) { 
                     msg.count0 = context.get('count','memory1');
                     context.set('count', '1', 'memory2', function (err) { 
@@ -387,231 +87,42 @@ class TestFunctionNode:
                         node.send(msg); 
                     }); 
                 });
-            """},
-            {"id": "2", "z": "100", "type": "test-once"},
-        ]
-        injections = [
-            {"nid": "1", "msg": {'payload': 'foo', 'topic': 'bar'}}
-        ]
-        msgs = await run_flow_with_msgs_ntimes(flows, injections, 1)
-        assert msgs[0]["topic"] == "bar"
-        assert msgs[0]["payload"] == "foo"
-        assert msgs[0]["count0"] == "0"
-        assert msgs[0]["count1"] == "1"
-
-    @pytest.mark.asyncio
-    @pytest.mark.it('should set default persistable node context')
-    async def test_it_should_set_default_persistable_node_context(self):
-        flows = [
-            {"id": "100", "type": "tab"},  # flow 1
-            {"id": "1", "type": "function", "z": "100", "wires": [["2"]], "func":
-             r"context.set('count','0'); msg.count=context.get('count'); return msg;"},
-            {"id": "2", "z": "100", "type": "test-once"},
-        ]
-        injections = [
-            {"nid": "1", "msg": {'payload': 'foo', 'topic': 'bar'}}
-        ]
-        msgs = await run_flow_with_msgs_ntimes(flows, injections, 1)
-        assert msgs[0]["topic"] == "bar"
-        assert msgs[0]["payload"] == "foo"
-        assert msgs[0]["count"] == "0"
-
-    @pytest.mark.asyncio
-    @pytest.mark.it('should get node context')
-    async def test_it_should_get_node_context(self):
-        flows = [
-            {"id": "100", "type": "tab"},  # flow 1
-            {"id": "1", "type": "function", "z": "100", "wires": [["2"]], "func":
-             r"context.set('count','0'); msg.payload=context.get('count'); return msg;"},
-            {"id": "2", "z": "100", "type": "test-once"},
-        ]
-        injections = [
-            {"nid": "1", "msg": {'payload': 'foo', 'topic': 'bar'}}
-        ]
-        msgs = await run_flow_with_msgs_ntimes(flows, injections, 1)
-        assert msgs[0]["topic"] == "bar"
-        assert msgs[0]["payload"] == "0"
-
-    @pytest.mark.asyncio
-    @pytest.mark.it('should get persistable node context (w/o callback)')
-    async def test_it_should_get_persistable_node_context__w_o_callback(self):
-        flows = [
-            {"id": "100", "type": "tab"},  # flow 1
-            {"id": "1", "type": "function", "z": "100", "wires": [["2"]], "func":
-             r"context.set('count','0','memory1'); msg.payload=context.get('count','memory1');return msg;"},
-            {"id": "2", "z": "100", "type": "test-once"},
-        ]
-        injections = [
-            {"nid": "1", "msg": {'payload': 'foo', 'topic': 'bar'}}
-        ]
-        msgs = await run_flow_with_msgs_ntimes(flows, injections, 1)
-        assert msgs[0]["topic"] == "bar"
-        assert msgs[0]["payload"] == "0"
-
-    @pytest.mark.asyncio
-    @pytest.mark.it('should get persistable node context (w/ callback)')
-    async def test_it_should_get_persistable_node_context_w_callback(self):
-        flows = [
-            {"id": "100", "type": "tab"},  # flow 1
-            {"id": "1", "type": "function", "z": "100", "wires": [["2"]], "func":
-             r"context.set('count','0','memory1'); context.get('count','memory1',function (err, val) { msg.payload=val; node.send(msg); });"},
-            {"id": "2", "z": "100", "type": "test-once"},
-        ]
-        injections = [
-            {"nid": "1", "msg": {'payload': 'foo', 'topic': 'bar'}}
-        ]
-        msgs = await run_flow_with_msgs_ntimes(flows, injections, 1)
-        assert msgs[0]["topic"] == "bar"
-        assert msgs[0]["payload"] == "0"
-
-    @pytest.mark.asyncio
-    @pytest.mark.it('should get keys in node context')
-    async def test_it_should_get_keys_in_node_context(self):
-        flows = [
-            {"id": "100", "type": "tab"},  # flow 1
-            {"id": "1", "type": "function", "z": "100", "wires": [["2"]], "func":
-             r"context.set('count','0'); msg.payload=context.keys();return msg;"},
-            {"id": "2", "z": "100", "type": "test-once"},
-        ]
-        injections = [
-            {"nid": "1", "msg": {'payload': 'foo', 'topic': 'bar'}}
-        ]
-        msgs = await run_flow_with_msgs_ntimes(flows, injections, 1)
-        assert msgs[0]["topic"] == "bar"
-        assert msgs[0]["payload"] == ["count"]
-
-    @pytest.mark.asyncio
-    @pytest.mark.it('should get keys in persistable node context (w/o callback)')
-    async def test_it_should_get_keys_in_persistable_node_context_w_o_callback(self):
-        flows = [
-            {"id": "100", "type": "tab"},  # flow 1
-            {"id": "1", "type": "function", "z": "100", "wires": [["2"]], "func":
-             r"context.set('count','0','memory1'); msg.payload=context.keys('memory1');return msg;"},
-            {"id": "2", "z": "100", "type": "test-once"},
-        ]
-        injections = [
-            {"nid": "1", "msg": {'payload': 'foo', 'topic': 'bar'}}
-        ]
-        msgs = await run_flow_with_msgs_ntimes(flows, injections, 1)
-        assert msgs[0]["topic"] == "bar"
-        assert msgs[0]["payload"] == ["count"]
-
-    @pytest.mark.asyncio
-    @pytest.mark.it('should get keys in persistable node context (w/ callback)')
-    async def test_it_should_get_keys_in_persistable_node_context_w_callback(self):
-        flows = [
-            {"id": "100", "type": "tab"},  # flow 1
-            {"id": "1", "type": "function", "z": "100", "wires": [["2"]], "func":
-             r"context.set('count','0','memory1'); context.keys('memory1', function(err, keys) { msg.payload=keys; node.send(msg); });"},
-            {"id": "2", "z": "100", "type": "test-once"},
-        ]
-        injections = [
-            {"nid": "1", "msg": {'payload': 'foo', 'topic': 'bar'}}
-        ]
-        msgs = await run_flow_with_msgs_ntimes(flows, injections, 1)
-        assert msgs[0]["topic"] == "bar"
-        assert msgs[0]["payload"] == ["count"]
-
-    @pytest.mark.asyncio
-    @pytest.mark.it('should get keys in default persistable node context')
-    async def test_it_should_get_keys_in_default_persistable_node_context(self):
-        # n1.context().set("count","0","memory1");
-        # n1.context().set("number","1","memory2");
-        flows = [
-            {"id": "100", "type": "tab"},  # flow 1
-            {"id": "1", "type": "function", "z": "100", "wires": [["2"]], "func":  # FIXME TODO
-             r"context.set('count','0'); context.set('number','1','memory2'); msg.payload=context.keys();return msg;"},
-            {"id": "2", "z": "100", "type": "test-once"},
-        ]
-        injections = [
-            {"nid": "1", "msg": {'payload': 'foo', 'topic': 'bar'}}
-        ]
-        msgs = await run_flow_with_msgs_ntimes(flows, injections, 1)
-        assert msgs[0]["topic"] == "bar"
-        assert msgs[0]["payload"] == ["count"]
-    #
-
-    @pytest.mark.asyncio
-    @pytest.mark.it('should set flow context')
-    async def test_it_should_set_flow_context(self):
-        flows = [
-            {"id": "100", "type": "tab"},  # flow 1
-            {"id": "1", "type": "function", "z": "100", "wires": [["2"]], "func":
-             r"flow.set('count','0'); msg.count=flow.get('count'); return msg;"},
-            {"id": "2", "z": "100", "type": "test-once"},
-        ]
-        injections = [
-            {"nid": "1", "msg": {'payload': 'foo', 'topic': 'bar'}}
-        ]
-        msgs = await run_flow_with_msgs_ntimes(flows, injections, 1)
-        assert msgs[0]["topic"] == "bar"
-        assert msgs[0]["payload"] == "foo"
-        assert msgs[0]["count"] == "0"
-
-    @pytest.mark.asyncio
-    @pytest.mark.it('should set persistable flow context (w/o callback)')
-    async def test_it_should_set_persistable_flow_context_w_o_callback(self):
-        flows = [
-            {"id": "100", "type": "tab"},  # flow 1
-            {"id": "1", "type": "function", "z": "100", "wires": [
-                ["2"]], "func": "flow.set('count','0','memory1'); msg.count=flow.get('count', 'memory1'); return msg;"},
-            {"id": "2", "z": "100", "type": "test-once"},
-        ]
-        injections = [
-            {"nid": "1", "msg": {'payload': 'foo', 'topic': 'bar'}}
-        ]
-        msgs = await run_flow_with_msgs_ntimes(flows, injections, 1)
-        assert msgs[0]["topic"] == "bar"
-        assert msgs[0]["payload"] == "foo"
-        assert msgs[0]["count"] == "0"
-
-    @pytest.mark.asyncio
-    @pytest.mark.it('should set two persistable flow context (w/o callback)')
-    async def test_it_should_set_two_persistable_flow_context_w_o_callback(self):
-        flows = [
-            {"id": "100", "type": "tab"},  # flow 1
-            {"id": "1", "type": "function", "z": "100", "wires": [
-                ["2"]], "func": r'''
+            """,
+        {'count0': '0', 'count1': '1'},
+        id='should set two persistable node context (w callback)'
+    ),
+    pytest.param(
+        _JS.CTX_SET_GET_COUNT,
+        {'count': '0'},
+        id='should set default persistable node context'
+    ),
+    pytest.param(
+        r"flow.set('count','0'); msg.count=flow.get('count'); return msg;",
+        {'count': '0'},
+        id='should set flow context'
+    ),
+    pytest.param(
+        "flow.set('count','0','memory1'); msg.count=flow.get('count', 'memory1'); return msg;",
+        {'count': '0'},
+        id='should set persistable flow context (w/o callback)'
+    ),
+    pytest.param(
+        r'''
                 flow.set('count','0','memory1');
                 flow.set('count','1','memory2');
                 msg.count0 = flow.get('count','memory1');
                 msg.count1 = flow.get('count','memory2');
-                return msg;'''},
-            {"id": "2", "z": "100", "type": "test-once"},
-        ]
-        injections = [
-            {"nid": "1", "msg": {'payload': 'foo', 'topic': 'bar'}}
-        ]
-        msgs = await run_flow_with_msgs_ntimes(flows, injections, 1)
-        assert msgs[0]["topic"] == "bar"
-        assert msgs[0]["payload"] == "foo"
-        assert msgs[0]["count0"] == "0"
-        assert msgs[0]["count1"] == "1"
-
-    @pytest.mark.asyncio
-    @pytest.mark.it('should set persistable flow context (w/ callback)')
-    async def test_it_should_set_persistable_flow_context_w_callback(self):
-        flows = [
-            {"id": "100", "type": "tab"},  # flow 1
-            {"id": "1", "type": "function", "z": "100", "wires": [["2"]], "func":
-             r"flow.set('count','0','memory1', function (err) { msg.count=flow.get('count', 'memory1'); node.send(msg); });"},
-            {"id": "2", "z": "100", "type": "test-once"},
-        ]
-        injections = [
-            {"nid": "1", "msg": {'payload': 'foo', 'topic': 'bar'}}
-        ]
-        msgs = await run_flow_with_msgs_ntimes(flows, injections, 1)
-        assert msgs[0]["topic"] == "bar"
-        assert msgs[0]["payload"] == "foo"
-        assert msgs[0]["count"] == "0"
-
-    @pytest.mark.asyncio
-    @pytest.mark.it('should set two persistable flow context (w/ callback)')
-    async def test_it_should_set_two_persistable_flow_context_w_callback(self):
-        flows = [
-            {"id": "100", "type": "tab"},  # flow 1
-            {"id": "1", "type": "function", "z": "100", "wires": [["2"]], "func":
-             r"""
+                return msg;''',
+        {'count0': '0', 'count1': '1'},
+        id='should set two persistable flow context (w/o callback)'
+    ),
+    pytest.param(
+        r"flow.set('count','0','memory1', function (err) { msg.count=flow.get('count', 'memory1'); node.send(msg); });",
+        {'count': '0'},
+        id='should set persistable flow context (w/ callback)'
+    ),
+    pytest.param(
+        r"""
                 flow.set('count','0','memory1', function (err) { 
                     msg.count0 = flow.get('count','memory1');
                     flow.set('count', '1', 'memory2', function (err) { 
@@ -619,407 +130,453 @@ class TestFunctionNode:
                         node.send(msg); 
                     }); 
                 });
-            """},
-            {"id": "2", "z": "100", "type": "test-once"},
-        ]
-        injections = [
-            {"nid": "1", "msg": {'payload': 'foo', 'topic': 'bar'}}
-        ]
-        msgs = await run_flow_with_msgs_ntimes(flows, injections, 1)
-        assert msgs[0]["topic"] == "bar"
-        assert msgs[0]["payload"] == "foo"
-        assert msgs[0]["count0"] == "0"
-        assert msgs[0]["count1"] == "1"
-
-    @pytest.mark.asyncio
-    @pytest.mark.it('should get flow context')
-    async def test_it_should_get_flow_context(self):
-        flows = [
-            {"id": "100", "type": "tab"},  # flow 1
-            {"id": "1", "type": "function", "z": "100", "wires": [["2"]], "func":
-             r"flow.set('count','0'); msg.payload=flow.get('count'); return msg;"},
-            {"id": "2", "z": "100", "type": "test-once"},
-        ]
-        injections = [
-            {"nid": "1", "msg": {'payload': 'foo', 'topic': 'bar'}}
-        ]
-        msgs = await run_flow_with_msgs_ntimes(flows, injections, 1)
-        assert msgs[0]["topic"] == "bar"
-        assert msgs[0]["payload"] == "0"
-
-    @pytest.mark.asyncio
-    @pytest.mark.it('should get persistable flow context (w/o callback)')
-    async def test_it_should_get_persistable_flow_context_w_o_callback(self):
-        flows = [
-            {"id": "100", "type": "tab"},  # flow 1
-            {"id": "1", "type": "function", "z": "100", "wires": [["2"]], "func":
-             r"flow.set('count','0','memory1'); msg.payload=flow.get('count','memory1');return msg;"},
-            {"id": "2", "z": "100", "type": "test-once"},
-        ]
-        injections = [
-            {"nid": "1", "msg": {'payload': 'foo', 'topic': 'bar'}}
-        ]
-        msgs = await run_flow_with_msgs_ntimes(flows, injections, 1)
-        assert msgs[0]["topic"] == "bar"
-        assert msgs[0]["payload"] == "0"
-
-    @pytest.mark.asyncio
-    @pytest.mark.it('should get persistable flow context (w/ callback)')
-    async def test_it_should_get_persistable_flow_context_w_callback(self):
-        flows = [
-            {"id": "100", "type": "tab"},  # flow 1
-            {"id": "1", "type": "function", "z": "100", "wires": [["2"]], "func":
-             r"flow.set('count','0','memory1'); flow.get('count','memory1',function (err, val) { msg.payload=val; node.send(msg); });"},
-            {"id": "2", "z": "100", "type": "test-once"},
-        ]
-        injections = [
-            {"nid": "1", "msg": {'payload': 'foo', 'topic': 'bar'}}
-        ]
-        msgs = await run_flow_with_msgs_ntimes(flows, injections, 1)
-        assert msgs[0]["topic"] == "bar"
-        assert msgs[0]["payload"] == "0"
+            """,
+        {'count0': '0', 'count1': '1'},
+        id='should set two persistable flow context (w/ callback)'
+    ),
+    pytest.param(
+        r"global.set('count','0'); msg.count=global.get('count'); return msg;",
+        {'count': '0'},
+        id='should set global context'
+    ),
+    pytest.param(
+        "global.set('count','0','memory1'); msg.count=global.get('count', 'memory1'); return msg;",
+        {'count': '0'},
+        id='should set persistable global context (w/o callback)'
+    ),
+    pytest.param(
+        r"global.set('count','0','memory1', function (err) { msg.count=global.get('count', 'memory1'); node.send(msg); });",
+        {'count': '0'},
+        id='should set persistable global context (w/ callback)'
+    ),
+]
+
+_GET_CONTEXT_CASES = [
+    pytest.param(
+        r"context.set('count','0'); msg.payload=context.get('count'); return msg;",
+        '0',
+        id='should get node context'
+    ),
+    pytest.param(
+        r"context.set('count','0','memory1'); msg.payload=context.get('count','memory1');return msg;",
+        '0',
+        id='should get persistable node context (w/o callback)'
+    ),
+    pytest.param(
+        r"context.set('count','0','memory1'); context.get('count','memory1',function (err, val) { msg.payload=val; node.send(msg); });",
+        '0',
+        id='should get persistable node context (w/ callback)'
+    ),
+    pytest.param(
+        r"context.set('count','0'); msg.payload=context.keys();return msg;",
+        ['count'],
+        id='should get keys in node context'
+    ),
+    pytest.param(
+        r"context.set('count','0','memory1'); msg.payload=context.keys('memory1');return msg;",
+        ['count'],
+        id='should get keys in persistable node context (w/o callback)'
+    ),
+    pytest.param(
+        r"context.set('count','0','memory1'); context.keys('memory1', function(err, keys) { msg.payload=keys; node.send(msg); });",
+        ['count'],
+        id='should get keys in persistable node context (w/ callback)'
+    ),
+    pytest.param(
+        r"context.set('count','0'); context.set('number','1','memory2'); msg.payload=context.keys();return msg;",
+        ['count'],
+        id='should get keys in default persistable node context'
+    ),
+    pytest.param(
+        r"flow.set('count','0'); msg.payload=flow.get('count'); return msg;",
+        '0',
+        id='should get flow context'
+    ),
+    pytest.param(
+        r"flow.set('count','0','memory1'); msg.payload=flow.get('count','memory1');return msg;",
+        '0',
+        id='should get persistable flow context (w/o callback)'
+    ),
+    pytest.param(
+        r"flow.set('count','0','memory1'); flow.get('count','memory1',function (err, val) { msg.payload=val; node.send(msg); });",
+        '0',
+        id='should get persistable flow context (w/ callback)'
+    ),
+    pytest.param(
+        r"flow.set('count','0'); msg.payload=context.flow.get('count');return msg;",
+        '0',
+        id='should get flow context via context.flow'
+    ),
+    pytest.param(
+        r"flow.set('count','0'); msg.payload=flow.keys();return msg;",
+        ['count'],
+        id='should get keys in flow context'
+    ),
+    pytest.param(
+        r"flow.set('count','0','memory1'); msg.payload=flow.keys('memory1');return msg;",
+        ['count'],
+        id='should get keys in persistable flow context (w/o callback)'
+    ),
+    pytest.param(
+        r"flow.set('count','0','memory1'); flow.keys('memory1', function(err, keys) { msg.payload=keys; node.send(msg); });",
+        ['count'],
+        id='should get keys in persistable flow context (w/ callback)'
+    ),
+    pytest.param(
+        r"global.set('count','0'); msg.payload=global.get('count'); return msg;",
+        '0',
+        id='should get global context'
+    ),
+    pytest.param(
+        r"global.set('count','0', 'memory1'); msg.payload=global.get('count', 'memory1');return msg;",
+        '0',
+        id='should get persistable global context (w/o callback)'
+    ),
+    pytest.param(
+        r"global.set('count','0', 'memory1'); global.get('count', 'memory1', function (err, val) { msg.payload=val; node.send(msg); });",
+        '0',
+        id='should get persistable global context (w/ callback)'
+    ),
+    pytest.param(
+        r"global.set('count','0'); msg.payload=context.global.get('count');return msg;",
+        '0',
+        id='should get global context via context.global'
+    ),
+    pytest.param(
+        r"global.set('count','0', 'memory1'); msg.payload=context.global.get('count','memory1');return msg;",
+        '0',
+        id='should get persistable global context (w/o callback) via context.global'
+    ),
+    pytest.param(
+        r"global.set('count','0', 'memory1'); context.global.get('count','memory1', function (err, val) { msg.payload = val; node.send(msg); });",
+        '0',
+        id='should get persistable global context (w/ callback) via context.global'
+    ),
+]
+
+
+# The tests only differing in what they inject into one of the shared flows, keyed by the function then by test
+_SHARED_RUNS = {
+    _JS.SEND_MSG: {
+        'send_0': _INJ,
+        'send_1': _INJ,
+    },
+    _JS.RET_MSG: {
+        'returned': _INJ,
+        'pass_through__topic': [{"nid": "1", "msg": {'payload': 'foo', 'topic': 'bar', '_topic': 'barz'}}],
+    },
+}
+
+
+@pytest_asyncio.fixture(scope="module", loop_scope="session")
+async def shared_runs(engine) -> dict[str, list[object]]:
+    """The outputs of every `_SHARED_RUNS` test, run by the first test asking for them in one batch per flow"""
+    async def _run(func, cases):
+        results = await run_flows_with_multi_injections(_flow(func), list(cases.values()), 1, engine=engine)
+        return zip(cases, map(msg_views, results))
+    runs = {}
+    for pairs in await asyncio.gather(*[_run(func, cases) for func, cases in _SHARED_RUNS.items()]):
+        runs.update(pairs)
+    return runs
+
+
+@pytest_asyncio.fixture(scope="module", loop_scope="session", autouse=True)
+async def _warmup(engine):
+    # The flows shared by most of the tests below, started and exercised once with a typical message
+    await engine.warmup([_flow(_JS.RET_MSG), _flow(_JS.SEND_MSG)], [{'payload': 'foo', 'topic': 'bar'}])
 
-    @pytest.mark.asyncio
-    @pytest.mark.it('should get flow context')
-    async def test_it_should_get_flow_context_2(self):
-        flows = [
-            {"id": "100", "type": "tab"},  # flow 1
-            {"id": "1", "type": "function", "z": "100", "wires": [["2"]], "func":
-             r"flow.set('count','0'); msg.payload=context.flow.get('count');return msg;"},
-            {"id": "2", "z": "100", "type": "test-once"},
-        ]
-        injections = [
-            {"nid": "1", "msg": {'payload': 'foo', 'topic': 'bar'}}
-        ]
-        msgs = await run_flow_with_msgs_ntimes(flows, injections, 1)
-        assert msgs[0]["topic"] == "bar"
-        assert msgs[0]["payload"] == "0"
 
-    @pytest.mark.asyncio
-    @pytest.mark.it('should get keys in flow context')
-    async def test_it_should_get_keys_in_flow_context(self):
-        flows = [
-            {"id": "100", "type": "tab"},  # flow 1
-            {"id": "1", "type": "function", "z": "100", "wires": [["2"]], "func":
-             r"flow.set('count','0'); msg.payload=flow.keys();return msg;"},
-            {"id": "2", "z": "100", "type": "test-once"},
-        ]
-        injections = [
-            {"nid": "1", "msg": {'payload': 'foo', 'topic': 'bar'}}
-        ]
-        msgs = await run_flow_with_msgs_ntimes(flows, injections, 1)
-        assert msgs[0]["topic"] == "bar"
-        assert msgs[0]["payload"] == ["count"]
+# 0001 should do something with the catch node
 
-    @pytest.mark.asyncio
-    @pytest.mark.it('should get keys in persistable flow context (w/o callback)')
-    async def test_it_should_get_keys_in_persistable_flow_context_w_o_callback(self):
-        flows = [
-            {"id": "100", "type": "tab"},  # flow 1
-            {"id": "1", "type": "function", "z": "100", "wires": [["2"]], "func":
-             r"flow.set('count','0','memory1'); msg.payload=flow.keys('memory1');return msg;"},
-            {"id": "2", "z": "100", "type": "test-once"},
-        ]
+@pytest.mark.describe('function node')
+class TestFunctionNode:
+    @_it('should send returned message using send()')
+    async def test_it_should_send_returned_message_using_send_0(self, shared_runs):
+        msgs = shared_runs['send_0']
+        assert msgs[0].topic == "bar"
+        assert msgs[0].payload == "foo"
+
+    @_it('should send returned message')
+    async def test_it_should_send_returned_message(self, shared_runs):
+        msgs = shared_runs['returned']
+        assert msgs[0].topic == 'bar'
+        assert msgs[0].payload == 'foo'
+
+    @_it('should send returned message using send()')
+    async def test_it_should_send_returned_message_using_send_1(self, shared_runs):
+        msgs = shared_runs['send_1']
+        assert msgs[0].topic == "bar"
+        assert msgs[0].payload == "foo"
+
+    @_it('should allow accessing node.id and node.name and node.outputCount')
+    async def test_it_should_allow_accessing_node_id_and_node_name_and_node_output_count(self, engine):
+        flows = _flow(
+            "return [{ topic: node.name, payload:node.id, outputCount: node.outputCount }];",
+            name="test-function",
+            outputs=2
+        )
         injections = [
-            {"nid": "1", "msg": {'payload': 'foo', 'topic': 'bar'}}
+            {"nid": "1", "msg": {'payload': ''}},
         ]
-        msgs = await run_flow_with_msgs_ntimes(flows, injections, 1)
-        assert msgs[0]["topic"] == "bar"
-        assert msgs[0]["payload"] == ["count"]
+        msgs = msg_views(await run_flow_with_msgs_ntimes(flows, injections, 1, engine=engine))
+        assert msgs[0].payload == "0000000000000001"
+        assert msgs[0].topic == "test-function"
+        assert msgs[0].outputCount == 2
+
+    async def _test_send_cloning(self, args_list, engine):
+        # One function node per `node.send()` argument, all fed and collected in a single run
+        node_ids = [str(10 + i) for i in range(len(args_list))]
+        flows = [_FLOW_PROTO[0]]
+        for node_id, args in zip(node_ids, args_list):
+            flows.append({**_FLOW_PROTO[1], "id": node_id, "wires": [["2"], ["2"]],
+                          "func": f"node.send({args}); msg.payload = 'changed';"})
+        flows.append(_FLOW_PROTO[2])
+        # `origin` tells which node sent each output, the outputs of the nodes can arrive in any order
+        injections = [
+            {"nid": node_id, "msg": {'payload': 'foo', 'topic': 'bar', 'origin': node_id}} for node_id in node_ids
+        ]
+        msgs = msg_views(await run_flow_with_msgs_ntimes(flows, injections, len(args_list), engine=engine))
+        sent = {msg.origin: msg for msg in msgs}
+        assert sorted(sent) == node_ids
+        for node_id, args in zip(node_ids, args_list):
+            assert sent[node_id].topic == "bar", f"node {node_id}: node.send({args})"
+            assert sent[node_id].payload == "foo", f"node {node_id}: node.send({args})"
 
-    @pytest.mark.asyncio
-    @pytest.mark.it('should get keys in persistable flow context (w/ callback)')
-    async def test_it_should_get_keys_in_persistable_flow_context_w_callback(self):
-        flows = [
-            {"id": "100", "type": "tab"},  # flow 1
-            {"id": "1", "type": "function", "z": "100", "wires": [["2"]], "func":
-             r"flow.set('count','0','memory1'); flow.keys('memory1', function(err, keys) { msg.payload=keys; node.send(msg); });"},
-            {"id": "2", "z": "100", "type": "test-once"},
-        ]
-        injections = [
-            {"nid": "1", "msg": {'payload': 'foo', 'topic': 'bar'}}
-        ]
-        msgs = await run_flow_with_msgs_ntimes(flows, injections, 1)
-        assert msgs[0]["topic"] == "bar"
-        assert msgs[0]["payload"] == ["count"]
+    @pytest.mark.skip
+    @_it('should clone single message sent using send()')
+    async def test_it_should_clone_single_message_sent_using_send_2(self, engine):
+        await self._test_send_cloning(["msg"], engine)
 
-    @pytest.mark.asyncio
-    @pytest.mark.it('should set global context')
-    async def test_it_should_set_global_context(self):
-        flows = [
-            {"id": "100", "type": "tab"},  # flow 1
-            {"id": "1", "type": "function", "z": "100", "wires": [["2"]], "func":
-             r"global.set('count','0'); msg.count=global.get('count'); return msg;"},
-            {"id": "2", "z": "100", "type": "test-once"},
-        ]
-        injections = [
-            {"nid": "1", "msg": {'payload': 'foo', 'topic': 'bar'}}
-        ]
-        msgs = await run_flow_with_msgs_ntimes(flows, injections, 1)
-        assert msgs[0]["topic"] == "bar"
-        assert msgs[0]["payload"] == "foo"
-        assert msgs[0]["count"] == "0"
+    # Not supported, yet
 
-    @pytest.mark.asyncio
-    @pytest.mark.it('should set persistable global context (w/o callback)')
-    async def test_it_should_set_persistable_global_context_w_o_callback(self):
-        flows = [
-            {"id": "100", "type": "tab"},  # flow 1
-            {"id": "1", "type": "function", "z": "100", "wires": [
-                ["2"]], "func": "global.set('count','0','memory1'); msg.count=global.get('count', 'memory1'); return msg;"},
-            {"id": "2", "z": "100", "type": "test-once"},
-        ]
-        injections = [
-            {"nid": "1", "msg": {'payload': 'foo', 'topic': 'bar'}}
-        ]
-        msgs = await run_flow_with_msgs_ntimes(flows, injections, 1)
-        assert msgs[0]["topic"] == "bar"
-        assert msgs[0]["payload"] == "foo"
-        assert msgs[0]["count"] == "0"
+    @pytest.mark.skip
+    @_it('should not clone single message sent using send(,false)')
+    async def test_it_should_not_clone_single_message_sent_using_send_false(self, engine):
+        flows, injections = _ctx_flow("node.send(msg,false); msg.payload = 'changed';")
+        msgs = msg_views(await run_flow_with_msgs_ntimes(flows, injections, 1, engine=engine))
+        assert msgs[0].topic == "bar"
+        assert msgs[0].payload == "changed"
+
+    @_it('should clone first message sent using send() - arrays')
+    async def test_it_should_clone_first_message_sent_using_send_arrays(self, engine):
+        await self._test_send_cloning(["[msg]", "[[msg],[null]]", "[null,msg]", "[null,[msg]]"], engine)
+
+    @_it('should pass through _topic')
+    async def test_it_should_pass_through__topic(self, shared_runs):
+        msgs = shared_runs['pass_through__topic']
+        assert msgs[0].topic == "bar"
+        assert msgs[0].payload == "foo"
+        assert msgs[0]._topic == "barz"
+
+    @_it('should send to multiple outputs')
+    async def test_it_should_send_to_multiple_outputs(self):
+        node = {
+            "type": "function",
+            "func": "var msg2 = RED.util.cloneMessage(msg); msg2.payload='p2'; return [msg, msg2];",
+            "wires": [["3"], ["3"]]
+        }
+        msgs = msg_views(await run_with_single_node_ntimes('str', 'foo', node, 2, once=True, topic='bar'))
+        assert msgs[0].topic == 'bar'
+        assert msgs[0].topic == msgs[1].topic
+        assert msgs[0].payload != msgs[1].payload
+        # Both ports are wired to the same node, the two messages can arrive in either order
+        assert _payloads_eq(msgs, ['foo', 'p2'])
 
-    @pytest.mark.asyncio
-    @pytest.mark.it('should set persistable global context (w/ callback)')
-    async def test_it_should_set_persistable_global_context_w_callback(self):
-        flows = [
-            {"id": "100", "type": "tab"},  # flow 1
-            {"id": "1", "type": "function", "z": "100", "wires": [["2"]], "func":
-             r"global.set('count','0','memory1', function (err) { msg.count=global.get('count', 'memory1'); node.send(msg); });"},
-            {"id": "2", "z": "100", "type": "test-once"},
-        ]
+    @_it('should send to multiple messages')
+    async def test_it_should_send_to_multiple_message(self, engine):
+        flows = _flow("return [[{payload: 1},{payload: 2}]];")
         injections = [
-            {"nid": "1", "msg": {'payload': 'foo', 'topic': 'bar'}}
+            # TODO FIXME, MSGID SHOULD ALLOWED i64/u64
+            {"nid": "1", "msg": {'payload': 'foo', 'topic': 'bar', '_msgid': '1234'}},
         ]
-        msgs = await run_flow_with_msgs_ntimes(flows, injections, 1)
-        assert msgs[0]["topic"] == "bar"
-        assert msgs[0]["payload"] == "foo"
-        assert msgs[0]["count"] == "0"
+        msgs = msg_views(await run_flow_with_msgs_ntimes(flows, injections, 2, engine=engine))
+        assert msgs[0]._msgid == msgs[1]._msgid == 0x1234
+        assert msgs[0].payload == 1
+        assert msgs[1].payload == 2
 
-    @pytest.mark.asyncio
-    @pytest.mark.it('should get global context')
-    async def test_it_should_get_global_context(self):
-        flows = [
-            {"id": "100", "type": "tab"},  # flow 1
-            {"id": "1", "type": "function", "z": "100", "wires": [["2"]], "func":
-             r"global.set('count','0'); msg.payload=global.get('count'); return msg;"},
-            {"id": "2", "z": "100", "type": "test-once"},
-        ]
-        injections = [
-            {"nid": "1", "msg": {'payload': 'foo', 'topic': 'bar'}}
-        ]
-        msgs = await run_flow_with_msgs_ntimes(flows, injections, 1)
-        assert msgs[0]["topic"] == "bar"
-        assert msgs[0]["payload"] == "0"
+    # TODO the testing frame has no way to handle time-out for now
 
-    @pytest.mark.asyncio
-    @pytest.mark.it('should get persistable global context (w/o callback)')
-    async def test_it_should_get_persistable_global_context_w_o_callback(self):
-        flows = [
-            {"id": "100", "type": "tab"},  # flow 1
-            {"id": "1", "type": "function", "z": "100", "wires": [["2"]], "func":
-             r"global.set('count','0', 'memory1'); msg.payload=global.get('count', 'memory1');return msg;"},
-            {"id": "2", "z": "100", "type": "test-once"},
-        ]
-        injections = [
-            {"nid": "1", "msg": {'payload': 'foo', 'topic': 'bar'}}
-        ]
-        msgs = await run_flow_with_msgs_ntimes(flows, injections, 1)
-        assert msgs[0]["topic"] == "bar"
-        assert msgs[0]["payload"] == "0"
+    @pytest.mark.skip
+    @_it('should allow input to be discarded by returning null')
+    async def test_it_should_allow_input_to_be_discarded_by_returning_null(self, engine):
+        flows, injections = _ctx_flow("return null;")
+        msgs = msg_views(await run_flow_with_msgs_ntimes(flows, injections, 0, engine=engine))
 
-    @pytest.mark.asyncio
-    @pytest.mark.it('should get persistable global context (w/ callback)')
-    async def test_it_should_get_persistable_global_context_w_callback(self):
+    @_it('should handle null amongst valid messages')
+    async def test_it_should_handle_null_amongst_valid_messages(self, engine):
         flows = [
             {"id": "100", "type": "tab"},  # flow 1
-            {"id": "1", "type": "function", "z": "100", "wires": [["2"]], "func":
-             r"global.set('count','0', 'memory1'); global.get('count', 'memory1', function (err, val) { msg.payload=val; node.send(msg); });"},
+            {"id": "1", "type": "function", "z": "100", "wires": [["2"]], "func": "return [[msg,null,msg],null];"},
             {"id": "2", "z": "100", "type": "test-once"},
+            {"id": "3", "z": "100", "type": "test-once"},
         ]
         injections = [
             {"nid": "1", "msg": {'payload': 'foo', 'topic': 'bar'}}
         ]
-        msgs = await run_flow_with_msgs_ntimes(flows, injections, 1)
-        assert msgs[0]["topic"] == "bar"
-        assert msgs[0]["payload"] == "0"
+        msgs = msg_views(await run_flow_with_msgs_ntimes(flows, injections, 2, engine=engine))
+        assert len(msgs) == 2
 
-    @pytest.mark.asyncio
-    @pytest.mark.it('should get global context')
-    async def test_it_should_get_global_context_2(self):
+    @_it('should get keys in global context')
+    async def test_it_should_get_keys_in_global_context(self, engine):
         flows = [
             {"id": "100", "type": "tab"},  # flow 1
-            {"id": "1", "type": "function", "z": "100", "wires": [["2"]], "func":
-             r"global.set('count','0'); msg.payload=context.global.get('count');return msg;"},
-            {"id": "2", "z": "100", "type": "test-once"},
+            {"id": "1", "type": "change", "z": "100", "rules": [
+                {"t": "set", "p": "count", "pt": "global", "to": "0", "tot": "num"}
+            ], "reg": False, "name": "changeNode", "wires": [["2"]]},
+            {"id": "2", "type": "function", "z": "100", "wires": [
+                ["3"]], "func": "msg.payload=global.keys();return msg;"},
+            {"id": "3", "z": "100", "type": "test-once"},
         ]
         injections = [
             {"nid": "1", "msg": {'payload': 'foo', 'topic': 'bar'}}
         ]
-        msgs = await run_flow_with_msgs_ntimes(flows, injections, 1)
-        assert msgs[0]["topic"] == "bar"
-        assert msgs[0]["payload"] == "0"
+        msgs = msg_views(await run_flow_with_msgs_ntimes(flows, injections, 1, engine=engine))
+        assert msgs[0].topic == "bar"
+        assert msgs[0].payload == ['count']
 
-    @pytest.mark.asyncio
-    @pytest.mark.it('should get persistable global context (w/o callback)')
-    async def test_it_should_get_persistable_global_context_w_o_callback_2(self):
+    @pytest.mark.xfail(strict=False, reason="dropping and logging non-object results is not supported, yet")
+    @_it('should drop and log non-object message types')
+    @pytest.mark.parametrize('function_text', [
+        pytest.param('return "foo"', id='string'),
+        pytest.param('return Buffer.from("hello")', id='buffer'),
+        pytest.param('return [[[1,2,3]]]', id='array'),
+        pytest.param('return true', id='boolean'),
+        pytest.param('return 123', id='number'),
+    ])
+    async def test_it_should_drop_and_log_non_object_message_types(self, engine, function_text):
+        # The result must be dropped, so the only output is the error reported to the catch node
         flows = [
             {"id": "100", "type": "tab"},  # flow 1
-            {"id": "1", "type": "function", "z": "100", "wires": [["2"]], "func":
-             r"global.set('count','0', 'memory1'); msg.payload=context.global.get('count','memory1');return msg;"},
-            {"id": "2", "z": "100", "type": "test-once"},
-        ]
-        injections = [
-            {"nid": "1", "msg": {'payload': 'foo', 'topic': 'bar'}}
-        ]
-        msgs = await run_flow_with_msgs_ntimes(flows, injections, 1)
-        assert msgs[0]["topic"] == "bar"
-        assert msgs[0]["payload"] == "0"
+            {"id": "2", "type": "function", "z": "100", "wires": [
+                ["3"]], "func": function_text},
+            {"id": "3", "z": "100", "type": "test-once"},
+            {"id": "4", "z": "100", "type": "catch", "wires": [["3"]]},
+        ]
+        injections = [
+            {"nid": "2", "msg": {}}
+        ]
+        # Without the error nothing ever arrives, a short timeout keeps the expected failures cheap
+        msgs = msg_views(await run_flow_with_msgs_ntimes(flows, injections, 1, timeout=1, engine=engine))
+        assert 'error' in msgs[0]
+        assert msgs[0].error['source']['id'] == '0000000000000002'
+        assert msgs[0].error['source']['type'] == 'function'
+        assert msgs[0].error['message'] == 'function.error.non-message-returned'
+
+    @pytest.mark.slow
+    @_it('should set context')
+    @pytest.mark.parametrize('func, expected', _SET_CONTEXT_CASES)
+    async def test_it_should_set_context(self, engine, func, expected):
+        flows, injections = _ctx_flow(func)
+        msgs = msg_views(await run_flow_with_msgs_ntimes(flows, injections, 1, engine=engine))
+        assert msgs[0].topic == "bar"
+        assert msgs[0].payload == "foo"
+        for key, value in expected.items():
+            assert msgs[0][key] == value
+
+    @pytest.mark.slow
+    @_it('should get context')
+    @pytest.mark.parametrize('func, expected', _GET_CONTEXT_CASES)
+    async def test_it_should_get_context(self, engine, func, expected):
+        flows, injections = _ctx_flow(func)
+        msgs = msg_views(await run_flow_with_msgs_ntimes(flows, injections, 1, engine=engine))
+        assert msgs[0].topic == "bar"
+        assert msgs[0].payload == expected
 
-    @pytest.mark.asyncio
-    @pytest.mark.it('should get persistable global context (w/ callback)')
-    async def test_it_should_get_persistable_global_context_w_callback_2(self):
-        flows = [
-            {"id": "100", "type": "tab"},  # flow 1
-            {"id": "1", "type": "function", "z": "100", "wires": [["2"]], "func":
-             r"global.set('count','0', 'memory1'); context.global.get('count','memory1', function (err, val) { msg.payload = val; node.send(msg); });"},
-            {"id": "2", "z": "100", "type": "test-once"},
-        ]
-        injections = [
-            {"nid": "1", "msg": {'payload': 'foo', 'topic': 'bar'}}
-        ]
-        msgs = await run_flow_with_msgs_ntimes(flows, injections, 1)
-        assert msgs[0]["topic"] == "bar"
-        assert msgs[0]["payload"] == "0"
+    @pytest.mark.skip
+    @_it('should set two persistable node context (single call, w/o callback)')
+    async def test_it_should_set_two_persistable_node_context_single_call_w_o_callback(self, engine):
+        flows, injections = _ctx_flow(r"""
+                context.set(['count1', 'count2'], ['0', '1'], 'memory1', err => {
+                    msg.count0 = context.get('count1', 'memory1');
+                    msg.count1 = context.get('count2', 'memory1');
+                }); 
+                return msg;
+             """)
+        msgs = msg_views(await run_flow_with_msgs_ntimes(flows, injections, 1, engine=engine))
+        assert msgs[0].topic == "bar"
+        assert msgs[0].payload == "foo"
+        assert msgs[0].count0 == "0"
+        assert msgs[0].count1 == "1"
 
     # Not finished, yet
     @pytest.mark.skip
-    @pytest.mark.asyncio
-    @pytest.mark.it('should handle setTimeout()')
-    async def test_it_should_handle_settimeout(self):
-        flows = [
-            {"id": "100", "type": "tab"},  # flow 1
-            {"id": "1", "type": "function", "z": "100", "wires": [["2"]],
-             "func": r"setTimeout(() => node.send(msg), 100);"},
-            {"id": "2", "z": "100", "type": "test-once"},
-        ]
-        injections = [
-            {"nid": "1", "msg": {'payload': 'foo', 'topic': 'bar'}}
-        ]
-        msgs = await run_flow_with_msgs_ntimes(flows, injections, 1)
-        assert msgs[0]["topic"] == "bar"
-        assert msgs[0]["payload"] == "foo"
+    @_it('should handle setTimeout()')
+    async def test_it_should_handle_settimeout(self, engine):
+        flows, injections = _ctx_flow(r"setTimeout(() => node.send(msg), 100);")
+        msgs = msg_views(await run_flow_with_msgs_ntimes(flows, injections, 1, engine=engine))
+        assert msgs[0].topic == "bar"
+        assert msgs[0].payload == "foo"
 
     @pytest.mark.skip
-    @pytest.mark.asyncio
-    @pytest.mark.it('should handle setInterval()')
-    async def test_it_should_handle_setinterval(self):
-        flows = [
-            {"id": "100", "type": "tab"},  # flow 1
-            {"id": "1", "type": "function", "z": "100", "wires": [["2"]],
-             "func": r"setInterval(() => node.send(msg), 100);"},
-            {"id": "2", "z": "100", "type": "test-once"},
-        ]
-        injections = [
-            {"nid": "1", "msg": {'payload': 'foo', 'topic': 'bar'}}
-        ]
-        msgs = await run_flow_with_msgs_ntimes(flows, injections, 1)
-        assert msgs[0]["topic"] == "bar"
-        assert msgs[0]["payload"] == "foo"
+    @_it('should handle setInterval()')
+    async def test_it_should_handle_setinterval(self, engine):
+        flows, injections = _ctx_flow(r"setInterval(() => node.send(msg), 100);")
+        msgs = msg_views(await run_flow_with_msgs_ntimes(flows, injections, 1, engine=engine))
+        assert msgs[0].topic == "bar"
+        assert msgs[0].payload == "foo"
 
     @pytest.mark.skip
-    @pytest.mark.asyncio
-    @pytest.mark.it('should handle clearInterval()')
-    async def test_it_should_handle_clearinterval(self):
-        flows = [
-            {"id": "100", "type": "tab"},  # flow 1
-            {"id": "1", "type": "function", "z": "100", "wires": [["2"]],
-             "func": r"var id=setInterval(null,100);setTimeout(()=>{clearInterval(id);node.send(msg);},500);"},
-            {"id": "2", "z": "100", "type": "test-once"},
-        ]
-        injections = [
-            {"nid": "1", "msg": {'payload': 'foo', 'topic': 'bar'}}
-        ]
-        msgs = await run_flow_with_msgs_ntimes(flows, injections, 1)
-        assert msgs[0]["topic"] == "bar"
-        assert msgs[0]["payload"] == "foo"
-
-    @pytest.mark.asyncio
-    @pytest.mark.it('should allow accessing node.id')
-    async def test_id_should_allow_accessing_node_id(self):
-        flows = [
-            {"id": "100", "type": "tab"},  # flow 1
-            {"id": "1", "type": "function", "z": "100", "wires": [["2"]], "func": "msg.payload = node.id; return msg;"},
-            {"id": "2", "z": "100", "type": "test-once"},
-        ]
-        injections = [
-            {"nid": "1", "msg": {'payload': 'foo', 'topic': 'bar'}}
-        ]
-        msgs = await run_flow_with_msgs_ntimes(flows, injections, 1)
-        assert msgs[0]['payload'] == '0000000000000001'
-
-    @pytest.mark.asyncio
-    @pytest.mark.it('should allow accessing node.name')
-    async def test_id_should_allow_accessing_node_name(self):
-        flows = [
-            {"id": "100", "type": "tab"},  # flow 1
-            {"id": "1", "type": "function", "z": "100", "wires": [["2"]],
-                "func": "msg.payload = node.name; return msg;", "name": "name of node"},
-            {"id": "2", "z": "100", "type": "test-once"},
-        ]
-        injections = [
-            {"nid": "1", "msg": {'payload': 'foo', 'topic': 'bar'}}
-        ]
-        msgs = await run_flow_with_msgs_ntimes(flows, injections, 1)
-        assert msgs[0]['payload'] == 'name of node'
+    @_it('should handle clearInterval()')
+    async def test_it_should_handle_clearinterval(self, engine):
+        flows, injections = _ctx_flow(
+            r"var id=setInterval(null,100);setTimeout(()=>{clearInterval(id);node.send(msg);},500);"
+        )
+        msgs = msg_views(await run_flow_with_msgs_ntimes(flows, injections, 1, engine=engine))
+        assert msgs[0].topic == "bar"
+        assert msgs[0].payload == "foo"
+
+    @_it('should allow accessing node.id')
+    async def test_id_should_allow_accessing_node_id(self, engine):
+        flows, injections = _ctx_flow("msg.payload = node.id; return msg;")
+        msgs = msg_views(await run_flow_with_msgs_ntimes(flows, injections, 1, engine=engine))
+        assert msgs[0].payload == '0000000000000001'
+
+    @_it('should allow accessing node.name')
+    async def test_id_should_allow_accessing_node_name(self, engine):
+        flows, injections = _ctx_flow("msg.payload = node.name; return msg;", name="name of node")
+        msgs = msg_views(await run_flow_with_msgs_ntimes(flows, injections, 1, engine=engine))
+        assert msgs[0].payload == 'name of node'
 
     class TestEnvVar:
-        def setup_method(self, method):
-            os.environ["_TEST_FOO_"] = "hello"
-
-        def teardown_method(self, method):
-            del os.environ["_TEST_FOO_"]
-
-        @pytest.mark.asyncio
-        @pytest.mark.it('should allow accessing env vars')
+        @pytest.fixture(scope="class", autouse=True)
+        def _env(self):
+            # Set once for the whole class, the previous environment is restored afterwards
+            with pytest.MonkeyPatch.context() as mp:
+                mp.setenv("_TEST_FOO_", "hello")
+                yield
+
+        @_it('should allow accessing env vars')
         async def test_it_should_allow_accessing_env_vars(self):
             node = {
                 "type": "function",
                 "func": "msg.payload = env.get('_TEST_FOO_'); return msg;",
                 "wires": [["3"]]
             }
-            msgs = await run_with_single_node_ntimes(payload_type='str', payload='foo', node_json=node, nexpected=1, once=True, topic='bar')
-            assert msgs[0]['topic'] == 'bar'
-            assert msgs[0]['payload'] == 'hello'
+            msgs = msg_views(await run_with_single_node_ntimes(payload_type='str', payload='foo', node_json=node, nexpected=1, once=True, topic='bar'))
+            assert msgs[0].topic == 'bar'
+            assert msgs[0].payload == 'hello'
 
-    @pytest.mark.asyncio
-    @pytest.mark.it('should execute initialization')
+    @_it('should execute initialization')
     async def test_it_should_execute_initialization(self):
-        flows = [
-            {"id": "100", "type": "tab"},  # flow 1
-            {"id": "1", "type": "function", "z": "100", "wires": [["2"]],
-                "func": "msg.payload = global.get('X'); return msg;", "initialize": "global.set('X','bar');"},
-            {"id": "2", "z": "100", "type": "test-once"},
-        ]
+        # `initialize` only runs when the flows start, a reused flow would have its contexts emptied since
+        flows = _flow("msg.payload = global.get('X'); return msg;", initialize="global.set('X','bar');")
         injections = [
             {"nid": "1", "msg": {'payload': 'foo'}}
         ]
-        msgs = await run_flow_with_msgs_ntimes(flows, injections, 1)
-        assert msgs[0]['payload'] == 'bar'
+        msgs = msg_views(await run_flow_with_msgs_ntimes(flows, injections, 1))
+        assert msgs[0].payload == 'bar'
 
-    @pytest.mark.asyncio
-    @pytest.mark.it('should wait completion of initialization')
+    @_it('should wait completion of initialization')
     async def test_it_should_wait_completion_of_initializationn(self):
-        flows = [
-            {"id": "100", "type": "tab"},  # flow 1
-            {"id": "1", "type": "function", "z": "100", "wires": [["2"]],
-             "func": "msg.payload = global.get('X'); return msg;",
-             "initialize": "global.set('X', '-'); return new Promise((resolve, reject) => setTimeout(() => { global.set('X','bar'); resolve(); }, 500));"},
-            {"id": "2", "z": "100", "type": "test-once"},
-        ]
+        flows = _flow(
+            "msg.payload = global.get('X'); return msg;",
+            initialize="global.set('X', '-'); return new Promise((resolve, reject) => setTimeout(() => { global.set('X','bar'); resolve(); }, 500));"
+        )
         injections = [
             {"nid": "1", "msg": {'payload': 'foo'}}
         ]
-        msgs = await run_flow_with_msgs_ntimes(flows, injections, 1)
-        assert msgs[0]['payload'] == 'bar'
+        msgs = msg_views(await run_flow_with_msgs_ntimes(flows, injections, 1))
+        assert msgs[0].payload == 'bar'
 
     @pytest.mark.describe('finalize function')
     class TestFinalizeFunction:
@@ -1028,3 +585,24 @@ class TestFunctionNode:
     @pytest.mark.describe('init function')
     class TestInitFunction:
         pass
+
+
+@pytest.mark.describe('function node')
+@_it('runs the node, flow and global context cases concurrently')
+async def test_batch_context(engine):
+    # The case id goes into the node name so every case gets its own flows, and its own engine
+    cases = [(case, False) for case in _SET_CONTEXT_CASES] + [(case, True) for case in _GET_CONTEXT_CASES]
+    injections = _INJ
+    results = await asyncio.gather(*[
+        run_flow_with_msgs_ntimes(_flow(case.values[0], name=case.id), injections, 1, engine=engine)
+        for case, _ in cases
+    ])
+    for msgs, (case, is_get) in zip(map(msg_views, results), cases):
+        expected = case.values[1]
+        assert msgs[0].topic == "bar", case.id
+        if is_get:
+            assert msgs[0].payload == expected, case.id
+        else:
+            assert msgs[0].payload == "foo", case.id
+            for key, value in expected.items():
+                assert msgs[0][key] == value, case.id
@@ -1,75 +1,55 @@
-import json
 import pytest
-import pytest_asyncio
-import asyncio
-import os
 
 from tests import *
 
-async def _generic_range_test(action, minin, maxin, minout, maxout, round, a_payload, expected_result):
-    node = {"type": "range", "minin": minin, "maxin": maxin, "minout": minout,
-            "maxout": maxout, "action": action, "round": round}
-    msgs = await run_with_single_node_ntimes(
-        'num',
-        isinstance(a_payload, str) and a_payload or json.dumps(a_payload),
-        node, 1, once=True, topic='t1')
-    assert msgs[0]['payload'] == expected_result
 
+def _range_flow(action, minin, maxin, minout, maxout, round) -> bytes:
+    node = {"id": "1", "type": "range", "z": "100", "minin": minin, "maxin": maxin, "minout": minout,
+            "maxout": maxout, "action": action, "round": round, "wires": (("2",),)}
+    return dump_flows((TAB, node, SINK))
 
-@pytest.mark.describe('range Node')
-class TestRangeNode:
-
-    @pytest.mark.asyncio
-    @pytest.mark.it('''ranges numbers up tenfold''')
-    async def test_0001(self):
-        await _generic_range_test("scale", 0, 100, 0, 1000, False, 50, 500)
 
-    @pytest.mark.asyncio
-    @pytest.mark.it('''ranges numbers down such as centimetres to metres''')
-    async def test_0002(self):
-        await _generic_range_test("scale", 0, 100, 0, 1, False, 55, 0.55)
+def _range_case(it: str, config: tuple, payload, expected):
+    # The rows with the same node config share one started flow, see the `compiled_flow` fixture
+    return pytest.param(_range_flow(*config), payload, expected, id=it)
 
-    @pytest.mark.asyncio
-    @pytest.mark.it('''wraps numbers down say for degree/rotation reading 1/2''')
-    async def test_0003(self):
-        # 1/2 around wrap => "one and a half turns"
-        await _generic_range_test("roll", 0, 10, 0, 360, True, 15, 180)
 
-    @pytest.mark.asyncio
-    @pytest.mark.it('''wraps numbers around say for degree/rotation reading 1/3''')
-    async def test_0004(self):
-        # 1/3 around wrap => "one and a third turns"
-        await _generic_range_test("roll", 0, 10, 0, 360, True, 13.3333, 120)
+_WRAP = ("roll", 0, 10, 0, 360, True)
+_CLAMP = ("clamp", 0, 10, 0, 1000, False)
 
-    @pytest.mark.asyncio
-    @pytest.mark.it('''wraps numbers around say for degree/rotation reading 1/4''')
-    async def test_0005(self):
-        # 1/4 around wrap => "one and a quarter turns"
-        await _generic_range_test("roll", 0, 10, 0, 360, True, 12.5, 90)
+_RANGE_CASES = [
+    _range_case('ranges numbers up tenfold', ("scale", 0, 100, 0, 1000, False), 50, 500),
+    _range_case('ranges numbers down such as centimetres to metres', ("scale", 0, 100, 0, 1, False), 55, 0.55),
+    # 1/2 around wrap => "one and a half turns"
+    _range_case('wraps numbers down say for degree/rotation reading 1/2', _WRAP, 15, 180),
+    # 1/3 around wrap => "one and a third turns"
+    _range_case('wraps numbers around say for degree/rotation reading 1/3', _WRAP, 13.3333, 120),
+    # 1/4 around wrap => "one and a quarter turns"
+    _range_case('wraps numbers around say for degree/rotation reading 1/4', _WRAP, 12.5, 90),
+    # 1/4 backwards wrap => "one and a quarter turns backwards"
+    _range_case('wraps numbers down say for degree/rotation reading 1/4', _WRAP, -12.5, 270),
+    _range_case('wraps numbers around say for degree/rotation reading 0', _WRAP, -10, 0),
+    _range_case('clamps numbers within a range - over max', _CLAMP, 111, 1000),
+    _range_case('clamps numbers within a range - below min', _CLAMP, -1, 0),
+]
 
-    @pytest.mark.asyncio
-    @pytest.mark.it('''wraps numbers down say for degree/rotation reading 1/4''')
-    async def test_0006(self):
-        # 1/4 backwards wrap => "one and a quarter turns backwards"
-        await _generic_range_test("roll", 0, 10, 0, 360, True, -12.5, 270)
 
-    @pytest.mark.asyncio
-    @pytest.mark.it('''wraps numbers around say for degree/rotation reading 0''')
-    async def test_0007(self):
-        await _generic_range_test("roll", 0, 10, 0, 360, True, -10, 0)
+@pytest.mark.describe('range Node')
+class TestRangeNode:
 
-    @pytest.mark.asyncio
-    @pytest.mark.it('''clamps numbers within a range - over max''')
-    async def test_0008(self):
-        '''clamps numbers within a range - over max'''
-        await _generic_range_test("clamp", 0, 10, 0, 1000, False, 111, 1000)
+    @pytest.mark.parametrize('flow_json, payload, expected', _RANGE_CASES)
+    async def test_ranges(self, compiled_flow, payload, expected):
+        msgs = await inject(compiled_flow, [{'payload': payload, 'topic': 't1'}], 1)
+        assert msgs[0]['payload'] == expected
 
-    @pytest.mark.asyncio
-    @pytest.mark.it('''clamps numbers within a range - below min''')
-    async def test_0009(self):
-        await _generic_range_test("clamp", 0, 10, 0, 1000, False, -1, 0)
+    @pytest.mark.it('''ranges the number payload of a num inject node''')
+    async def test_ranges_from_inject_node(self):
+        # The cases above inject numbers, this one keeps the inject node turning its string payload into a number
+        node = {"type": "range", "minin": 0, "maxin": 100, "minout": 0, "maxout": 1000, "action": "scale",
+                "round": False}
+        msgs = await run_with_single_node_ntimes('num', '50', node, 1, once=True, topic='t1')
+        assert msgs[0]['payload'] == 500
 
-    @pytest.mark.asyncio
     @pytest.mark.it('''drops msg if in drop mode and input outside range''')
     async def test_0010(self):
         node = {
@@ -84,7 +64,6 @@ class TestRangeNode:
         msgs = await run_single_node_with_msgs_ntimes(node, injections, 1)
         assert msgs[0]['payload'] == 50
 
-    @pytest.mark.asyncio
     @pytest.mark.it('''just passes on msg if payload not present''')
     async def test_0011(self):
         node = {
@@ -95,7 +74,6 @@ class TestRangeNode:
         msgs = await run_single_node_with_msgs_ntimes(node, injections, 1)
         assert 'payload' not in msgs[0]
 
-    @pytest.mark.asyncio
     @pytest.mark.it('reports if input is not a number')
     async def test_it_reports_if_input_is_not_a_number(self):
         flows = [
@@ -108,5 +86,5 @@ class TestRangeNode:
         injections = [
             {"nid": "1", "msg": {"payload": "NOT A NUMBER"}}
         ]
-        msgs = await run_flow_with_msgs_ntimes(flows, injections, 1)
+        msgs = await run_flow_with_msgs_ntimes(flows, injections, 1, raw=True)
         assert 'error' in msgs[0]
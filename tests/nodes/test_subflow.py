@@ -1,15 +1,30 @@
-import json
 import pytest
+from types import MappingProxyType
 
 from .. import *
 
+# The subflow env var flows below use their own tab
+TAB = MappingProxyType({"id": "999", "type": "tab", "label": "", "disabled": False, "info": ""})
+SINK = MappingProxyType({"id": "2", "z": "999", "type": "test-once", "wires": ()})
+INSTANCE = MappingProxyType({"id": "1", "z": "999", "type": "subflow:100", "wires": (("2",),)})
+SUBFLOW = MappingProxyType({
+    "id": "100", "type": "subflow", "name": "Subflow", "info": "",
+    "in": (MappingProxyType({"wires": (MappingProxyType({"id": "101"}),)}),),
+    "out": (MappingProxyType({"wires": (MappingProxyType({"id": "101", "port": 0}),)}),),
+})
+INJECT_FOO = (MappingProxyType({"nid": "1", "msg": MappingProxyType({"payload": "foo"})}),)
+SET_ENV_NODE = MappingProxyType({
+    "id": "101", "type": "change", "z": "100",
+    "rules": (MappingProxyType({"t": "set", "p": "V", "pt": "msg", "to": "K", "tot": "env"}),),
+    "name": "set-env-node", "wires": (),
+})
+
 
 @pytest.mark.describe('subflow')
 class TestSubflow:
 
-    @pytest.mark.asyncio
     @pytest.mark.it('''should define subflow''')
-    async def test_0001(self):
+    async def test_0001(self, engine):
         flows = [
             {"id": "100", "type": "tab"},
             {"id": "1", "z": "100", "type": "subflow:200", "wires": [["2"]]},
@@ -23,12 +38,11 @@ class TestSubflow:
         injections = [
             {"nid": "1", "msg": {"payload": "hello"}},
         ]
-        msgs = await run_flow_with_msgs_ntimes(flows, injections, 1)
+        msgs = await run_flow_with_msgs_ntimes(flows, injections, 1, engine=engine)
         assert msgs[0]["payload"] == "hello"
 
-    @pytest.mark.asyncio
     @pytest.mark.it('should pass data to/from subflow')
-    async def test_it_should_pass_data_to_from_subflow(self):
+    async def test_it_should_pass_data_to_from_subflow(self, engine):
         flows = [
             {"id": "100", "type": "tab"},
             {"id": "1", "z": "100", "type": "subflow:200", "wires": [["2"]]},
@@ -39,15 +53,12 @@ class TestSubflow:
             {"id": "3", "z": "200", "type": "function",
                 "func": "msg.payload = msg.payload+'bar'; return msg;", "wires": []}
         ]
-        injections = [
-            {"nid": "1", "msg": {"payload": "foo"}},
-        ]
-        msgs = await run_flow_with_msgs_ntimes(flows, injections, 1)
+        injections = INJECT_FOO
+        msgs = await run_flow_with_msgs_ntimes(flows, injections, 1, engine=engine)
         assert msgs[0]["payload"] == "foobar"
 
-    @pytest.mark.asyncio
     @pytest.mark.it('''should pass data to/from nested subflow''')
-    async def test_0003(self):
+    async def test_0003(self, engine):
         flows = [
             {"id": "100", "type": "tab", "info": ""},
             {"id": "1", "z": "100", "type": "subflow:200", "wires": [["2"]]},
@@ -68,15 +79,12 @@ class TestSubflow:
             {"id": "5", "z": "300", "type": "function",
              "func": "msg.payload=msg.payload+'bar'; return msg;", "wires": []}
         ]
-        injections = [
-            {"nid": "1", "msg": {"payload": "foo"}},
-        ]
-        msgs = await run_flow_with_msgs_ntimes(flows, injections, 1)
+        injections = INJECT_FOO
+        msgs = await run_flow_with_msgs_ntimes(flows, injections, 1, engine=engine)
         assert msgs[0]["payload"] == "foobarbaz"
 
-    @pytest.mark.asyncio
     @pytest.mark.it('should access env var of subflow template')
-    async def test_0004(self):
+    async def test_0004(self, engine):
         flows = [
             {"id": "100", "type": "tab", "label": "",
                 "disabled": False, "info": ""},
@@ -95,73 +103,50 @@ class TestSubflow:
                 "rules": [{"t": "set", "p": "V", "pt": "msg", "to": "K", "tot": "env"}],
                 "name": "set-env-node", "wires": []},
         ]
-        injections = [
-            {"nid": "1", "msg": {"payload": "foo"}},
-        ]
-        msgs = await run_flow_with_msgs_ntimes(flows, injections, 1)
+        injections = INJECT_FOO
+        msgs = await run_flow_with_msgs_ntimes(flows, injections, 1, engine=engine)
         assert msgs[0]["V"] == "V"
 
-    @pytest.mark.asyncio
     @pytest.mark.it('should access env var of subflow instance')
-    async def test_0005(self):
+    async def test_0005(self, engine):
         flows = [
-            {"id": "999", "type": "tab", "label": "",
-                "disabled": False, "info": ""},
-            {"id": "1", "z": "999", "type": "subflow:100", "env": [
+            TAB,
+            {**INSTANCE, "env": [
                 {"name": "K", "type": "str", "value": "V"}
-            ], "wires": [["2"]]},
-            {"id": "2", "z": "999", "type": "test-once", "wires": []},
+            ]},
+            SINK,
             # Subflow
-            {"id": "100", "type": "subflow", "name": "Subflow", "info": "",
-             "in": [{"wires": [{"id": "101"}]}],
-             "out": [{"wires": [{"id": "101", "port": 0}]
-                      }]
-             },
-            {"id": "101", "type": "change", "z": "100",
-                "rules": [{"t": "set", "p": "V", "pt": "msg", "to": "K", "tot": "env"}],
-                "name": "set-env-node", "wires": []},
-        ]
-        injections = [
-            {"nid": "1", "msg": {"payload": "foo"}},
+            SUBFLOW,
+            SET_ENV_NODE,
         ]
-        msgs = await run_flow_with_msgs_ntimes(flows, injections, 1)
+        injections = INJECT_FOO
+        msgs = await run_flow_with_msgs_ntimes(flows, injections, 1, engine=engine)
         assert msgs[0]["V"] == "V"
 
-    @pytest.mark.asyncio
     @pytest.mark.it('should access last env var with same name')
-    async def test_0006(self):
+    async def test_0006(self, engine):
         flows = [
-            {"id": "999", "type": "tab", "label": "",
-                "disabled": False, "info": ""},
-            {"id": "1", "z": "999", "type": "subflow:100", "env": [
+            TAB,
+            {**INSTANCE, "env": [
                 {"name": "K", "type": "str", "value": "V0"},
                 {"name": "X", "type": "str", "value": "VX"},
                 {"name": "K", "type": "str", "value": "V1"}
-            ], "wires": [["2"]]},
-            {"id": "2", "z": "999", "type": "test-once", "wires": []},
+            ]},
+            SINK,
             # Subflow
-            {"id": "100", "type": "subflow", "name": "Subflow", "info": "",
-             "in": [{"wires": [{"id": "101"}]}],
-             "out": [{"wires": [{"id": "101", "port": 0}]}]
-             },
-            {"id": "101", "type": "change", "z": "100",
-                "rules": [{"t": "set", "p": "V", "pt": "msg", "to": "K", "tot": "env"}],
-                "name": "set-env-node", "wires": []},
-        ]
-        injections = [
-            {"nid": "1", "msg": {"payload": "foo"}},
+            SUBFLOW,
+            SET_ENV_NODE,
         ]
-        msgs = await run_flow_with_msgs_ntimes(flows, injections, 1)
+        injections = INJECT_FOO
+        msgs = await run_flow_with_msgs_ntimes(flows, injections, 1, engine=engine)
         assert msgs[0]["V"] == "V1"
 
-    @pytest.mark.asyncio
     @pytest.mark.it('should access typed value of env var')
-    async def test_0007(self):
+    async def test_0007(self, engine):
         flows = [
-            {"id": "999", "type": "tab", "label": "",
-                "disabled": False, "info": ""},
+            TAB,
             {
-                "id": "1", "z": "999", "type": "subflow:100",
+                **INSTANCE,
                 "env": [
                     {"name": "KN", "type": "num", "value": "100"},
                     {"name": "KB", "type": "bool", "value": "true"},
@@ -170,65 +155,43 @@ class TestSubflow:
                     {"name": "Ke", "type": "env", "value": "KS"},
                     # FIXME {"name": "Kj", "type": "jsonata", "value": "1+2"}
                 ],
-                "wires": [["2"]]},
-            {"id": "2", "z": "999", "type": "test-once", "wires": []},
-            {"id": "100", "type": "subflow", "name": "Subflow", "info": "",
-             "in": [{"wires": [{"id": "101"}]}],
-             "out": [{"wires": [{"id": "101", "port": 0}]}],
-             "env": [{"name": "KS", "type": "str", "value": "STR"}]
-             },
+            },
+            SINK,
+            {**SUBFLOW, "env": [{"name": "KS", "type": "str", "value": "STR"}]},
             {"id": "101", "z": "100", "type": "function",
                 "func": "msg.VE = env.get('Ke'); msg.VS = env.get('KS'); msg.VN = env.get('KN'); msg.VB = env.get('KB'); msg.VJ = env.get('KJ'); msg.Vb = env.get('Kb'); /*msg.Vj = env.get('Kj');*/ return msg;",
                 "wires": []
              }
         ]
-        injections = [
-            {"nid": "1", "msg": {"payload": "foo"}},
-        ]
-        msgs = await run_flow_with_msgs_ntimes(flows, injections, 1)
+        injections = INJECT_FOO
+        msgs = await run_flow_with_msgs_ntimes(flows, injections, 1, engine=engine)
+        expected = {"VS": "STR", "VN": 100, "VB": True, "VJ": [1, 2, 3], "Vb": [65, 65], "VE": "STR"}  # FIXME "Vj": 3
         assert len(msgs) == 1
-        msg = msgs[0]
-        assert msg["VS"] == "STR"
-        assert msg["VN"] == 100
-        assert msg["VB"] == True
-        assert msg["VJ"] == [1, 2, 3]
-        assert msg["Vb"] == [65, 65]
-        assert msg["VE"] == "STR"
-        # assert msg["Vj"] == 3 #FIXME
+        assert {key: msgs[0].get(key) for key in expected} == expected
 
-    @pytest.mark.asyncio
     @pytest.mark.it('should overwrite env var of subflow template by env var of subflow instance')
-    async def test_0008(self):
+    async def test_0008(self, engine):
         flows = [
-            {"id": "999", "type": "tab", "label": "",
-                "disabled": False, "info": ""},
-            {"id": "1", "z": "999", "type": "subflow:100", "env": [
+            TAB,
+            {**INSTANCE, "env": [
                 {"name": "K", "type": "str", "value": "V"},
-            ], "wires": [["2"]]},
-            {"id": "2", "z": "999", "type": "test-once", "wires": []},
+            ]},
+            SINK,
             # Subflow
-            {"id": "100", "type": "subflow", "name": "Subflow", "info": "",
-             "env": [
-                 {"name": "K", "type": "str", "value": "TV"},
-             ],
-             "in": [{"wires": [{"id": "101"}]}],
-             "out": [{"wires": [{"id": "101", "port": 0}]}]
-             },
+            {**SUBFLOW, "env": [
+                {"name": "K", "type": "str", "value": "TV"},
+            ]},
             {"id": "101", "type": "function", "z": "100",
              "func": "msg.V = env.get('K'); return msg;", "wires": []},
         ]
-        injections = [
-            {"nid": "1", "msg": {"payload": "foo"}},
-        ]
-        msgs = await run_flow_with_msgs_ntimes(flows, injections, 1)
+        injections = INJECT_FOO
+        msgs = await run_flow_with_msgs_ntimes(flows, injections, 1, engine=engine)
         assert msgs[0]["V"] == "V"
 
-    @pytest.mark.asyncio
     @pytest.mark.it('should access env var of parent subflow template')
-    async def test_0009(self):
+    async def test_0009(self, engine):
         flows = [
-            {"id": "999", "type": "tab", "label": "",
-                "disabled": False, "info": ""},
+            TAB,
             {"id": "998", "z": "999", "type": "test-once", "wires": []},
             {"id": "1", "z": "999",
                 "type": "subflow:100", "wires": [["998"]]},
@@ -262,28 +225,20 @@ class TestSubflow:
                 "in": [{"wires": [{"id": "201"}]}],
                 "out": [{"wires": [{"id": "201", "port": 0}]}]
             },
-            {"id": "201", "type": "change", "z": "200",
-                "rules": [{"t": "set", "p": "V", "pt": "msg", "to": "K", "tot": "env"}],
-                "name": "set-env-node", "wires": []},
-        ]
-        injections = [
-            {"nid": "1", "msg": {"payload": "foo"}},
+            {**SET_ENV_NODE, "id": "201", "z": "200"},
         ]
-        msgs = await run_flow_with_msgs_ntimes(flows, injections, 1)
+        injections = INJECT_FOO
+        msgs = await run_flow_with_msgs_ntimes(flows, injections, 1, engine=engine)
         assert msgs[0]["V"] == "V"
 
-    @pytest.mark.asyncio
     @pytest.mark.it('should access env var of parent subflow instance')
-    async def test_0010(self):
+    async def test_0010(self, engine):
         flows = [
-            {"id": "999", "type": "tab", "label": "",
-                "disabled": False, "info": ""},
-            {"id": "1", "z": "999", "type": "subflow:100",
-             "env": [
-                 {"name": "K", "type": "str", "value": "V"}
-             ],
-             "wires": [["2"]]},
-            {"id": "2", "z": "999", "type": "test-once", "wires": []},
+            TAB,
+            {**INSTANCE, "env": [
+                {"name": "K", "type": "str", "value": "V"}
+            ]},
+            SINK,
             # Subflow1
             {"id": "100", "type": "subflow", "name": "Subflow1", "info": "",
              "in": [{"wires": [{"id": "101"}]}],
@@ -298,121 +253,72 @@ class TestSubflow:
              "in": [{"wires": [{"id": "201"}]}],
              "out": [{"wires": [{"id": "201", "port": 0}]}]
              },
-            {"id": "201", "type": "change", "z": "200",
-                "rules": [{"t": "set", "p": "V", "pt": "msg", "to": "K", "tot": "env"}],
-                "name": "set-env-node", "wires": []},
-        ]
-        injections = [
-            {"nid": "1", "msg": {"payload": "foo"}},
+            {**SET_ENV_NODE, "id": "201", "z": "200"},
         ]
-        msgs = await run_flow_with_msgs_ntimes(flows, injections, 1)
+        injections = INJECT_FOO
+        msgs = await run_flow_with_msgs_ntimes(flows, injections, 1, engine=engine)
         assert msgs[0]["V"] == "V"
 
-    @pytest.mark.asyncio
     @pytest.mark.it('should access env var of tab')
-    async def test_0011(self):
+    async def test_0011(self, engine):
         flows = [
-            {"id": "999", "type": "tab", "label": "", "disabled": False, "info": "",
-                "env": [{"name": "K", "type": "str", "value": "V"}]
-             },
-            {"id": "1", "z": "999", "type": "subflow:100", "wires": [["2"]]},
-            {"id": "2", "z": "999", "type": "test-once", "wires": []},
+            {**TAB, "env": [{"name": "K", "type": "str", "value": "V"}]},
+            INSTANCE,
+            SINK,
             # Subflow 1
-            {
-                "id": "100",
-                "type": "subflow",
-                "name": "Subflow",
-                "info": "",
-                "env": [],
-                "in": [{"wires": [{"id": "101"}]}],
-                "out": [{"wires": [{"id": "101", "port": 0}]}]
-            },
-            {"id": "101", "type": "change", "z": "100",
-                "rules": [{"t": "set", "p": "V", "pt": "msg", "to": "K", "tot": "env"}],
-                "name": "set-env-node", "wires": []},
-
-        ]
-        injections = [
-            {"nid": "1", "msg": {"payload": "foo"}},
+            {**SUBFLOW, "env": []},
+            SET_ENV_NODE,
         ]
-        msgs = await run_flow_with_msgs_ntimes(flows, injections, 1)
+        injections = INJECT_FOO
+        msgs = await run_flow_with_msgs_ntimes(flows, injections, 1, engine=engine)
         assert msgs[0]["V"] == "V"
 
-    @pytest.mark.asyncio
     @pytest.mark.it('should access env var of group')
-    async def test_0012(self):
+    async def test_0012(self, engine):
         flows = [
-            {"id": "999", "type": "tab", "label": "",
-                "disabled": False, "info": ""},
+            TAB,
             {
                 "id": "1000",
                 "z": "999",
                 "type": "group",
                 "env": [{"name": "K", "type": "str", "value": "V"}]
             },
-            {"id": "1", "z": "999", "g": "1000",
-                "type": "subflow:100", "wires": [["2"]]},
-            {"id": "2", "z": "999", "type": "test-once", "wires": []},
-            {"id": "100", "type": "subflow", "name": "Subflow", "info": "", "env": [],
-             "in": [{"wires": [{"id": "101"}]}],
-             "out": [{"wires": [{"id": "101", "port": 0}]}]},
-            {"id": "101", "type": "change", "z": "100",
-             "rules": [{"t": "set", "p": "V", "pt": "msg", "to": "K", "tot": "env"}],
-             "name": "set-env-node", "wires": []},
-        ]
-        injections = [
-            {"nid": "1", "msg": {"payload": "foo"}},
+            {**INSTANCE, "g": "1000"},
+            SINK,
+            {**SUBFLOW, "env": []},
+            SET_ENV_NODE,
         ]
-        msgs = await run_flow_with_msgs_ntimes(flows, injections, 1)
+        injections = INJECT_FOO
+        msgs = await run_flow_with_msgs_ntimes(flows, injections, 1, engine=engine)
         assert msgs[0]["V"] == "V"
 
-    @pytest.mark.asyncio
     @pytest.mark.it('should access env var of nested group')
-    async def test_0013(self):
+    async def test_0013(self, engine):
         flows = [
-            {"id": "999", "type": "tab", "label": "",
-                "disabled": False, "info": ""},
+            TAB,
             {"id": "1000", "z": "999", "type": "group", "env": [
                 {"name": "K", "type": "str", "value": "V"}
             ]},
             {"id": "2000", "z": "999", "g": "1000", "type": "group", "env": []},
-            {"id": "1", "z": "999", "g": "2000",
-                "type": "subflow:100", "wires": [["2"]]},
-            {"id": "2", "z": "999", "type": "test-once", "wires": []},
-            {"id": "100", "type": "subflow", "name": "Subflow", "info": "", "env": [],
-                "in": [{"wires": [{"id": "101"}]}],
-                "out": [{"wires": [{"id": "101", "port": 0}]}]
-             },
-            {"id": "101", "type": "change", "z": "100",
-             "rules": [{"t": "set", "p": "V", "pt": "msg", "to": "K", "tot": "env"}],
-             "name": "set-env-node", "wires": []},
-        ]
-        injections = [
-            {"nid": "1", "msg": {"payload": "foo"}},
+            {**INSTANCE, "g": "2000"},
+            SINK,
+            {**SUBFLOW, "env": []},
+            SET_ENV_NODE,
         ]
-        msgs = await run_flow_with_msgs_ntimes(flows, injections, 1)
+        injections = INJECT_FOO
+        msgs = await run_flow_with_msgs_ntimes(flows, injections, 1, engine=engine)
         assert msgs[0]["V"] == "V"
 
-    @pytest.mark.asyncio
     @pytest.mark.it('should access NR_NODE_PATH env var within subflow instance')
-    async def test_0014(self):
+    async def test_0014(self, engine):
         flows = [
-            {"id": "999", "type": "tab", "label": "",
-                "disabled": False, "info": ""},
-            {"id": "1", "z": "999", "type": "subflow:100",
-                "env": [], "wires": [["2"]]},
-            {"id": "2", "z": "999", "type": "test-once", "wires": []},
-            {"id": "100", "type": "subflow", "name": "Subflow", "info": "",
-                "in": [{"wires": [{"id": "101"}]}],
-                "out": [{"wires": [{"id": "101", "port": 0}]}]
-             },
-            {"id": "101", "type": "change", "z": "100",
-             "rules": [{"t": "set", "p": "payload", "pt": "msg", "to": "NR_NODE_PATH", "tot": "env"}],
-             "name": "set-env-node", "wires": []},
-        ]
-        injections = [
-            {"nid": "1", "msg": {"payload": "foo"}},
+            TAB,
+            {**INSTANCE, "env": []},
+            SINK,
+            SUBFLOW,
+            {**SET_ENV_NODE, "rules": [{"t": "set", "p": "payload", "pt": "msg", "to": "NR_NODE_PATH", "tot": "env"}]},
         ]
-        msgs = await run_flow_with_msgs_ntimes(flows, injections, 1)
+        injections = INJECT_FOO
+        msgs = await run_flow_with_msgs_ntimes(flows, injections, 1, engine=engine)
         payload = msgs[0]["payload"]
         assert payload.count('/') == 2